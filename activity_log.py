@@ -0,0 +1,195 @@
+# [file name]: activity_log.py
+import os
+from datetime import datetime
+from database import Database, in_transaction, rolled_back
+import pagination
+from app_logging import get_logger, sampled
+
+log = get_logger('activity_log')
+
+# Ids are handed out at insert, not commit, so a slower transaction can commit an
+# id below a version a client already has; get_since re-reads this many ids below it
+ACTIVITY_REREAD_WINDOW = int(os.getenv('ACTIVITY_REREAD_WINDOW', 50))
+
+class ActivityLog:
+    @staticmethod
+    def record(cursor, log_type, user_id, action, details=None, ip_address=None, leave_id=None):
+        """Append one event to activity_events using the caller's cursor"""
+        try:
+            cursor.execute("""
+                INSERT INTO activity_events
+                (log_type, user_id, action, details, ip_address, leave_id)
+                VALUES (%s, %s, %s, %s, %s, %s)
+            """, (log_type, user_id, action, details, ip_address, leave_id))
+            return cursor.lastrowid
+        except Exception as e:
+            log.warning("Activity event not recorded: %s", e, extra=sampled('activity_record'))
+            return None
+    
+    @staticmethod
+    def record_many(cursor, events):
+        """Append (log_type, user_id, action, details, ip_address, leave_id) tuples, returning their ids
+        
+        One INSERT per event: the ids of a multi-row INSERT are only consecutive with
+        auto_increment_increment = 1, and executemany may split it into several statements.
+        """
+        event_ids = []
+        transaction = in_transaction(cursor)
+        try:
+            for event in events:
+                cursor.execute("""
+                    INSERT INTO activity_events
+                    (log_type, user_id, action, details, ip_address, leave_id)
+                    VALUES (%s, %s, %s, %s, %s, %s)
+                """, event)
+                event_ids.append(cursor.lastrowid)
+            return event_ids
+        except Exception as e:
+            if transaction and rolled_back(e):
+                raise
+            log.warning("Activity events not recorded: %s", e, extra=sampled('activity_record'))
+            return []
+    
+    @staticmethod
+    def get_recent(limit=100):
+        """Latest events, read newest-first straight off the (created_at, id) index"""
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT id, log_type, user_id, action, created_at as timestamp,
+                           details, ip_address, leave_id
+                    FROM activity_events
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %s
+                """, (limit,))
+                return cursor.fetchall()
+        finally:
+            connection.close()
+    
+    @staticmethod
+    def current_version(cursor):
+        """Change sequence clients compare against: "<newest id>.<events in the re-read window>"
+        
+        The count changes when an event commits late below the newest id, so that
+        alone still moves the version.
+        """
+        cursor.execute("SELECT COALESCE(MAX(id), 0) as newest FROM activity_events")
+        newest = int(cursor.fetchone()['newest'])
+        cursor.execute("SELECT COUNT(*) as recent FROM activity_events WHERE id > %s",
+                       (max(0, newest - ACTIVITY_REREAD_WINDOW),))
+        return f"{newest}.{int(cursor.fetchone()['recent'])}"
+    
+    @staticmethod
+    def version_id(version):
+        """Newest event id in a version string, or None if it is not one"""
+        newest = str(version or '').split('.')[0]
+        return int(newest) if newest.isdigit() else None
+    
+    @staticmethod
+    def get_since(cursor, version, limit=20):
+        """Events newer than `version` and the last ACTIVITY_REREAD_WINDOW ids before it, newest first
+        
+        Callers drop the re-read events they already have, by id.
+        """
+        cursor.execute("""
+            SELECT id, log_type, user_id, action, created_at as timestamp,
+                   details, ip_address, leave_id
+            FROM activity_events
+            WHERE id > %s
+            ORDER BY id DESC
+            LIMIT %s
+        """, (max(0, version - ACTIVITY_REREAD_WINDOW), limit + ACTIVITY_REREAD_WINDOW))
+        return cursor.fetchall()
+    
+    @staticmethod
+    def get_page(cursor=None, page_size=None):
+        """One page of events, newest first, using a keyset on (created_at, id)"""
+        size = pagination.page_size(page_size)
+        where_sql = ""
+        params = []
+        if cursor:
+            created_at, event_id = pagination.decode_cursor(cursor, datetime, int)
+            where_sql = "WHERE created_at < %s OR (created_at = %s AND id < %s)"
+            params = [created_at, created_at, event_id]
+        
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as db_cursor:
+                db_cursor.execute(f"""
+                    SELECT id, log_type, user_id, action, created_at as timestamp,
+                           details, ip_address, leave_id
+                    FROM activity_events
+                    {where_sql}
+                    ORDER BY created_at DESC, id DESC
+                    LIMIT %s
+                """, (*params, size + 1))
+                rows = db_cursor.fetchall()
+        finally:
+            connection.close()
+        
+        return pagination.build_page(rows, size, lambda row: (row['timestamp'], row['id']))
+    
+    @staticmethod
+    def backfill():
+        """Copy history from leaves, verification_logs and admin_logs (run once)"""
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1 FROM activity_events WHERE source_table IS NOT NULL LIMIT 1")
+                if cursor.fetchone():
+                    log.info("activity_events already backfilled")
+                    return 0
+                
+                # Anything newer than the first live event was recorded by the app itself
+                cursor.execute("SELECT COALESCE(MIN(created_at), NOW()) as cutoff FROM activity_events")
+                cutoff = cursor.fetchone()['cutoff']
+                
+                inserted = 0
+                cursor.execute("""
+                    INSERT INTO activity_events
+                    (log_type, user_id, action, details, ip_address, leave_id,
+                     created_at, source_table, source_id)
+                    SELECT 'leave', student_reg, CONCAT('Leave ', status), reason, NULL, leave_id,
+                           applied_at, 'leaves', leave_id
+                    FROM leaves
+                    WHERE applied_at < %s
+                    ORDER BY applied_at, leave_id
+                """, (cutoff,))
+                inserted += cursor.rowcount
+                
+                cursor.execute("""
+                    INSERT INTO activity_events
+                    (log_type, user_id, action, details, ip_address, leave_id,
+                     created_at, source_table, source_id)
+                    SELECT 'verification', supervisor_id, action, notes, NULL, leave_id,
+                           verified_at, 'verification_logs', log_id
+                    FROM verification_logs
+                    WHERE verified_at < %s
+                    ORDER BY verified_at, log_id
+                """, (cutoff,))
+                inserted += cursor.rowcount
+                
+                cursor.execute("""
+                    INSERT INTO activity_events
+                    (log_type, user_id, action, details, ip_address, leave_id,
+                     created_at, source_table, source_id)
+                    SELECT 'admin', admin_id, action_type, details, ip_address, NULL,
+                           created_at, 'admin_logs', log_id
+                    FROM admin_logs
+                    WHERE created_at < %s
+                    ORDER BY created_at, log_id
+                """, (cutoff,))
+                inserted += cursor.rowcount
+                
+                connection.commit()
+                log.info("Backfilled %d activity events", inserted)
+                return inserted
+        finally:
+            connection.close()
+
+if __name__ == "__main__":
+    ActivityLog.backfill()
@@ -0,0 +1,91 @@
+# [file name]: admin_cache.py
+import os
+import time
+from threading import Lock
+
+# Cache keys for the admin dashboard aggregates
+STATS_KEY = 'system_stats'
+LOGS_KEY = 'recent_logs'
+SUSPICIOUS_KEY = 'suspicious_leaves'
+
+ALL_KEYS = (STATS_KEY, LOGS_KEY, SUSPICIOUS_KEY)
+
+class AdminCache:
+    """Per-process read-through cache with TTL expiry and write invalidation.
+    
+    Each gunicorn worker keeps its own copy, so invalidation is local to the
+    worker that handled the write; the TTL bounds staleness everywhere else.
+    """
+    ttl = float(os.getenv('ADMIN_CACHE_TTL', 30))
+    
+    _entries = {}       # key -> (expires_at, generation, value)
+    _generations = {}   # key -> bumped on every invalidation
+    _key_locks = {}
+    _lock = Lock()
+    _metrics = {'hits': 0, 'misses': 0, 'waits': 0, 'invalidations': 0}
+    
+    @classmethod
+    def _key_lock(cls, key):
+        with cls._lock:
+            if key not in cls._key_locks:
+                cls._key_locks[key] = Lock()
+            return cls._key_locks[key]
+    
+    @classmethod
+    def _fresh(cls, key):
+        entry = cls._entries.get(key)
+        if entry and entry[0] > time.monotonic() and entry[1] == cls._generations.get(key, 0):
+            return entry
+        return None
+    
+    @classmethod
+    def _count(cls, metric):
+        with cls._lock:
+            cls._metrics[metric] += 1
+    
+    @classmethod
+    def get_or_compute(cls, key, compute, ttl=None):
+        """Return the cached value for key, computing it at most once per expiry"""
+        ttl = cls.ttl if ttl is None else ttl
+        if ttl <= 0:
+            cls._count('misses')
+            return compute()
+        
+        entry = cls._fresh(key)
+        if entry:
+            cls._count('hits')
+            return entry[2]
+        
+        # Only one thread recomputes; the others wait and reuse its result
+        with cls._key_lock(key):
+            entry = cls._fresh(key)
+            if entry:
+                cls._count('waits')
+                return entry[2]
+            
+            cls._count('misses')
+            generation = cls._generations.get(key, 0)
+            value = compute()
+            # Skip storing if a write invalidated the key while we were computing
+            if cls._generations.get(key, 0) == generation:
+                cls._entries[key] = (time.monotonic() + ttl, generation, value)
+            return value
+    
+    @classmethod
+    def invalidate(cls, *keys):
+        """Drop cached values after a write that changes them"""
+        with cls._lock:
+            for key in keys or ALL_KEYS:
+                cls._generations[key] = cls._generations.get(key, 0) + 1
+                cls._entries.pop(key, None)
+                cls._metrics['invalidations'] += 1
+    
+    @classmethod
+    def stats(cls):
+        with cls._lock:
+            metrics = dict(cls._metrics)
+            metrics['entries'] = len(cls._entries)
+        lookups = metrics['hits'] + metrics['waits'] + metrics['misses']
+        metrics['hit_ratio'] = round((metrics['hits'] + metrics['waits']) / lookups, 3) if lookups else 0.0
+        metrics['ttl_seconds'] = cls.ttl
+        return metrics
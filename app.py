@@ -1,5 +1,5 @@
 # [file name]: app.py
-from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash
+from flask import Flask, render_template, request, redirect, url_for, session, jsonify, flash, Response, stream_with_context, send_file
 from datetime import datetime, timedelta, time
 import secrets
 from models import Student, Proctor, HostelSupervisor, AdminModel
@@ -8,13 +8,30 @@ import os
 from dotenv import load_dotenv
 import functools
 import traceback
-from pdf_generator import PDFGenerator, ReportData
+from time import perf_counter
+from stats_counters import StatCounters, USER_METRICS, start_reconciler
+from admin_cache import AdminCache, STATS_KEY, LOGS_KEY, SUSPICIOUS_KEY
+from activity_log import ActivityLog
+from prefix_index import UserIndex, USER_SOURCES, start_warmup
+from live_feed import LiveFeed, HEARTBEAT_INTERVAL, REFUSED_RETRY, format_event
+import exporter
+import slip_pack
+import snapshot
+from job_queue import Jobs, start_workers
+from job_handlers import REPORT_TYPES
+from report_cache import ReportCache
+import request_metrics
+import query_log
+import app_logging
 import base64
 
 load_dotenv('.env')
 
+log = app_logging.get_logger('app')
+
 app = Flask(__name__)
 app.secret_key = os.getenv('SECRET_KEY', secrets.token_hex(32))
+request_metrics.init_app(app)
 
 print("\n" + "="*60)
 print("VIT LEAVE MANAGEMENT SYSTEM - STARTING...")
@@ -146,6 +163,21 @@ except Exception as e:
     traceback.print_exc()
     print("⚠ Continuing in limited mode...")
 
+# Slip pack worker processes re-import this file as __mp_main__ when it is run
+# directly (`python app.py`); they only render PDFs, so they start none of these
+if __name__ != '__mp_main__':
+    # Periodically correct any drift in the materialized dashboard counters
+    start_reconciler()
+    
+    # Build the typeahead index in the background so the first lookup is fast
+    start_warmup()
+    
+    # Refresh the analytics snapshot every SNAPSHOT_INTERVAL seconds, if set
+    snapshot.start_scheduler()
+    
+    # Run queued reports, exports and snapshots off the request threads (JOB_WORKERS per process)
+    start_workers()
+
 # ==============================================
 # SIMPLIFIED SETUP ROUTE (NO TOKEN REQUIRED)
 # ==============================================
@@ -435,6 +467,117 @@ def admin_required(f):
         return f(*args, **kwargs)
     return decorated_function
 
+def json_safe(row):
+    """Convert a database row into JSON-serialisable values"""
+    safe = {}
+    for key, value in row.items():
+        if isinstance(value, timedelta):
+            total_seconds = int(value.total_seconds())
+            value = f"{total_seconds // 3600:02d}:{(total_seconds % 3600) // 60:02d}"
+        elif hasattr(value, 'isoformat'):
+            value = value.isoformat()
+        safe[key] = value
+    return safe
+
+def event_stream(proctor_id=None):
+    """SSE response of live events, all of them or one proctor's, resuming after Last-Event-ID"""
+    last_id = request.headers.get('Last-Event-ID') or request.args.get('since')
+    last_id = int(last_id) if last_id and last_id.isdigit() else None
+    
+    # Subscribe before replaying so nothing written in between is missed
+    subscription = LiveFeed.subscribe(proctor_id)
+    if subscription is None:
+        # Every stream slot is taken; the page polls instead and retries later
+        response = Response(f"retry: {REFUSED_RETRY * 1000}\n\n", status=503, mimetype='text/event-stream')
+        response.headers['Retry-After'] = str(REFUSED_RETRY)
+        response.headers['Cache-Control'] = 'no-cache'
+        return response
+    try:
+        replayed = LiveFeed.replay(last_id, proctor_id) if last_id is not None else []
+    except Exception as e:
+        log.warning("Live feed replay failed: %s", e)
+        replayed = []
+    
+    def generate():
+        try:
+            yield "retry: 5000\n\n"
+            delivered = set()
+            for event in replayed:
+                delivered.add(event['id'])
+                yield format_event(event)
+            while not subscription.dropped:
+                event = subscription.get(timeout=HEARTBEAT_INTERVAL)
+                if event is None:
+                    yield ": keep-alive\n\n"
+                elif event['id'] not in delivered:
+                    yield format_event(event)
+        finally:
+            LiveFeed.unsubscribe(subscription)
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.call_on_close(lambda: LiveFeed.unsubscribe(subscription))
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def leave_filters(args):
+    """Admin leave filters from query arguments, shared by the leaves page and its export"""
+    return {
+        'status': [value for value in args.getlist('status') if value],
+        'leave_type': [value for value in args.getlist('leave_type') if value],
+        'date_from': args.get('date_from'),
+        'date_to': args.get('date_to'),
+        'hostel_block': args.get('hostel_block'),
+        'proctor_id': args.get('proctor_id'),
+        'student': args.get('student'),
+        'destination': args.get('destination'),
+        'suspicious_only': args.get('suspicious_only') == 'true',
+        'q': args.get('q', '').strip()
+    }
+
+def export_response(name, sheets):
+    """Chunked download of sheets as ?format=csv (default) or xlsx"""
+    fmt = 'xlsx' if request.args.get('format', '').lower() == 'xlsx' else 'csv'
+    chunks, mimetype, filename = exporter.export_response_parts(name, fmt, sheets)
+    response = Response(chunks, mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    response.headers['Cache-Control'] = 'no-store'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+def job_accepted(job_id, status_endpoint='admin_job_status'):
+    """202 response pointing the client at a queued job's status"""
+    return jsonify({
+        'success': True,
+        'job_id': job_id,
+        'status_url': url_for(status_endpoint, job_id=job_id)
+    }), 202
+
+def job_status_response(job, result_endpoint):
+    """JSON status of a job, linking its result file once there is one"""
+    if not job:
+        return jsonify({'success': False, 'error': 'Job not found or expired'}), 404
+    status = Jobs.status(job)
+    if status['has_result']:
+        status['download_url'] = url_for(result_endpoint, job_id=job['job_id'])
+    return jsonify({'success': True, 'job': status})
+
+def job_result_response(job):
+    """A finished job's result file as a download"""
+    if not job or job['status'] != 'done' or not job['result_path'] or not os.path.exists(job['result_path']):
+        return jsonify({'success': False, 'error': 'Result not available'}), 404
+    result = job['result'] or {}
+    return send_file(os.path.abspath(job['result_path']), mimetype=result.get('mimetype'),
+                     as_attachment=True, download_name=result.get('filename') or os.path.basename(job['result_path']),
+                     max_age=0)
+
+def page_url(cursor=None):
+    """Current URL with its filters kept and the page cursor replaced"""
+    args = {key: value for key, value in request.args.items() if key != 'cursor'}
+    if cursor:
+        args['cursor'] = cursor
+    return url_for(request.endpoint, **args)
+
 @app.route('/')
 def index():
     return render_template('index.html')
@@ -445,7 +588,7 @@ def student_login():
         reg_number = request.form['reg_number'].strip().upper()
         password = request.form['password']
         
-        print(f"Student login attempt: {reg_number}")
+        log.info("Student login attempt", extra={'reg_number': reg_number})
         
         student = Student.login(reg_number, password)
         if student:
@@ -499,8 +642,7 @@ def apply_leave():
                 flash('Failed to apply for leave', 'error')
                 
         except Exception as e:
-            print(f"Error applying leave: {e}")
-            traceback.print_exc()
+            log.exception("Error applying leave")
             flash(f'Error: {str(e)}', 'error')
             
     return render_template('apply_leave.html', 
@@ -532,6 +674,12 @@ def proctor_dashboard():
                          leaves=pending_leaves, 
                          proctor_name=session['proctor_name'])
 
+@app.route('/proctor/stream')
+@login_required('proctor_id')
+def proctor_stream():
+    """Live leave, scan and flag events for the proctor's own students"""
+    return event_stream(session['proctor_id'])
+
 @app.route('/proctor/approve/<int:leave_id>')
 @login_required('proctor_id')
 def approve_leave(leave_id):
@@ -542,8 +690,7 @@ def approve_leave(leave_id):
         else:
             flash('Error approving leave', 'error')
     except Exception as e:
-        print(f"Error approving leave: {e}")
-        traceback.print_exc()
+        log.exception("Error approving leave")
         flash(f'Error: {str(e)}', 'error')
     
     return redirect(url_for('proctor_dashboard'))
@@ -558,12 +705,41 @@ def reject_leave(leave_id):
         else:
             flash('Error rejecting leave', 'error')
     except Exception as e:
-        print(f"Error rejecting leave: {e}")
-        traceback.print_exc()
+        log.exception("Error rejecting leave")
         flash(f'Error: {str(e)}', 'error')
     
     return redirect(url_for('proctor_dashboard'))
 
+@app.route('/proctor/bulk-decision', methods=['POST'])
+@login_required('proctor_id')
+def bulk_decision():
+    """Approve/reject many leaves at once and return the new pending queue"""
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict):
+        return jsonify({'success': False, 'error': 'Expected a JSON object'}), 400
+    
+    try:
+        result = Proctor.bulk_decide(
+            session['proctor_id'],
+            approve_ids=data.get('approve', []),
+            reject_ids=data.get('reject', [])
+        )
+    except (TypeError, ValueError) as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    except Exception as e:
+        log.exception("Error in bulk decision")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    pending_leaves = Proctor.get_pending_leaves(session['proctor_id'])
+    return jsonify({
+        'success': True,
+        'approved': result['approved'],
+        'rejected': result['rejected'],
+        'skipped': result['skipped'],
+        'pending_count': len(pending_leaves),
+        'pending': [json_safe(leave) for leave in pending_leaves]
+    })
+
 @app.route('/hostel/login', methods=['GET', 'POST'])
 def hostel_login():
     if request.method == 'POST':
@@ -574,7 +750,7 @@ def hostel_login():
         if supervisor:
             # Log attempted login with IP
             ip_address = request.remote_addr
-            print(f"Hostel login attempt: {supervisor_id} from IP: {ip_address}")
+            log.info("Hostel login attempt", extra={'supervisor_id': supervisor_id, 'ip': ip_address})
             
             # Additional security: Log successful login
             db = Database()
@@ -596,9 +772,12 @@ def hostel_login():
                         ip_address,
                         request.headers.get('User-Agent', '')
                     ))
+                    ActivityLog.record(cursor, 'admin', supervisor_id, 'LOGIN',
+                                       f'Hostel supervisor login from IP: {ip_address}', ip_address)
                     connection.commit()
+                    AdminCache.invalidate(LOGS_KEY)
             except Exception as e:
-                print(f"Error logging supervisor login: {e}")
+                log.error("Error logging supervisor login: %s", e)
             finally:
                 connection.close()
             
@@ -635,7 +814,7 @@ def hostel_verify():
                                  hostel_block=session.get('hostel_block', ''),
                                  error=error)
         
-        print(f"Verifying QR token: {qr_token}")
+        log.debug("Verifying QR token", extra={'supervisor_id': session.get('supervisor_id')})
         
         try:
             # Get supervisor's block from session
@@ -723,8 +902,7 @@ def hostel_verify():
                 
         except Exception as e:
             error = f"Server error: {str(e)}"
-            print(f"Error in hostel_verify: {e}")
-            traceback.print_exc()
+            log.exception("Error in hostel_verify")
             flash(error, 'error')
     
     return render_template('hostel_verify.html',
@@ -741,6 +919,41 @@ def clear_verification():
         session.pop('slip_data', None)
     return redirect(url_for('hostel_verify'))
 
+@app.route('/hostel/slip-pack', methods=['POST'])
+@login_required('supervisor_id')
+def hostel_slip_pack():
+    """Queue one PDF of slips for every approved leave from the block starting in a date range"""
+    date_from = request.form.get('date_from') or request.args.get('date_from')
+    date_to = request.form.get('date_to') or request.args.get('date_to')
+    try:
+        slip_pack.parse_range(date_from or '', date_to)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e) or 'Dates must be YYYY-MM-DD'}), 400
+    
+    job_id = Jobs.enqueue('slip_pack', {
+        'hostel_block': session['hostel_block'],
+        'date_from': date_from,
+        'date_to': date_to
+    }, created_by=session['supervisor_id'])
+    return job_accepted(job_id, 'hostel_job_status')
+
+def supervisor_job(job_id):
+    """The slip pack job if the signed-in supervisor queued it, else None"""
+    job = Jobs.get(job_id)
+    if job and job['job_type'] == 'slip_pack' and job['created_by'] == session['supervisor_id']:
+        return job
+    return None
+
+@app.route('/hostel/jobs/<int:job_id>')
+@login_required('supervisor_id')
+def hostel_job_status(job_id):
+    return job_status_response(supervisor_job(job_id), 'hostel_job_result')
+
+@app.route('/hostel/jobs/<int:job_id>/result')
+@login_required('supervisor_id')
+def hostel_job_result(job_id):
+    return job_result_response(supervisor_job(job_id))
+
 @app.route('/api/generate_qr/<int:leave_id>')
 @login_required('student_id')
 def generate_qr(leave_id):
@@ -763,8 +976,7 @@ def generate_qr(leave_id):
             'valid_until': target_leave['qr_expiry'].strftime('%Y-%m-%d %H:%M:%S') if target_leave['qr_expiry'] else None
         })
     except Exception as e:
-        print(f"Error generating QR code: {e}")
-        traceback.print_exc()
+        log.exception("Error generating QR code")
         return jsonify({'error': str(e)}), 500
 
 @app.route('/admin/login', methods=['GET', 'POST'])
@@ -801,52 +1013,259 @@ def admin_login():
 @admin_required
 def admin_dashboard():
     try:
-        stats = AdminModel.get_system_stats()
-        recent_logs = AdminModel.get_all_logs(limit=20)
-        suspicious_leaves = AdminModel.get_all_leaves({'suspicious_only': True})
+        # Read the change sequence first so the partial refresh never skips a change
+        version = AdminModel.get_change_version()
+        stats = AdminCache.get_or_compute(STATS_KEY, AdminModel.get_system_stats)
+        recent_logs = AdminCache.get_or_compute(LOGS_KEY, lambda: AdminModel.get_all_logs(limit=20))
+        suspicious_leaves = AdminCache.get_or_compute(
+            SUSPICIOUS_KEY, lambda: AdminModel.get_all_leaves({'suspicious_only': True})
+        )
         
         return render_template('admin_dashboard.html',
                             stats=stats,
                             recent_logs=recent_logs,
                             suspicious_leaves=suspicious_leaves,
+                            version=version,
                             admin_name=session['admin_name'],
                             admin_role=session['admin_role'])
     except Exception as e:
-        print(f"Admin dashboard error: {e}")
+        log.exception("Admin dashboard error")
         # Return simple dashboard without complex queries
         return render_template('admin_simple_dashboard.html',
                             error=str(e),
                             admin_name=session['admin_name'])
 
+@app.route('/admin/dashboard/partial')
+@admin_required
+def admin_dashboard_partial():
+    """Dashboard changes since the client's version; 304 when there are none"""
+    since = request.args.get('since')
+    if since is None and request.if_none_match:
+        tag = next(iter(request.if_none_match), '')
+        since = tag[1:] if tag.startswith('v') else None
+    
+    version, changes = AdminModel.get_dashboard_changes(since)
+    etag = f'v{version}'
+    if changes is None:
+        response = app.response_class(status=304)
+    else:
+        response = jsonify({
+            'version': version,
+            'full': changes['full'],
+            'stats': changes['stats'],
+            'recent_logs': [json_safe(log) for log in changes['recent_logs']],
+            'suspicious_leaves': [json_safe(leave) for leave in changes['suspicious_leaves']],
+            'removed_flags': changes['removed_flags']
+        })
+    response.set_etag(etag)
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+@app.route('/admin/stream')
+@admin_required
+def admin_stream():
+    """Live leave, scan and flag events across the whole system"""
+    return event_stream()
+
+@app.route('/admin/cache-stats')
+@admin_required
+def admin_cache_stats():
+    return jsonify({**AdminCache.stats(), 'reports': ReportCache.stats(), 'logging': app_logging.stats()})
+
+@app.route('/admin/queries')
+@admin_required
+def admin_queries():
+    """Per-fingerprint query statistics and EXPLAIN output for this process"""
+    sort = request.args.get('sort', 'total_ms')
+    return render_template('admin_queries.html', report=query_log.snapshot(sort), sort=sort,
+                           admin_name=session['admin_name'])
+
+@app.route('/admin/queries.json')
+@admin_required
+def admin_queries_json():
+    return jsonify(query_log.snapshot(request.args.get('sort', 'total_ms')))
+
+@app.route('/admin/queries/reset', methods=['POST'])
+@admin_required
+def admin_queries_reset():
+    query_log.reset()
+    flash('Query statistics cleared', 'success')
+    return redirect(url_for('admin_queries'))
+
 @app.route('/admin/leaves')
 @admin_required
 def admin_leaves():
-    filters = {
-        'status': request.args.get('status'),
-        'leave_type': request.args.get('leave_type'),
-        'date_from': request.args.get('date_from'),
-        'date_to': request.args.get('date_to'),
-        'suspicious_only': request.args.get('suspicious_only') == 'true'
-    }
+    filters = leave_filters(request.args)
+    
+    page_size = request.args.get('page_size')
+    try:
+        page = AdminModel.get_leaves_page(filters, request.args.get('cursor'), page_size)
+    except ValueError:
+        flash('Invalid page link, showing the first page', 'error')
+        page = AdminModel.get_leaves_page(filters, None, page_size)
     
-    leaves = AdminModel.get_all_leaves(filters)
     return render_template('admin_leaves.html',
-                         leaves=leaves,
+                         leaves=page['items'],
+                         total=AdminModel.count_leaves(filters),
                          filters=filters,
+                         next_url=page_url(page['next_cursor']) if page['next_cursor'] else None,
+                         first_url=page_url() if request.args.get('cursor') else None,
                          admin_name=session['admin_name'])
 
+@app.route('/admin/export/leaves')
+@admin_required
+def admin_export_leaves():
+    """Stream every leave matching the leaves page filters"""
+    sql, params = AdminModel.get_leaves_export_query(leave_filters(request.args))
+    AdminModel.log_action(
+        admin_id=session['admin_id'],
+        action_type='EXPORT_LEAVES',
+        target_type='SYSTEM',
+        details=f"Exported leaves as {request.args.get('format', 'csv')}",
+        request=request
+    )
+    return export_response('leaves_export', [('Leaves', exporter.LEAVE_COLUMNS, exporter.stream_rows(sql, params))])
+
+@app.route('/admin/export-data')
+@admin_required
+def admin_export_data():
+    """Queue the full data export: leaves, users and activity, one sheet each in XLSX"""
+    fmt = 'csv' if request.args.get('format', '').lower() == 'csv' else 'xlsx'
+    job_id = Jobs.enqueue('export', {'format': fmt}, created_by=session['admin_id'])
+    AdminModel.log_action(
+        admin_id=session['admin_id'],
+        action_type='BACKUP',
+        target_type='SYSTEM',
+        details=f'Full data export queued (job {job_id})',
+        request=request
+    )
+    return job_accepted(job_id)
+
+@app.route('/admin/log-export')
+@admin_required
+def admin_log_export():
+    """Stream activity events between ?date_from and ?date_to (inclusive days)"""
+    try:
+        date_from = datetime.strptime(request.args['date_from'], '%Y-%m-%d').date() if request.args.get('date_from') else None
+        date_to = datetime.strptime(request.args['date_to'], '%Y-%m-%d').date() if request.args.get('date_to') else None
+    except ValueError:
+        return jsonify({'success': False, 'error': 'Dates must be YYYY-MM-DD'}), 400
+    return export_response('activity_logs', [exporter.log_sheet(date_from, date_to)])
+
+@app.route('/admin/generate-pdf/<report_type>')
+@admin_required
+def admin_generate_pdf(report_type):
+    """Queue a PDF report; the response carries the job id to poll"""
+    if report_type not in REPORT_TYPES:
+        return jsonify({'success': False, 'error': f'Unknown report type: {report_type}'}), 404
+    
+    filters = leave_filters(request.args)
+    filters['leave_id'] = request.args.get('leave_id', type=int)
+    
+    # An unchanged report is served from the cache instead of being rebuilt
+    cache_key = None
+    if ReportCache.enabled():
+        cache_key = ReportCache.key(report_type, filters, StatCounters.data_version())
+        if ReportCache.get(cache_key):
+            response = jsonify({
+                'success': True,
+                'cached': True,
+                'download_url': url_for('admin_cached_report', report_type=report_type, key=cache_key)
+            })
+            response.set_etag(cache_key)
+            return response.make_conditional(request)
+    
+    # Cached and deduplicated reports are shared between admins, so the PDF does
+    # not name whoever asked first; the request is recorded in the admin log
+    job_id = Jobs.enqueue('report', {
+        'report_type': report_type,
+        'filters': filters,
+        'cache_key': cache_key
+    }, created_by=session['admin_id'], dedupe_on='cache_key')
+    
+    AdminModel.log_action(
+        admin_id=session['admin_id'],
+        action_type='GENERATE_REPORT',
+        target_type='SYSTEM',
+        details=f'Queued {report_type} PDF report (job {job_id})',
+        request=request
+    )
+    return job_accepted(job_id)
+
+@app.route('/admin/reports/<report_type>/<key>')
+@admin_required
+def admin_cached_report(report_type, key):
+    """A cached PDF report; answers If-None-Match with 304 while it is unchanged"""
+    if report_type not in REPORT_TYPES or len(key) != 64 or not all(c in '0123456789abcdef' for c in key):
+        return jsonify({'success': False, 'error': 'Report not found'}), 404
+    path = ReportCache.get(key)
+    if not path:
+        return jsonify({'success': False, 'error': 'Report expired, generate it again'}), 404
+    return send_file(os.path.abspath(path), mimetype='application/pdf', as_attachment=True,
+                     download_name=f"vit_report_{report_type}_{datetime.now().strftime('%Y%m%d')}.pdf",
+                     etag=key, max_age=0)
+
+@app.route('/admin/snapshot', methods=['GET', 'POST'])
+@admin_required
+def admin_snapshot():
+    """POST queues a Parquet analytics snapshot; GET describes the current one"""
+    if request.method == 'POST':
+        job_id = Jobs.enqueue('snapshot', created_by=session['admin_id'])
+        AdminModel.log_action(
+            admin_id=session['admin_id'],
+            action_type='SNAPSHOT',
+            target_type='SYSTEM',
+            details=f'Analytics snapshot queued (job {job_id})',
+            request=request
+        )
+        return job_accepted(job_id)
+    return jsonify({'success': True, 'snapshot': snapshot.manifest()})
+
+@app.route('/admin/jobs/<int:job_id>')
+@admin_required
+def admin_job_status(job_id):
+    """Status and progress of a background job"""
+    return job_status_response(Jobs.get(job_id), 'admin_job_result')
+
+@app.route('/admin/jobs/<int:job_id>/result')
+@admin_required
+def admin_job_result(job_id):
+    """Download a finished job's result file"""
+    return job_result_response(Jobs.get(job_id))
+
 @app.route('/admin/logs')
 @admin_required
 def admin_logs():
-    logs = AdminModel.get_all_logs(limit=200)
+    page_size = request.args.get('page_size')
+    try:
+        page = ActivityLog.get_page(request.args.get('cursor'), page_size)
+    except ValueError:
+        flash('Invalid page link, showing the first page', 'error')
+        page = ActivityLog.get_page(None, page_size)
+    
     return render_template('admin_logs.html',
-                         logs=logs,
+                         logs=page['items'],
+                         next_url=page_url(page['next_cursor']) if page['next_cursor'] else None,
+                         first_url=page_url() if request.args.get('cursor') else None,
                          admin_name=session['admin_name'])
 
 @app.route('/admin/users')
 @admin_required
 def admin_users():
-    users = AdminModel.get_all_users()
+    directory = {
+        'role': request.args.get('role', ''),
+        'q': request.args.get('q', '').strip(),
+        'sort': request.args.get('sort', 'name')
+    }
+    page_size = request.args.get('page_size')
+    try:
+        page = AdminModel.get_users_page(directory['role'], directory['q'], directory['sort'],
+                                         request.args.get('cursor'), page_size)
+    except ValueError:
+        flash('Invalid page link, showing the first page', 'error')
+        page = AdminModel.get_users_page(directory['role'], directory['q'], directory['sort'],
+                                         None, page_size)
+    
     db = Database()
     connection = db.get_connection()
     try:
@@ -857,20 +1276,37 @@ def admin_users():
         connection.close()
     
     return render_template('admin_users.html',
-                         users=users,
+                         users=page['items'],
+                         directory=directory,
+                         stats=AdminCache.get_or_compute(STATS_KEY, AdminModel.get_system_stats),
+                         next_url=page_url(page['next_cursor']) if page['next_cursor'] else None,
+                         first_url=page_url() if request.args.get('cursor') else None,
                          proctors=proctors,
                          admin_name=session['admin_name'])
 
+@app.route('/admin/users/lookup')
+@admin_required
+def admin_user_lookup():
+    """Typeahead over student, proctor and supervisor IDs and names"""
+    started = perf_counter()
+    user_types = [value for value in request.args.getlist('type') if value in USER_SOURCES]
+    try:
+        limit = max(1, min(int(request.args.get('limit', 10)), 50))
+    except ValueError:
+        limit = 10
+    
+    results = UserIndex.lookup(request.args.get('q', ''), user_types or None, limit)
+    return jsonify({
+        'results': results,
+        'took_ms': round((perf_counter() - started) * 1000, 3)
+    })
+
 @app.route('/admin/add-user', methods=['POST'])
 @admin_required
 def admin_add_user():
     user_type = request.form['user_type']
-    
-    # DEBUG: Print all form data
-    print(f"\n{'='*50}")
-    print(f"ADD USER REQUEST - Type: {user_type}")
-    print(f"Form data: {dict(request.form)}")
-    print(f"{'='*50}\n")
+    # Field values include the new user's password, so only the type is logged
+    log.info("Add user request", extra={'user_type': user_type, 'admin_id': session.get('admin_id')})
     
     try:
         if user_type == 'proctor':
@@ -976,8 +1412,7 @@ def admin_add_user():
         
     except Exception as e:
         flash(f'Error adding user: {str(e)}', 'error')
-        print(f"Error in admin_add_user: {e}")
-        traceback.print_exc()
+        log.exception("Error in admin_add_user")
     
     return redirect(url_for('admin_users'))
 
@@ -1184,7 +1619,11 @@ def admin_delete_user():
                     return redirect(url_for('admin_users'))
             
             cursor.execute(f"DELETE FROM {table_name} WHERE {id_column} = %s", (user_id,))
+            if cursor.rowcount > 0 and user_type in USER_METRICS:
+                StatCounters.bump(cursor, {USER_METRICS[user_type]: -1})
             connection.commit()
+            AdminCache.invalidate(STATS_KEY)
+            UserIndex.remove(user_type, user_id)
             
             # Log the action
             AdminModel.log_action(
@@ -1296,12 +1735,7 @@ def setup_sample_data():
 @app.route('/debug/user-form', methods=['POST'])
 def debug_user_form():
     """Debug endpoint to see what form data is being sent"""
-    print("\n" + "="*60)
-    print("DEBUG USER FORM DATA")
-    print(f"Request method: {request.method}")
-    print(f"Form data: {dict(request.form)}")
-    print(f"Headers: {dict(request.headers)}")
-    print("="*60 + "\n")
+    log.debug("Debug user form", extra={'fields': sorted(request.form)})
     
     return jsonify({
         'success': True,
@@ -0,0 +1,166 @@
+# [file name]: app_logging.py
+import atexit
+import copy
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+import threading
+from datetime import datetime, timezone
+
+# DEBUG, INFO, WARNING or ERROR
+LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
+
+# 'json' for one object per line, 'text' for a readable console
+LOG_FORMAT = os.getenv('LOG_FORMAT', 'json')
+
+# Records waiting for the writer thread; further records are dropped and counted
+LOG_QUEUE_SIZE = int(os.getenv('LOG_QUEUE_SIZE', 10000))
+
+# Sampled events write their first occurrence, then one in every LOG_SAMPLE_EVERY
+LOG_SAMPLE_EVERY = int(os.getenv('LOG_SAMPLE_EVERY', 100))
+
+ROOT_LOGGER = 'vit_lms'
+
+# Sample keys remembered before the counts start over
+SAMPLE_KEYS = 10000
+
+# Attributes every LogRecord has; anything else was passed through `extra`
+_RECORD_FIELDS = set(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+def sampled(key, **fields):
+    """`extra` for a high-frequency event: records sharing `key` are sampled"""
+    return dict(fields, sample=key)
+
+def _extras(record):
+    return {key: value for key, value in vars(record).items()
+            if key not in _RECORD_FIELDS and key != 'sample'}
+
+class SampleFilter(logging.Filter):
+    """Keeps the 1st, (N+1)th, (2N+1)th... record of each sample key, noting how many it stands for"""
+    
+    def __init__(self, every=LOG_SAMPLE_EVERY):
+        super().__init__()
+        self.every = max(1, every)
+        self._seen = {}
+        self._lock = threading.Lock()
+    
+    def filter(self, record):
+        key = getattr(record, 'sample', None)
+        if key is None:
+            return True
+        with self._lock:
+            if len(self._seen) >= SAMPLE_KEYS and key not in self._seen:
+                self._seen.clear()
+            seen = self._seen[key] = self._seen.get(key, 0) + 1
+        if (seen - 1) % self.every:
+            return False
+        record.occurrences = seen
+        if seen > 1:
+            record.sample_rate = self.every
+        return True
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record):
+        entry = {
+            'ts': datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'msg': record.getMessage(),
+            'thread': record.threadName,
+            **_extras(record)
+        }
+        if record.exc_text:
+            entry['exc'] = record.exc_text
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__('%(asctime)s %(levelname)-7s %(name)s: %(message)s')
+    
+    def format(self, record):
+        text = super().format(record)
+        fields = _extras(record)
+        if fields:
+            first, _, rest = text.partition('\n')
+            text = first + ' ' + ' '.join(f"{key}={value}" for key, value in fields.items()) + (f"\n{rest}" if rest else '')
+        return text
+
+class _QueueHandler(logging.handlers.QueueHandler):
+    """Hands records to the writer thread without ever waiting on it"""
+    
+    def __init__(self, log_queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+    
+    def prepare(self, record):
+        # Rendered here, while the arguments and traceback still exist; the writer
+        # thread only serialises
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+    
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+_setup_lock = threading.Lock()
+_handler = None
+_listener = None
+
+def _start_listener():
+    global _listener
+    output = logging.StreamHandler(sys.stdout)
+    output.setFormatter(TextFormatter() if LOG_FORMAT == 'text' else JsonFormatter())
+    _listener = logging.handlers.QueueListener(_handler.queue, output)
+    _listener.start()
+
+def _stop_listener():
+    # Flushes whatever is still queued
+    if _listener is not None:
+        _listener.stop()
+
+def _restart_in_child():
+    # A forked child has a copy of the queue but no writer thread
+    global _setup_lock
+    _setup_lock = threading.Lock()
+    if _handler is not None:
+        _handler.queue = queue.Queue(LOG_QUEUE_SIZE)
+        _start_listener()
+
+def setup_logging():
+    """Route the application's loggers through a bounded queue to one writer thread"""
+    global _handler
+    if _handler is not None:
+        return
+    with _setup_lock:
+        if _handler is not None:
+            return
+        handler = _QueueHandler(queue.Queue(LOG_QUEUE_SIZE))
+        handler.addFilter(SampleFilter())
+        root = logging.getLogger(ROOT_LOGGER)
+        root.setLevel(LOG_LEVEL)
+        root.addHandler(handler)
+        root.propagate = False
+        _handler = handler
+        _start_listener()
+        atexit.register(_stop_listener)
+        os.register_at_fork(after_in_child=_restart_in_child)
+
+def get_logger(name):
+    """Logger for module `name` under the application's root logger"""
+    setup_logging()
+    return logging.getLogger(f"{ROOT_LOGGER}.{name}")
+
+def stats():
+    if _handler is None:
+        return {'queued': 0, 'dropped': 0}
+    return {'queued': _handler.queue.qsize(), 'dropped': _handler.dropped}
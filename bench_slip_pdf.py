@@ -0,0 +1,138 @@
+# [file name]: bench_slip_pdf.py
+"""Compare the canvas slip renderer with the platypus layout it replaced
+
+    python bench_slip_pdf.py [slips]
+"""
+import sys
+from datetime import datetime
+from io import BytesIO
+from time import perf_counter
+sys.path.append('.')
+from reportlab.lib import colors
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
+from pdf_generator import PDFGenerator
+
+# Required speed-up of the canvas renderer over the platypus baseline
+TARGET = 5.0
+
+SLIP = {
+    'student_name': 'Aarav Sharma',
+    'reg_number': '21BCE10001',
+    'hostel_block': 'A',
+    'room_number': '214',
+    'from_date': '2024-03-01',
+    'to_date': '2024-03-04',
+    'from_time': '09:00',
+    'to_time': '18:30',
+    'proctor_name': 'Dr. Meera Iyer',
+    'verified_at': '2024-03-01 09:12:45',
+    'supervisor_name': 'Rakesh Kumar',
+    'destination': 'Chennai'
+}
+
+def platypus_slip(slip_data):
+    """The per-slip platypus layout used before the canvas renderer"""
+    buffer = BytesIO()
+    
+    # Create PDF document
+    doc = SimpleDocTemplate(buffer, pagesize=(6*inch, 4*inch))  # Smaller size for slip
+    elements = []
+    styles = getSampleStyleSheet()
+    
+    # Custom styles for slip
+    header_style = ParagraphStyle(
+        'SlipHeader',
+        parent=styles['Heading1'],
+        fontSize=14,
+        alignment=1,
+        spaceAfter=10,
+        textColor=colors.HexColor('#dc3545')
+    )
+    
+    normal_bold = ParagraphStyle(
+        'NormalBold',
+        parent=styles['Normal'],
+        fontName='Helvetica-Bold'
+    )
+    
+    # Header
+    elements.append(Paragraph("VIT LEAVE SLIP", header_style))
+    
+    # Student Information
+    elements.append(Paragraph("STUDENT INFORMATION", styles['Heading2']))
+    
+    student_info = f"""
+    <b>Name:</b> {slip_data.get('student_name', 'N/A')}<br/>
+    <b>Registration No:</b> {slip_data.get('reg_number', 'N/A')}<br/>
+    <b>Hostel Block:</b> {slip_data.get('hostel_block', 'N/A')}<br/>
+    <b>Room No:</b> {slip_data.get('room_number', 'N/A')}<br/>
+    """
+    elements.append(Paragraph(student_info, styles['Normal']))
+    
+    elements.append(Spacer(1, 10))
+    
+    # Leave Details
+    elements.append(Paragraph("LEAVE DETAILS", styles['Heading2']))
+    
+    leave_info = f"""
+    <b>From:</b> {slip_data.get('from_date', 'N/A')} at {slip_data.get('from_time', 'N/A')}<br/>
+    <b>To:</b> {slip_data.get('to_date', 'N/A')} at {slip_data.get('to_time', 'N/A')}<br/>
+    <b>Destination:</b> {slip_data.get('destination', 'Not specified')}<br/>
+    <b>Proctor:</b> {slip_data.get('proctor_name', 'N/A')}<br/>
+    """
+    elements.append(Paragraph(leave_info, styles['Normal']))
+    
+    elements.append(Spacer(1, 10))
+    
+    # Verification Details
+    elements.append(Paragraph("VERIFICATION", styles['Heading2']))
+    
+    verify_info = f"""
+    <b>Verified By:</b> {slip_data.get('supervisor_name', 'N/A')}<br/>
+    <b>Verified At:</b> {slip_data.get('verified_at', 'N/A')}<br/>
+    <b>Status:</b> <font color="green"><b>APPROVED</b></font><br/>
+    """
+    elements.append(Paragraph(verify_info, styles['Normal']))
+    
+    elements.append(Spacer(1, 20))
+    
+    # Disclaimer
+    elements.append(Paragraph(
+        "This slip must be presented when leaving and returning to campus.",
+        ParagraphStyle('Disclaimer', parent=styles['Normal'], fontSize=8, alignment=1)
+    ))
+    
+    elements.append(Paragraph(
+        f"Slip ID: {datetime.now().strftime('%Y%m%d%H%M%S')}",
+        ParagraphStyle('SlipID', parent=styles['Normal'], fontSize=8, alignment=1)
+    ))
+    
+    # Build PDF
+    doc.build(elements)
+    
+    # Get PDF data
+    pdf_data = buffer.getvalue()
+    buffer.close()
+    
+    return pdf_data
+
+def per_slip(render, slips):
+    render(SLIP)    # warm-up
+    start = perf_counter()
+    for _ in range(slips):
+        render(SLIP)
+    return (perf_counter() - start) / slips
+
+def main(slips=200):
+    baseline = per_slip(platypus_slip, slips)
+    fast = per_slip(PDFGenerator.generate_slip_pdf, slips)
+    speedup = baseline / fast
+    print(f"platypus: {baseline * 1000:.2f} ms/slip")
+    print(f"canvas:   {fast * 1000:.2f} ms/slip")
+    print(f"speed-up: {speedup:.1f}x (target {TARGET:.0f}x)")
+    return speedup >= TARGET
+
+if __name__ == '__main__':
+    sys.exit(0 if main(int(sys.argv[1]) if len(sys.argv) > 1 else 200) else 1)
@@ -1,5 +1,6 @@
 # [file name]: database.py
 import pymysql
+from pymysql.constants import SERVER_STATUS
 import os
 from dotenv import load_dotenv
 import bcrypt
@@ -7,10 +8,27 @@ import traceback
 from urllib.parse import urlparse
 from threading import Lock
 import time
+from request_metrics import InstrumentedConnection, timed
+from app_logging import get_logger, sampled
+
+log = get_logger('database')
 
 # Load environment variables for local development
 load_dotenv('.env')
 
+# InnoDB deadlock and lock wait timeout: MySQL has rolled back the transaction
+# (or at least the statement), so the caller's earlier writes may be gone
+TRANSACTION_ROLLED_BACK = (1213, 1205)
+
+def rolled_back(error):
+    """True when `error` means the current transaction can no longer be committed as written"""
+    return isinstance(error, pymysql.err.MySQLError) and bool(error.args) and error.args[0] in TRANSACTION_ROLLED_BACK
+
+def in_transaction(cursor):
+    """True when `cursor`'s connection is inside a begin() transaction rather than autocommitting"""
+    status = getattr(getattr(cursor, 'connection', None), 'server_status', 0) or 0
+    return bool(status & SERVER_STATUS.SERVER_STATUS_IN_TRANS)
+
 class Database:
     # Singleton connection pool
     _connection_pool = None
@@ -24,15 +42,9 @@ class Database:
         self.database = os.getenv('MYSQLDATABASE')
         self.port = int(os.getenv('MYSQLPORT', 3306))
         
-        print(f"DEBUG: MYSQLHOST: {self.host}")
-        print(f"DEBUG: MYSQLUSER: {self.user}")
-        print(f"DEBUG: MYSQLDATABASE: {self.database}")
-        print(f"DEBUG: MYSQLPORT: {self.port}")
-        
         # If Railway variables are not set, try MYSQL_URL
         if not all([self.host, self.user, self.password, self.database]):
             mysql_url = os.getenv('MYSQL_URL')
-            print(f"DEBUG: MYSQL_URL: {mysql_url}")
             
             if mysql_url:
                 try:
@@ -59,7 +71,7 @@ class Database:
                             self.port = int(host_port[1]) if len(host_port) > 1 else 3306
                             self.database = host_port_db[1] if len(host_port_db) > 1 else 'railway'
                 except Exception as e:
-                    print(f"Error parsing MYSQL_URL: {e}")
+                    log.error("Error parsing MYSQL_URL: %s", e)
         
         # Fallback to individual variables (for local development)
         if not self.host:
@@ -78,20 +90,14 @@ class Database:
             # Try to get the actual host from Railway's internal DNS
             self.host = os.getenv('MYSQLHOST', 'mysql.railway.internal')
         
-        # Debug: Show connection details (mask password)
-        print("\n" + "="*50)
-        print("DATABASE CONNECTION DETAILS:")
-        print(f"Host: {self.host}")
-        print(f"User: {self.user}")
-        print(f"Password: {'*' * len(self.password) if self.password else '(empty)'}")
-        print(f"Database: {self.database}")
-        print(f"Port: {self.port}")
-        print("="*50 + "\n")
+        # Built for every model call, so only shown at DEBUG
+        log.debug("Database settings", extra={'host': self.host, 'user': self.user, 'database': self.database,
+                                              'port': self.port, 'password_set': bool(self.password)})
     
     def _create_connection(self):
         """Create a fresh database connection with proper timeout settings"""
         try:
-            connection = pymysql.connect(
+            connection = InstrumentedConnection(
                 host=self.host,
                 user=self.user,
                 password=self.password,
@@ -110,21 +116,19 @@ class Database:
                 cursor.execute("SELECT 1")
                 cursor.fetchone()
             
-            print("✓ Database connection created successfully!")
+            log.debug("Database connection created", extra=sampled('db_connect'))
             return connection
         except pymysql.err.OperationalError as e:
-            print(f"✗ Database connection failed: {e}")
-            print(f"\nTroubleshooting:")
-            print(f"1. Check if MySQL service is running in Railway")
-            print(f"2. Trying to connect to: {self.host}:{self.port}")
-            print(f"3. Error code: {e.args[0] if e.args else 'Unknown'}")
+            log.error("Database connection failed: %s", e, extra={
+                'host': self.host, 'port': self.port, 'code': e.args[0] if e.args else None
+            })
             
             # Try alternative connection method for Railway
             if 'railway' in str(self.host).lower():
-                print("\nTrying alternative Railway connection...")
+                log.info("Trying alternative Railway connection")
                 try:
                     # Try with mysql.railway.internal (internal Railway DNS)
-                    connection = pymysql.connect(
+                    connection = InstrumentedConnection(
                         host='mysql.railway.internal',
                         user=self.user,
                         password=self.password,
@@ -137,36 +141,40 @@ class Database:
                         write_timeout=30,
                         autocommit=True
                     )
-                    print("✓ Connected via mysql.railway.internal!")
+                    log.info("Connected via mysql.railway.internal")
                     return connection
                 except Exception as e2:
-                    print(f"✗ Alternative connection also failed: {e2}")
+                    log.error("Alternative connection also failed: %s", e2)
             
             raise
     
     def get_connection(self):
         """Get a database connection with automatic reconnection"""
+        with timed('db_connect_seconds'):
+            return self._connect_with_retry()
+    
+    def _connect_with_retry(self):
         try:
             connection = self._create_connection()
             return connection
         except Exception as e:
-            print(f"⚠ Connection failed, retrying in 2 seconds...")
+            log.warning("Connection failed, retrying in 2 seconds")
             time.sleep(2)
             try:
                 connection = self._create_connection()
-                print("✅ Reconnected successfully!")
+                log.info("Reconnected")
                 return connection
             except Exception as e2:
-                print(f"✗ Reconnection failed: {e2}")
+                log.error("Reconnection failed: %s", e2)
                 # Create a simple in-memory connection for emergency setup
-                print("⚠ Creating emergency setup mode...")
+                log.warning("Creating emergency setup mode")
                 return self._create_emergency_connection()
     
     def _create_emergency_connection(self):
         """Create a minimal connection for emergency setup"""
         try:
             # Try to connect without specifying database first
-            connection = pymysql.connect(
+            connection = InstrumentedConnection(
                 host=self.host,
                 user=self.user,
                 password=self.password,
@@ -183,19 +191,21 @@ class Database:
             
             return connection
         except Exception as e:
-            print(f"✗ Emergency connection also failed: {e}")
+            log.error("Emergency connection also failed: %s", e)
             raise
     
     @staticmethod
     def hash_password(password):
-        return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
+        with timed('bcrypt_seconds'):
+            return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt()).decode('utf-8')
     
     @staticmethod
     def check_password(hashed_password, password):
         try:
-            return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
+            with timed('bcrypt_seconds'):
+                return bcrypt.checkpw(password.encode('utf-8'), hashed_password.encode('utf-8'))
         except Exception as e:
-            print(f"Password check error: {e}")
+            log.warning("Password check error: %s", e)
             return False
     
     def safe_execute(self, sql, params=None):
@@ -219,11 +229,11 @@ class Database:
                         return cursor.rowcount
             except pymysql.err.OperationalError as e:
                 if attempt < max_retries - 1:
-                    print(f"⚠ Query failed (attempt {attempt+1}), retrying...")
+                    log.warning("Query failed (attempt %d), retrying", attempt + 1)
                     time.sleep(1)
                     continue
                 else:
-                    print(f"✗ Query failed after {max_retries} attempts: {e}")
+                    log.error("Query failed after %d attempts: %s", max_retries, e)
                     raise
             finally:
                 if connection:
@@ -251,7 +261,9 @@ class Database:
                             room_number VARCHAR(10) NOT NULL,
                             phone VARCHAR(15),
                             parent_phone VARCHAR(15),
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            INDEX idx_students_block (hostel_block),
+                            INDEX idx_students_name (name)
                         )
                         ''',
                         # Proctors table
@@ -262,7 +274,8 @@ class Database:
                             password_hash VARCHAR(255) NOT NULL,
                             email VARCHAR(100),
                             department VARCHAR(100),
-                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            INDEX idx_proctors_name (name)
                         )
                         ''',
                         # Leaves table
@@ -289,7 +302,16 @@ class Database:
                             flagged_by VARCHAR(50),
                             flag_reason TEXT,
                             flagged_at TIMESTAMP NULL,
-                            verified_at TIMESTAMP NULL
+                            verified_at TIMESTAMP NULL,
+                            INDEX idx_leaves_applied (applied_at, leave_id),
+                            INDEX idx_leaves_status_applied (status, applied_at),
+                            INDEX idx_leaves_proctor_applied (proctor_id, applied_at),
+                            INDEX idx_leaves_student_applied (student_reg, applied_at),
+                            INDEX idx_leaves_suspicious_applied (suspicious_flag, applied_at),
+                            INDEX idx_leaves_flagged (suspicious_flag, flagged_at),
+                            INDEX idx_leaves_destination (destination),
+                            INDEX idx_leaves_status_from (status, from_date),
+                            FULLTEXT INDEX ft_leaves_text (reason, destination, flag_reason)
                         )
                         ''',
                         # Hostel supervisors table
@@ -371,13 +393,99 @@ class Database:
                             timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
                             notes TEXT
                         )
+                        ''',
+                        # Materialized dashboard counters
+                        '''
+                        CREATE TABLE IF NOT EXISTS stat_counters (
+                            day DATE NOT NULL,
+                            metric VARCHAR(50) NOT NULL,
+                            value BIGINT NOT NULL DEFAULT 0,
+                            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                            PRIMARY KEY (day, metric)
+                        )
+                        ''',
+                        # Unified append-only activity log
+                        '''
+                        CREATE TABLE IF NOT EXISTS activity_events (
+                            id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                            log_type VARCHAR(20) NOT NULL,
+                            user_id VARCHAR(50),
+                            action VARCHAR(100) NOT NULL,
+                            details TEXT,
+                            ip_address VARCHAR(45),
+                            leave_id INT NULL,
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            source_table VARCHAR(30) NULL,
+                            source_id INT NULL,
+                            INDEX idx_activity_created (created_at, id)
+                        )
+                        ''',
+                        # Background jobs (reports, exports, snapshots)
+                        '''
+                        CREATE TABLE IF NOT EXISTS jobs (
+                            job_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                            job_type VARCHAR(50) NOT NULL,
+                            params TEXT,
+                            status ENUM('queued', 'running', 'done', 'failed') NOT NULL DEFAULT 'queued',
+                            attempts INT NOT NULL DEFAULT 0,
+                            max_attempts INT NOT NULL DEFAULT 3,
+                            run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            locked_by VARCHAR(100) NULL,
+                            heartbeat_at TIMESTAMP NULL,
+                            progress INT NOT NULL DEFAULT 0,
+                            progress_total INT NULL,
+                            result TEXT,
+                            result_path VARCHAR(255) NULL,
+                            error TEXT,
+                            created_by VARCHAR(50),
+                            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                            started_at TIMESTAMP NULL,
+                            finished_at TIMESTAMP NULL,
+                            INDEX idx_jobs_claim (status, run_after),
+                            INDEX idx_jobs_finished (status, finished_at)
+                        )
+                        ''',
+                        # Leave counts per day and month, by block and proctor
+                        '''
+                        CREATE TABLE IF NOT EXISTS leave_rollup_daily (
+                            day DATE NOT NULL,
+                            hostel_block VARCHAR(10) NOT NULL DEFAULT '',
+                            proctor_id VARCHAR(20) NOT NULL DEFAULT '',
+                            total INT NOT NULL DEFAULT 0,
+                            pending INT NOT NULL DEFAULT 0,
+                            approved INT NOT NULL DEFAULT 0,
+                            rejected INT NOT NULL DEFAULT 0,
+                            completed INT NOT NULL DEFAULT 0,
+                            suspicious INT NOT NULL DEFAULT 0,
+                            PRIMARY KEY (day, hostel_block, proctor_id),
+                            INDEX idx_daily_block (hostel_block, day),
+                            INDEX idx_daily_proctor (proctor_id, day)
+                        )
+                        ''',
+                        '''
+                        CREATE TABLE IF NOT EXISTS leave_rollup_monthly (
+                            month DATE NOT NULL,
+                            hostel_block VARCHAR(10) NOT NULL DEFAULT '',
+                            proctor_id VARCHAR(20) NOT NULL DEFAULT '',
+                            total INT NOT NULL DEFAULT 0,
+                            pending INT NOT NULL DEFAULT 0,
+                            approved INT NOT NULL DEFAULT 0,
+                            rejected INT NOT NULL DEFAULT 0,
+                            completed INT NOT NULL DEFAULT 0,
+                            suspicious INT NOT NULL DEFAULT 0,
+                            PRIMARY KEY (month, hostel_block, proctor_id),
+                            INDEX idx_monthly_block (hostel_block, month),
+                            INDEX idx_monthly_proctor (proctor_id, month)
+                        )
                         '''
                     ]
                     
                     table_names = [
                         'students', 'proctors', 'leaves', 'hostel_supervisors',
                         'admins', 'verification_logs', 'admin_logs', 
-                        'admin_leave_flags', 'parent_contacts', 'leave_audit_log'
+                        'admin_leave_flags', 'parent_contacts', 'leave_audit_log',
+                        'stat_counters', 'activity_events', 'jobs',
+                        'leave_rollup_daily', 'leave_rollup_monthly'
                     ]
                     
                     for i, sql in enumerate(tables):
@@ -1,5 +1,7 @@
 # db_migration.py
 from database import Database
+from stats_counters import StatCounters
+from activity_log import ActivityLog
 import traceback
 
 def run_migrations():
@@ -54,6 +56,36 @@ def run_migrations():
                 cursor.execute("ALTER TABLE leaves ADD COLUMN parent_contacted BOOLEAN DEFAULT FALSE")
                 print("✓ Added 'parent_contacted' column")
             
+            # Indexes backing the admin leave search, full-text search, user directory and pagination
+            search_indexes = [
+                ('leaves', 'idx_leaves_applied', 'INDEX', '(applied_at, leave_id)'),
+                ('leaves', 'idx_leaves_status_applied', 'INDEX', '(status, applied_at)'),
+                ('leaves', 'idx_leaves_proctor_applied', 'INDEX', '(proctor_id, applied_at)'),
+                ('leaves', 'idx_leaves_student_applied', 'INDEX', '(student_reg, applied_at)'),
+                ('leaves', 'idx_leaves_suspicious_applied', 'INDEX', '(suspicious_flag, applied_at)'),
+                ('leaves', 'idx_leaves_flagged', 'INDEX', '(suspicious_flag, flagged_at)'),
+                ('leaves', 'idx_leaves_destination', 'INDEX', '(destination)'),
+                ('leaves', 'idx_leaves_status_from', 'INDEX', '(status, from_date)'),
+                ('leaves', 'ft_leaves_text', 'FULLTEXT INDEX', '(reason, destination, flag_reason)'),
+                ('students', 'idx_students_block', 'INDEX', '(hostel_block)'),
+                ('students', 'idx_students_name', 'INDEX', '(name)'),
+                ('proctors', 'idx_proctors_name', 'INDEX', '(name)')
+            ]
+            
+            for table, index_name, index_type, columns in search_indexes:
+                cursor.execute("""
+                    SELECT INDEX_NAME 
+                    FROM INFORMATION_SCHEMA.STATISTICS 
+                    WHERE TABLE_SCHEMA = %s 
+                    AND TABLE_NAME = %s 
+                    AND INDEX_NAME = %s
+                """, (db.database, table, index_name))
+                
+                if not cursor.fetchone():
+                    print(f"Adding '{index_name}' index to {table} table...")
+                    cursor.execute(f"ALTER TABLE {table} ADD {index_type} {index_name} {columns}")
+                    print(f"✓ Added '{index_name}' index")
+            
             # Create missing tables
             tables_sql = [
                 """
@@ -89,6 +121,86 @@ def run_migrations():
                     notes TEXT,
                     FOREIGN KEY (leave_id) REFERENCES leaves(leave_id) ON DELETE CASCADE
                 )
+                """,
+                """
+                CREATE TABLE IF NOT EXISTS stat_counters (
+                    day DATE NOT NULL,
+                    metric VARCHAR(50) NOT NULL,
+                    value BIGINT NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+                    PRIMARY KEY (day, metric)
+                )
+                """,
+                """
+                CREATE TABLE IF NOT EXISTS activity_events (
+                    id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    log_type VARCHAR(20) NOT NULL,
+                    user_id VARCHAR(50),
+                    action VARCHAR(100) NOT NULL,
+                    details TEXT,
+                    ip_address VARCHAR(45),
+                    leave_id INT NULL,
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    source_table VARCHAR(30) NULL,
+                    source_id INT NULL,
+                    INDEX idx_activity_created (created_at, id)
+                )
+                """,
+                """
+                CREATE TABLE IF NOT EXISTS jobs (
+                    job_id BIGINT AUTO_INCREMENT PRIMARY KEY,
+                    job_type VARCHAR(50) NOT NULL,
+                    params TEXT,
+                    status ENUM('queued', 'running', 'done', 'failed') NOT NULL DEFAULT 'queued',
+                    attempts INT NOT NULL DEFAULT 0,
+                    max_attempts INT NOT NULL DEFAULT 3,
+                    run_after TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    locked_by VARCHAR(100) NULL,
+                    heartbeat_at TIMESTAMP NULL,
+                    progress INT NOT NULL DEFAULT 0,
+                    progress_total INT NULL,
+                    result TEXT,
+                    result_path VARCHAR(255) NULL,
+                    error TEXT,
+                    created_by VARCHAR(50),
+                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    started_at TIMESTAMP NULL,
+                    finished_at TIMESTAMP NULL,
+                    INDEX idx_jobs_claim (status, run_after),
+                    INDEX idx_jobs_finished (status, finished_at)
+                )
+                """,
+                """
+                CREATE TABLE IF NOT EXISTS leave_rollup_daily (
+                    day DATE NOT NULL,
+                    hostel_block VARCHAR(10) NOT NULL DEFAULT '',
+                    proctor_id VARCHAR(20) NOT NULL DEFAULT '',
+                    total INT NOT NULL DEFAULT 0,
+                    pending INT NOT NULL DEFAULT 0,
+                    approved INT NOT NULL DEFAULT 0,
+                    rejected INT NOT NULL DEFAULT 0,
+                    completed INT NOT NULL DEFAULT 0,
+                    suspicious INT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (day, hostel_block, proctor_id),
+                    INDEX idx_daily_block (hostel_block, day),
+                    INDEX idx_daily_proctor (proctor_id, day)
+                )
+                """,
+                """
+                CREATE TABLE IF NOT EXISTS leave_rollup_monthly (
+                    month DATE NOT NULL,
+                    hostel_block VARCHAR(10) NOT NULL DEFAULT '',
+                    proctor_id VARCHAR(20) NOT NULL DEFAULT '',
+                    total INT NOT NULL DEFAULT 0,
+                    pending INT NOT NULL DEFAULT 0,
+                    approved INT NOT NULL DEFAULT 0,
+                    rejected INT NOT NULL DEFAULT 0,
+                    completed INT NOT NULL DEFAULT 0,
+                    suspicious INT NOT NULL DEFAULT 0,
+                    PRIMARY KEY (month, hostel_block, proctor_id),
+                    INDEX idx_monthly_block (hostel_block, month),
+                    INDEX idx_monthly_proctor (proctor_id, month)
+                )
                 """
             ]
             
@@ -96,6 +208,14 @@ def run_migrations():
                 cursor.execute(sql)
             
             connection.commit()
+            
+            # Seed the dashboard counters from the existing rows
+            StatCounters.reconcile()
+            print("✓ Dashboard counters reconciled")
+            
+            # Copy existing log history into the unified activity log
+            ActivityLog.backfill()
+            
             print("\n" + "="*60)
             print("✓ ALL MIGRATIONS COMPLETED SUCCESSFULLY!")
             print("="*60)
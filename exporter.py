@@ -0,0 +1,285 @@
+# [file name]: exporter.py
+import csv
+import io
+import itertools
+import os
+import re
+import zipfile
+from datetime import date, datetime, timedelta
+from decimal import Decimal
+from xml.sax.saxutils import escape
+import pymysql
+from database import Database
+
+# Rows pulled from the unbuffered cursor, and written out, per chunk
+EXPORT_BATCH = int(os.getenv('EXPORT_BATCH_ROWS', 1000))
+
+# Worksheet row limit in Excel, header row included
+XLSX_MAX_ROWS = 1048576
+
+# Spreadsheet apps evaluate cells starting with these as formulas
+FORMULA_PREFIXES = ('=', '+', '-', '@', '\t', '\r')
+
+# Control characters that are not allowed in XML
+_XML_INVALID = re.compile('[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+LEAVE_COLUMNS = [
+    ('leave_id', 'Leave ID'),
+    ('student_name', 'Student Name'),
+    ('reg_number', 'Reg Number'),
+    ('hostel_block', 'Hostel Block'),
+    ('leave_type', 'Leave Type'),
+    ('from_date', 'From Date'),
+    ('from_time', 'From Time'),
+    ('to_date', 'To Date'),
+    ('to_time', 'To Time'),
+    ('destination', 'Destination'),
+    ('reason', 'Reason'),
+    ('status', 'Status'),
+    ('proctor_name', 'Proctor'),
+    ('applied_at', 'Applied At'),
+    ('approved_at', 'Approved At'),
+    ('verification_count', 'Verifications'),
+    ('suspicious_flag', 'Suspicious'),
+    ('flag_reason', 'Flag Reason')
+]
+
+LOG_COLUMNS = [
+    ('id', 'Event ID'),
+    ('created_at', 'Timestamp'),
+    ('log_type', 'Type'),
+    ('user_id', 'User'),
+    ('action', 'Action'),
+    ('details', 'Details'),
+    ('ip_address', 'IP Address'),
+    ('leave_id', 'Leave ID')
+]
+
+LOGS_SQL = """
+    SELECT id, created_at, log_type, user_id, action, details, ip_address, leave_id
+    FROM activity_events
+    {where_sql}
+    ORDER BY created_at, id
+"""
+
+# Sheets of the full data export; credentials are never selected
+BACKUP_SHEETS = [
+    ('Students', "SELECT reg_number, name, hostel_block, room_number, phone, proctor_id FROM students ORDER BY reg_number",
+     ['reg_number', 'name', 'hostel_block', 'room_number', 'phone', 'proctor_id']),
+    ('Proctors', "SELECT employee_id, name, email, department FROM proctors ORDER BY employee_id",
+     ['employee_id', 'name', 'email', 'department']),
+    ('Supervisors', "SELECT supervisor_id, name, email, hostel_block FROM hostel_supervisors ORDER BY supervisor_id",
+     ['supervisor_id', 'name', 'email', 'hostel_block'])
+]
+
+def stream_rows(sql, params=None):
+    """Yield rows one at a time from an unbuffered cursor on a dedicated connection"""
+    connection = Database().get_connection()
+    try:
+        cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+        cursor.execute(sql, params)
+        while True:
+            rows = cursor.fetchmany(EXPORT_BATCH)
+            if not rows:
+                break
+            yield from rows
+    finally:
+        # Closing the cursor would read out any rows left after an aborted
+        # download; closing the connection just drops them
+        connection.close()
+
+def cell_value(value):
+    """Plain export value: times as HH:MM, datetimes without the T, None as blank"""
+    if value is None:
+        return ''
+    if isinstance(value, bool):
+        return 'Yes' if value else 'No'
+    if isinstance(value, timedelta):
+        total_seconds = int(value.total_seconds())
+        return f"{total_seconds // 3600:02d}:{(total_seconds % 3600) // 60:02d}"
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    if isinstance(value, str) and value.startswith(FORMULA_PREFIXES):
+        return "'" + value
+    return value
+
+def csv_stream(columns, rows):
+    """Encoded CSV chunks: a header line, then EXPORT_BATCH rows per chunk"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    # BOM so Excel opens the UTF-8 file with the right encoding
+    buffer.write('\ufeff')
+    writer.writerow([header for _, header in columns])
+    
+    count = 0
+    for row in rows:
+        writer.writerow([cell_value(row.get(key)) for key, _ in columns])
+        count += 1
+        if count % EXPORT_BATCH == 0:
+            yield buffer.getvalue().encode('utf-8')
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode('utf-8')
+
+class _ChunkSink(io.RawIOBase):
+    """Write-only, unseekable file that hands zip output back to the generator"""
+    
+    def __init__(self):
+        self.chunks = []
+        self.position = 0
+    
+    def writable(self):
+        return True
+    
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+    
+    def tell(self):
+        return self.position
+    
+    def drain(self):
+        data = b''.join(self.chunks)
+        self.chunks = []
+        return data
+
+def _column_name(index):
+    name = ''
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        name = chr(65 + remainder) + name
+    return name
+
+def _xlsx_cell(reference, value):
+    value = cell_value(value)
+    if value == '':
+        return ''
+    if isinstance(value, (int, float, Decimal)) and not isinstance(value, bool):
+        return f'<c r="{reference}"><v>{value}</v></c>'
+    text = escape(_XML_INVALID.sub('', str(value)))
+    return f'<c r="{reference}" t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>'
+
+def _xlsx_row(number, values):
+    cells = ''.join(_xlsx_cell(f"{_column_name(i)}{number}", value) for i, value in enumerate(values))
+    return f'<row r="{number}">{cells}</row>'
+
+def _workbook_parts(names):
+    sheets = ''.join(
+        f'<sheet name="{escape(name[:31])}" sheetId="{i}" r:id="rId{i}"/>' for i, name in enumerate(names, 1)
+    )
+    relationships = ''.join(
+        f'<Relationship Id="rId{i}" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+        f'Target="worksheets/sheet{i}.xml"/>' for i in range(1, len(names) + 1)
+    )
+    overrides = ''.join(
+        f'<Override PartName="/xl/worksheets/sheet{i}.xml" '
+        f'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+        for i in range(1, len(names) + 1)
+    )
+    return {
+        '[Content_Types].xml':
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+            '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+            '<Default Extension="xml" ContentType="application/xml"/>'
+            '<Override PartName="/xl/workbook.xml" '
+            'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+            f'{overrides}</Types>',
+        '_rels/.rels':
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            '<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+            'Target="xl/workbook.xml"/></Relationships>',
+        'xl/workbook.xml':
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+            'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+            f'<sheets>{sheets}</sheets></workbook>',
+        'xl/_rels/workbook.xml.rels':
+            '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+            '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+            f'{relationships}</Relationships>'
+    }
+
+def xlsx_stream(sheets):
+    """Encoded XLSX chunks for [(sheet name, columns, rows)], one worksheet per entry
+    
+    The zip is written to an unseekable sink, so each entry is followed by a
+    data descriptor and nothing has to be held back until the end. Rows past
+    XLSX_MAX_ROWS continue on a "<name> (2)" worksheet, and so on, which is why
+    the workbook parts naming the worksheets are written last.
+    """
+    sink = _ChunkSink()
+    names = []
+    with zipfile.ZipFile(sink, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, columns, rows in sheets:
+            rows = iter(rows)
+            part = 1
+            while True:
+                suffix = f' ({part})' if part > 1 else ''
+                names.append(name[:31 - len(suffix)] + suffix)
+                full = False
+                with archive.open(f'xl/worksheets/sheet{len(names)}.xml', 'w') as sheet:
+                    sheet.write(
+                        b'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+                        b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+                    )
+                    sheet.write(_xlsx_row(1, [header for _, header in columns]).encode('utf-8'))
+                    batch = []
+                    for row_number, row in enumerate(rows, 2):
+                        batch.append(_xlsx_row(row_number, [row.get(key) for key, _ in columns]))
+                        if len(batch) == EXPORT_BATCH:
+                            sheet.write(''.join(batch).encode('utf-8'))
+                            batch = []
+                            yield sink.drain()
+                        if row_number == XLSX_MAX_ROWS:
+                            full = True
+                            break
+                    sheet.write(''.join(batch).encode('utf-8'))
+                    sheet.write(b'</sheetData></worksheet>')
+                yield sink.drain()
+                
+                following = next(rows, None) if full else None
+                if following is None:
+                    break
+                rows = itertools.chain([following], rows)
+                part += 1
+        
+        for part, content in _workbook_parts(names).items():
+            archive.writestr(part, content)
+    yield sink.drain()
+
+def export_response_parts(name, fmt, sheets):
+    """(chunks, mimetype, filename) for one or more sheets; CSV carries the first sheet only"""
+    stamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    if fmt == 'xlsx':
+        return (xlsx_stream(sheets),
+                'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+                f"{name}_{stamp}.xlsx")
+    _, columns, rows = sheets[0]
+    return csv_stream(columns, rows), 'text/csv', f"{name}_{stamp}.csv"
+
+def log_sheet(date_from=None, date_to=None):
+    """Activity events in [date_from, date_to + 1 day), oldest first"""
+    clauses = []
+    params = []
+    if date_from:
+        clauses.append("created_at >= %s")
+        params.append(datetime.combine(date_from, datetime.min.time()))
+    if date_to:
+        clauses.append("created_at < %s")
+        params.append(datetime.combine(date_to + timedelta(days=1), datetime.min.time()))
+    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    return ('Activity', LOG_COLUMNS, stream_rows(LOGS_SQL.format(where_sql=where_sql), params))
+
+def backup_sheets(leave_sql, leave_params):
+    """Every sheet of the full data export; each opens its connection only when reached"""
+    sheets = [('Leaves', LEAVE_COLUMNS, stream_rows(leave_sql, leave_params))]
+    for name, sql, keys in BACKUP_SHEETS:
+        sheets.append((name, [(key, key.replace('_', ' ').title()) for key in keys], stream_rows(sql)))
+    sheets.append(log_sheet())
+    return sheets
@@ -0,0 +1,71 @@
+# [file name]: job_handlers.py
+from datetime import datetime
+from job_queue import register
+from models import AdminModel
+from pdf_generator import PDFGenerator, ReportData
+from report_cache import ReportCache
+import exporter
+import slip_pack
+import snapshot
+
+REPORT_TYPES = ('monthly_summary', 'user_activity', 'leave_statistics', 'suspicious_activity')
+
+def report_data(report_type, filters):
+    """Data for one PDF report type"""
+    if report_type == 'monthly_summary':
+        return {'monthly_summary': ReportData.get_monthly_summary()}
+    if report_type == 'user_activity':
+        return {'user_stats': ReportData.get_user_activity_stats()}
+    filters = dict(filters or {})
+    filters['suspicious_only'] = filters.get('suspicious_only') or report_type == 'suspicious_activity'
+    # Every matching leave, read off an unbuffered cursor as the PDF is built
+    sql, params = AdminModel.get_leaves_export_query(filters)
+    count = AdminModel.count_leaves(filters)
+    return {'leaves': exporter.stream_rows(sql, params), 'leave_count': count['total'] if count else None}
+
+@register('report', limit=2)
+def run_report(context):
+    """PDF report written to the job's result file"""
+    report_type = context.params['report_type']
+    data = report_data(report_type, context.params.get('filters'))
+    total = data.get('leave_count')
+    context.progress(0, total, force=True)
+    
+    filename = f"vit_report_{report_type}_{datetime.now().strftime('%Y%m%d_%H%M%S')}.pdf"
+    with open(context.output(filename), 'wb') as output:
+        PDFGenerator.generate_leave_report(data, report_type, output,
+                                           progress=lambda rows: context.progress(rows, total))
+    if context.params.get('cache_key'):
+        ReportCache.put(context.params['cache_key'], output.name)
+    return {'filename': filename, 'mimetype': 'application/pdf'}
+
+@register('export', limit=1)
+def run_export(context):
+    """Full data export written to the job's result file"""
+    sql, params = AdminModel.get_leaves_export_query({})
+    chunks, mimetype, filename = exporter.export_response_parts(
+        'vit_lms_backup', context.params.get('format', 'xlsx'), exporter.backup_sheets(sql, params))
+    with open(context.output(filename), 'wb') as output:
+        for chunk in chunks:
+            output.write(chunk)
+    return {'filename': filename, 'mimetype': mimetype}
+
+@register('snapshot', limit=1, max_attempts=1)
+def run_snapshot(context):
+    """Parquet analytics snapshot; the result is its manifest"""
+    return snapshot.take_snapshot()
+
+@register('slip_pack', limit=2, max_attempts=2)
+def run_slip_pack(context):
+    """One PDF of slips for every approved leave of a block starting in a date range"""
+    block = context.params['hostel_block']
+    date_from, date_to = slip_pack.parse_range(context.params['date_from'], context.params.get('date_to'))
+    slips = slip_pack.fetch_slips(block, date_from, date_to)
+    context.progress(0, len(slips), force=True)
+    if not slips:
+        return {'slips': 0}
+    
+    filename = f"slips_block_{block}_{date_from:%Y%m%d}_{date_to:%Y%m%d}.pdf"
+    with open(context.output(filename), 'wb') as output:
+        slip_pack.build_pack(slips, output, context.progress)
+    return {'slips': len(slips), 'filename': filename, 'mimetype': 'application/pdf'}
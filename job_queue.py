@@ -0,0 +1,383 @@
+# [file name]: job_queue.py
+import hashlib
+import json
+import os
+import random
+import shutil
+import socket
+import threading
+import time
+import traceback
+from threading import Lock
+from database import Database
+from app_logging import get_logger, sampled
+
+log = get_logger('job_queue')
+
+# Worker threads started per web process (0 turns background jobs off). Jobs run
+# inside the web process so their result files are on the disk that serves them.
+JOB_WORKERS = int(os.getenv('JOB_WORKERS', 2))
+
+# Seconds an idle worker waits before looking for queued jobs again
+POLL_INTERVAL = float(os.getenv('JOB_POLL_INTERVAL', 1))
+
+# Finished jobs and their result files are kept this many seconds
+RETENTION = int(os.getenv('JOB_RETENTION', 86400))
+
+# Must be storage every web process can read, e.g. a shared volume when there are several hosts
+RESULT_DIR = os.getenv('JOB_RESULT_DIR', 'job_results')
+
+# Retry delay: BACKOFF_BASE * 2^(attempt - 1) seconds, capped at BACKOFF_MAX
+BACKOFF_BASE = float(os.getenv('JOB_BACKOFF_BASE', 10))
+BACKOFF_MAX = float(os.getenv('JOB_BACKOFF_MAX', 3600))
+
+# Seconds between sweeps for jobs whose worker died, and for expired results
+SWEEP_INTERVAL = 60
+
+# Progress writes are throttled to one per this many seconds
+PROGRESS_INTERVAL = 1.0
+
+# job_type -> {'handler', 'limit', 'max_attempts'}
+HANDLERS = {}
+
+def register(job_type, limit=1, max_attempts=3):
+    """Register a handler(context) for a job type
+    
+    At most `limit` jobs of the type run at once across every worker
+    (override with JOB_LIMIT_<TYPE>).
+    """
+    limit = int(os.getenv(f'JOB_LIMIT_{job_type.upper()}', limit))
+    
+    def decorator(handler):
+        HANDLERS[job_type] = {'handler': handler, 'limit': max(limit, 1), 'max_attempts': max_attempts}
+        return handler
+    return decorator
+
+def backoff(attempts, jitter=True):
+    """Seconds to wait before retrying a job that has failed `attempts` times"""
+    delay = min(BACKOFF_MAX, BACKOFF_BASE * 2 ** max(attempts - 1, 0))
+    if jitter:
+        delay *= random.uniform(0.75, 1.25)
+    return int(delay)
+
+def _job_lock(job_id):
+    """Named lock held by the worker running a job; free means the worker is gone"""
+    return f"job:{job_id}"
+
+def _slot_lock(job_type, slot):
+    return f"job-slot:{job_type}:{slot}"
+
+def _enqueue_lock(job_type, value):
+    # Named locks are limited to 64 characters
+    return f"job-enqueue:{job_type}:{hashlib.md5(str(value).encode()).hexdigest()}"
+
+class JobContext:
+    """What a handler sees: its params, a progress reporter and a result file path"""
+    
+    def __init__(self, job):
+        self.job_id = job['job_id']
+        self.job_type = job['job_type']
+        self.params = json.loads(job['params']) if job.get('params') else {}
+        self.attempt = job['attempts']
+        self.result_path = None
+        self._last_progress = 0.0
+    
+    def progress(self, done, total=None, force=False):
+        """Record progress; written at most once a second unless forced"""
+        now = time.monotonic()
+        if not force and now - self._last_progress < PROGRESS_INTERVAL:
+            return
+        self._last_progress = now
+        try:
+            Jobs.set_progress(self.job_id, done, total)
+        except Exception as e:
+            log.warning("Job %s progress not saved: %s", self.job_id, e, extra=sampled('job_progress'))
+    
+    def output(self, filename):
+        """Path for the job's result file, replacing any left by an earlier attempt"""
+        directory = os.path.join(RESULT_DIR, str(self.job_id))
+        shutil.rmtree(directory, ignore_errors=True)
+        os.makedirs(directory)
+        self.result_path = os.path.join(directory, os.path.basename(filename))
+        return self.result_path
+
+class Jobs:
+    @staticmethod
+    def enqueue(job_type, params=None, created_by=None, dedupe_on=None):
+        """Queue a job and return its id
+        
+        With `dedupe_on`, a queued or running job of the same type whose
+        params[dedupe_on] matches is returned instead of queuing another.
+        """
+        if job_type not in HANDLERS:
+            raise ValueError(f"Unknown job type: {job_type}")
+        params = params or {}
+        dedupe_value = params.get(dedupe_on) if dedupe_on else None
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                if dedupe_value is not None:
+                    # Serialises identical requests so only the first one inserts
+                    lock = _enqueue_lock(job_type, dedupe_value)
+                    cursor.execute("SELECT GET_LOCK(%s, 10) as acquired", (lock,))
+                    if cursor.fetchone()['acquired'] == 1:
+                        try:
+                            cursor.execute("""
+                                SELECT job_id FROM jobs
+                                WHERE status IN ('queued', 'running') AND job_type = %s AND params LIKE %s
+                                ORDER BY job_id LIMIT 1
+                            """, (job_type, f'%{json.dumps({dedupe_on: dedupe_value}, default=str)[1:-1]}%'))
+                            existing = cursor.fetchone()
+                            job_id = existing['job_id'] if existing else Jobs._insert(cursor, job_type, params, created_by)
+                            connection.commit()
+                        finally:
+                            cursor.execute("SELECT RELEASE_LOCK(%s)", (lock,))
+                        return job_id
+                    # Timed out (or errored) waiting on the lock, which we must not release:
+                    # queue a job of our own rather than fail the request
+                    log.warning("Enqueue lock %s not acquired, queuing without dedupe", lock)
+                job_id = Jobs._insert(cursor, job_type, params, created_by)
+            connection.commit()
+            return job_id
+        finally:
+            connection.close()
+    
+    @staticmethod
+    def _insert(cursor, job_type, params, created_by):
+        cursor.execute("""
+            INSERT INTO jobs (job_type, params, max_attempts, created_by)
+            VALUES (%s, %s, %s, %s)
+        """, (job_type, json.dumps(params, default=str),
+              HANDLERS[job_type]['max_attempts'], created_by))
+        return cursor.lastrowid
+    
+    @staticmethod
+    def get(job_id):
+        """Job row with params and result decoded, or None"""
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT * FROM jobs WHERE job_id = %s", (job_id,))
+                job = cursor.fetchone()
+        finally:
+            connection.close()
+        if job:
+            job['params'] = json.loads(job['params']) if job['params'] else {}
+            job['result'] = json.loads(job['result']) if job['result'] else None
+        return job
+    
+    @staticmethod
+    def set_progress(job_id, done, total=None):
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    UPDATE jobs SET progress = %s, progress_total = COALESCE(%s, progress_total),
+                                    heartbeat_at = NOW()
+                    WHERE job_id = %s
+                """, (done, total, job_id))
+            connection.commit()
+        finally:
+            connection.close()
+    
+    @staticmethod
+    def status(job):
+        """Public view of a job row for the status endpoint"""
+        return {
+            'job_id': job['job_id'],
+            'job_type': job['job_type'],
+            'status': job['status'],
+            'progress': job['progress'],
+            'progress_total': job['progress_total'],
+            'attempts': job['attempts'],
+            'max_attempts': job['max_attempts'],
+            'error': job['error'].strip().splitlines()[-1] if job['error'] else None,
+            'created_at': job['created_at'].isoformat() if job['created_at'] else None,
+            'finished_at': job['finished_at'].isoformat() if job['finished_at'] else None,
+            'has_result': bool(job['status'] == 'done' and job['result_path'])
+        }
+
+class Worker:
+    """Claims and runs queued jobs; many workers across processes share the jobs table"""
+    
+    def __init__(self, name):
+        self.name = name
+    
+    def _claim(self, connection):
+        """(job, slot lock) claimed on `connection`, or (None, None)
+        
+        The connection keeps the slot lock and the job's own lock until the job ends,
+        so a crashed worker frees both when its connection drops.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT DISTINCT job_type FROM jobs
+                WHERE status = 'queued' AND run_after <= NOW()
+            """)
+            job_types = [row['job_type'] for row in cursor.fetchall() if row['job_type'] in HANDLERS]
+            random.shuffle(job_types)
+            
+            for job_type in job_types:
+                slot = None
+                for i in range(HANDLERS[job_type]['limit']):
+                    cursor.execute("SELECT GET_LOCK(%s, 0) as acquired", (_slot_lock(job_type, i),))
+                    if cursor.fetchone()['acquired'] == 1:
+                        slot = _slot_lock(job_type, i)
+                        break
+                if slot is None:
+                    continue
+                
+                connection.begin()
+                cursor.execute("""
+                    SELECT * FROM jobs
+                    WHERE status = 'queued' AND job_type = %s AND run_after <= NOW()
+                    ORDER BY job_id
+                    LIMIT 1
+                    FOR UPDATE SKIP LOCKED
+                """, (job_type,))
+                job = cursor.fetchone()
+                if job:
+                    cursor.execute("SELECT GET_LOCK(%s, 0) as acquired", (_job_lock(job['job_id']),))
+                    cursor.fetchone()
+                    cursor.execute("""
+                        UPDATE jobs
+                        SET status = 'running', attempts = attempts + 1, locked_by = %s,
+                            heartbeat_at = NOW(), started_at = COALESCE(started_at, NOW()), error = NULL
+                        WHERE job_id = %s
+                    """, (self.name, job['job_id']))
+                    connection.commit()
+                    job['attempts'] += 1
+                    return job, slot
+                connection.commit()
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (slot,))
+        return None, None
+    
+    def _finish(self, cursor, job, context, result=None, error=None):
+        if error is None:
+            cursor.execute("""
+                UPDATE jobs
+                SET status = 'done', result = %s, result_path = %s, finished_at = NOW(),
+                    heartbeat_at = NOW(), progress = COALESCE(progress_total, progress)
+                WHERE job_id = %s
+            """, (json.dumps(result, default=str) if result is not None else None,
+                  context.result_path, job['job_id']))
+        elif job['attempts'] < job['max_attempts']:
+            delay = backoff(job['attempts'])
+            cursor.execute("""
+                UPDATE jobs
+                SET status = 'queued', run_after = NOW() + INTERVAL %s SECOND, error = %s, locked_by = NULL
+                WHERE job_id = %s
+            """, (delay, error, job['job_id']))
+            log.warning("Job %s (%s) failed, retrying in %ss", job['job_id'], job['job_type'], delay)
+        else:
+            cursor.execute("""
+                UPDATE jobs SET status = 'failed', error = %s, finished_at = NOW(), locked_by = NULL
+                WHERE job_id = %s
+            """, (error, job['job_id']))
+            log.error("Job %s (%s) failed after %s attempts", job['job_id'], job['job_type'], job['attempts'])
+    
+    def run_once(self):
+        """Claim and run one job; False when nothing was ready"""
+        connection = Database().get_connection()
+        try:
+            job, slot = self._claim(connection)
+            if not job:
+                return False
+            
+            context = JobContext(job)
+            result, error = None, None
+            try:
+                result = HANDLERS[job['job_type']]['handler'](context)
+            except Exception:
+                error = traceback.format_exc()
+            
+            with connection.cursor() as cursor:
+                self._finish(cursor, job, context, result, error)
+                connection.commit()
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (_job_lock(job['job_id']),))
+                cursor.execute("SELECT RELEASE_LOCK(%s)", (slot,))
+            return True
+        finally:
+            connection.close()
+    
+    def loop(self):
+        while True:
+            try:
+                if self.run_once():
+                    continue
+            except Exception as e:
+                log.error("Job worker %s error: %s", self.name, e, extra=sampled('job_worker'))
+            time.sleep(POLL_INTERVAL)
+
+def sweep():
+    """Requeue jobs whose worker died and delete results past their retention"""
+    db = Database()
+    connection = db.get_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT job_id, attempts, max_attempts FROM jobs WHERE status = 'running'")
+            for job in cursor.fetchall():
+                cursor.execute("SELECT IS_FREE_LOCK(%s) as free", (_job_lock(job['job_id']),))
+                if cursor.fetchone()['free'] != 1:
+                    continue
+                if job['attempts'] < job['max_attempts']:
+                    cursor.execute("""
+                        UPDATE jobs SET status = 'queued', locked_by = NULL, error = 'Worker stopped'
+                        WHERE job_id = %s AND status = 'running'
+                    """, (job['job_id'],))
+                else:
+                    cursor.execute("""
+                        UPDATE jobs SET status = 'failed', locked_by = NULL, error = 'Worker stopped',
+                                        finished_at = NOW()
+                        WHERE job_id = %s AND status = 'running'
+                    """, (job['job_id'],))
+                if cursor.rowcount:
+                    log.warning("Job %s lost its worker and was %s", job['job_id'], 'requeued' if job['attempts'] < job['max_attempts'] else 'failed')
+            connection.commit()
+            
+            cursor.execute("""
+                SELECT job_id FROM jobs
+                WHERE status IN ('done', 'failed') AND finished_at < NOW() - INTERVAL %s SECOND
+            """, (RETENTION,))
+            expired = [row['job_id'] for row in cursor.fetchall()]
+            for job_id in expired:
+                shutil.rmtree(os.path.join(RESULT_DIR, str(job_id)), ignore_errors=True)
+            if expired:
+                cursor.execute(f"DELETE FROM jobs WHERE job_id IN ({', '.join(['%s'] * len(expired))})", expired)
+                connection.commit()
+    finally:
+        connection.close()
+
+_started = False
+_start_lock = Lock()
+
+def start_workers(count=None):
+    """Run `count` worker threads (JOB_WORKERS) and the sweeper in this process"""
+    global _started
+    count = JOB_WORKERS if count is None else count
+    with _start_lock:
+        if count <= 0 or _started:
+            return
+        _started = True
+    
+    # Registers the handlers; imported here because they import the models
+    import job_handlers
+    
+    prefix = f"{socket.gethostname()}:{os.getpid()}"
+    for i in range(count):
+        worker = Worker(f"{prefix}:{i}")
+        threading.Thread(target=worker.loop, name=f'job-worker-{i}', daemon=True).start()
+    
+    def sweeper():
+        while True:
+            try:
+                sweep()
+            except Exception as e:
+                log.error("Job sweep failed: %s", e, extra=sampled('job_sweep'))
+            time.sleep(SWEEP_INTERVAL)
+    
+    threading.Thread(target=sweeper, name='job-sweeper', daemon=True).start()
+    log.info("%d job worker(s) started", count)
@@ -0,0 +1,127 @@
+# [file name]: leave_analytics.py
+import os
+import numpy as np
+import pandas as pd
+import pymysql
+from database import Database
+from leave_rollups import LeaveRollups
+
+# Rows of the leave projection turned into one DataFrame at a time
+ANALYTICS_CHUNK_ROWS = int(os.getenv('ANALYTICS_CHUNK_ROWS', 50000))
+
+# A student with a leave applied in this many days counts as active
+ACTIVE_DAYS = 30
+
+# Leave length histogram: (label, shortest, longest) in days, inclusive
+LENGTH_BINS = [
+    ('1 day', 1, 1),
+    ('2 days', 2, 2),
+    ('3 days', 3, 3),
+    ('4-7 days', 4, 7),
+    ('8-14 days', 8, 14),
+    ('15+ days', 15, None)
+]
+
+PERCENTILES = (50, 90, 95)
+
+# One narrow row per leave; the length and recency are worked out by MySQL
+PROJECTION_COLUMNS = ['student_reg', 'hostel_block', 'days', 'recent']
+PROJECTION_SQL = f"""
+    SELECT l.student_reg, s.hostel_block,
+           DATEDIFF(l.to_date, l.from_date) + 1 as days,
+           l.applied_at >= DATE_SUB(NOW(), INTERVAL {ACTIVE_DAYS} DAY) as recent
+    FROM leaves l
+    LEFT JOIN students s ON l.student_reg = s.reg_number
+"""
+
+def _add(total, part):
+    return part if total is None else total.add(part, fill_value=0)
+
+def summarize(chunks):
+    """Activity metrics and distributions over an iterable of projection DataFrames
+    
+    Each chunk is reduced to per-student and per-(block, length) counts as
+    soon as it arrives, so only those totals are held between chunks. The
+    busiest proctor and block come from the rollup tables instead.
+    """
+    students = recent = lengths = None
+    for frame in chunks:
+        if frame.empty:
+            continue
+        by_student = frame.groupby('student_reg')
+        students = _add(students, by_student.size())
+        recent = _add(recent, by_student['recent'].sum())
+        lengths = _add(lengths, frame.assign(hostel_block=frame['hostel_block'].fillna(''))
+                       .groupby(['hostel_block', 'days']).size())
+    
+    if students is None:
+        return {'total_leaves': 0, 'active_students': 0, 'avg_leaves_per_student': 0,
+                'length_histogram': [(label, 0) for label, _, _ in LENGTH_BINS], 'block_percentiles': {}}
+    
+    return {
+        'total_leaves': int(students.sum()),
+        'active_students': int((recent > 0).sum()),
+        'avg_leaves_per_student': float(students.mean()),
+        'length_histogram': length_histogram(lengths.groupby(level='days').sum()),
+        'block_percentiles': {
+            block: {'leaves': int(counts.sum()), **length_percentiles(counts.droplevel('hostel_block'))}
+            for block, counts in lengths.groupby(level='hostel_block') if block
+        }
+    }
+
+def length_histogram(counts):
+    """[(label, leaves)] over LENGTH_BINS from a Series of leaves per length in days"""
+    days = counts.index.to_numpy(dtype=float)
+    values = counts.to_numpy()
+    return [(label, int(values[(days >= low) & (days <= (high or np.inf))].sum()))
+            for label, low, high in LENGTH_BINS]
+
+def length_percentiles(counts):
+    """Nearest-rank percentiles of leave length from a Series of leaves per length"""
+    counts = counts.sort_index()
+    cumulative = np.cumsum(counts.to_numpy())
+    ranks = np.ceil(np.array(PERCENTILES) / 100 * cumulative[-1])
+    positions = np.searchsorted(cumulative, ranks)
+    return {f"p{p}": int(counts.index[i]) for p, i in zip(PERCENTILES, positions)}
+
+def projection_chunks():
+    """Yield the leave projection as DataFrames of ANALYTICS_CHUNK_ROWS rows"""
+    connection = Database().get_connection()
+    try:
+        cursor = connection.cursor(pymysql.cursors.SSCursor)
+        cursor.execute(PROJECTION_SQL)
+        while True:
+            rows = cursor.fetchmany(ANALYTICS_CHUNK_ROWS)
+            if not rows:
+                break
+            yield pd.DataFrame.from_records(rows, columns=PROJECTION_COLUMNS)
+    finally:
+        connection.close()
+
+def user_activity_stats():
+    """Everything the user activity report shows, from one pass over leaves and the rollups"""
+    db = Database()
+    connection = db.get_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("""
+                SELECT (SELECT COUNT(*) FROM students) as total_students,
+                       (SELECT COUNT(*) FROM proctors) as total_proctors,
+                       (SELECT COUNT(*) FROM hostel_supervisors) as total_supervisors
+            """)
+            stats = dict(cursor.fetchone())
+            
+            top_proctor = LeaveRollups.top('proctor_id')
+            if top_proctor:
+                proctor_id, leave_count = top_proctor[0]
+                cursor.execute("SELECT name FROM proctors WHERE employee_id = %s", (proctor_id,))
+                proctor = cursor.fetchone()
+                stats['most_active_proctor'] = f"{proctor['name'] if proctor else proctor_id} ({leave_count} leaves)"
+            else:
+                stats['most_active_proctor'] = "N/A"
+            top_block = LeaveRollups.top('hostel_block')
+            stats['most_active_block'] = f"{top_block[0][0]} ({top_block[0][1]} leaves)" if top_block else "N/A"
+            stats.update(summarize(projection_chunks()))
+            return stats
+    finally:
+        connection.close()
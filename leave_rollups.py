@@ -0,0 +1,169 @@
+# [file name]: leave_rollups.py
+from database import Database, in_transaction, rolled_back
+from app_logging import get_logger, sampled
+
+log = get_logger('leave_rollups')
+
+# Counted per bucket: every leave, one column per status, and flagged leaves
+ROLLUP_COUNTS = ('total', 'pending', 'approved', 'rejected', 'completed', 'suspicious')
+
+# grain -> (table, bucket column, bucket expression over l.applied_at)
+ROLLUP_TABLES = {
+    'daily': ('leave_rollup_daily', 'day', "DATE(l.applied_at)"),
+    'monthly': ('leave_rollup_monthly', 'month', "DATE_FORMAT(l.applied_at, '%%Y-%%m-01')")
+}
+
+# Leaves are bucketed by the day they were applied and by the student's block
+# and proctor; leaves without a known block or proctor go under ''
+BUCKET_SQL = """
+    SELECT {bucket} as bucket, COALESCE(s.hostel_block, '') as hostel_block,
+           COALESCE(l.proctor_id, '') as proctor_id{columns}
+    FROM leaves l
+    LEFT JOIN students s ON l.student_reg = s.reg_number
+    {where_sql}
+"""
+
+class LeaveRollups:
+    @staticmethod
+    def status_change(old_status, new_status):
+        """Rollup deltas for a leave moving between statuses"""
+        if old_status == new_status:
+            return {}
+        deltas = {}
+        if old_status in ROLLUP_COUNTS:
+            deltas[old_status] = -1
+        if new_status in ROLLUP_COUNTS:
+            deltas[new_status] = 1
+        return deltas
+    
+    @staticmethod
+    def bump(cursor, leave_ids, deltas):
+        """Add `deltas` to the buckets of each leave, using the caller's cursor and transaction"""
+        deltas = {column: delta for column, delta in deltas.items() if delta and column in ROLLUP_COUNTS}
+        leave_ids = list(leave_ids)
+        if not deltas or not leave_ids:
+            return
+        
+        columns = list(deltas)
+        select_sql = BUCKET_SQL.format(
+            bucket='{bucket}',
+            columns=''.join(f", %s as {column}" for column in columns),
+            where_sql=f"WHERE l.leave_id IN ({', '.join(['%s'] * len(leave_ids))})"
+        )
+        updates = ', '.join(f"{column} = {column} + VALUES({column})" for column in columns)
+        transaction = in_transaction(cursor)
+        try:
+            for table, bucket_column, bucket in ROLLUP_TABLES.values():
+                cursor.execute(f"""
+                    INSERT INTO {table} ({bucket_column}, hostel_block, proctor_id, {', '.join(columns)})
+                    {select_sql.format(bucket=bucket)}
+                    ON DUPLICATE KEY UPDATE {updates}
+                """, (*deltas.values(), *leave_ids))
+        except Exception as e:
+            if transaction and rolled_back(e):
+                # The caller's own writes went with it; it must not commit or report success
+                raise
+            # Drift is corrected by the next rebuild
+            log.warning("Rollup update failed: %s", e, extra=sampled('rollup_update'))
+    
+    @staticmethod
+    def rebuild():
+        """Recount every bucket from the leaves table; returns rows written per table"""
+        counts = ''.join(
+            ",\n           COUNT(*) as total" if column == 'total' else
+            ",\n           SUM(l.suspicious_flag = TRUE) as suspicious" if column == 'suspicious' else
+            f",\n           SUM(l.status = '{column}') as {column}"
+            for column in ROLLUP_COUNTS
+        )
+        written = {}
+        db = Database()
+        connection = db.get_connection()
+        try:
+            connection.begin()
+            with connection.cursor() as cursor:
+                for grain, (table, bucket_column, bucket) in ROLLUP_TABLES.items():
+                    cursor.execute(f"DELETE FROM {table}")
+                    cursor.execute(f"""
+                        INSERT INTO {table} ({bucket_column}, hostel_block, proctor_id, {', '.join(ROLLUP_COUNTS)})
+                        {BUCKET_SQL.format(bucket=bucket, columns=counts, where_sql='').replace('%%', '%')}
+                        GROUP BY bucket, hostel_block, proctor_id
+                    """)
+                    written[grain] = cursor.rowcount
+            connection.commit()
+            return written
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
+    
+    @staticmethod
+    def _ensure_built(cursor):
+        """Backfill on first use when the tables are empty but leaves exist"""
+        cursor.execute("SELECT 1 FROM leave_rollup_monthly LIMIT 1")
+        if cursor.fetchone():
+            return
+        cursor.execute("SELECT 1 FROM leaves LIMIT 1")
+        if cursor.fetchone():
+            LeaveRollups.rebuild()
+    
+    @staticmethod
+    def monthly_summary(months=6):
+        """Per-month totals for the last `months` months including this one, newest first"""
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                LeaveRollups._ensure_built(cursor)
+                cursor.execute("""
+                    SELECT DATE_FORMAT(month, '%%Y-%%m') as month,
+                           SUM(total) as total, SUM(approved) as approved, SUM(rejected) as rejected,
+                           SUM(pending) as pending, SUM(suspicious) as suspicious
+                    FROM leave_rollup_monthly
+                    WHERE month >= DATE_SUB(DATE_FORMAT(CURDATE(), '%%Y-%%m-01'), INTERVAL %s MONTH)
+                    GROUP BY month
+                    ORDER BY month DESC
+                """, (months - 1,))
+                return [{key: value if key == 'month' else int(value or 0) for key, value in row.items()}
+                        for row in cursor.fetchall()]
+        finally:
+            connection.close()
+    
+    @staticmethod
+    def top(dimension, limit=1, date_from=None, date_to=None):
+        """[(block or proctor id, leaves)] for the busiest buckets, optionally within a date range"""
+        if dimension not in ('hostel_block', 'proctor_id'):
+            raise ValueError(f"Unknown rollup dimension: {dimension}")
+        clauses = [f"{dimension} <> ''"]
+        params = []
+        table = 'leave_rollup_monthly'
+        if date_from or date_to:
+            table = 'leave_rollup_daily'
+            if date_from:
+                clauses.append("day >= %s")
+                params.append(date_from)
+            if date_to:
+                clauses.append("day <= %s")
+                params.append(date_to)
+        
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                LeaveRollups._ensure_built(cursor)
+                cursor.execute(f"""
+                    SELECT {dimension} as bucket, SUM(total) as leaves
+                    FROM {table}
+                    WHERE {' AND '.join(clauses)}
+                    GROUP BY {dimension}
+                    ORDER BY leaves DESC
+                    LIMIT %s
+                """, (*params, limit))
+                return [(row['bucket'], int(row['leaves'])) for row in cursor.fetchall()]
+        finally:
+            connection.close()
+
+if __name__ == "__main__":
+    print("Rebuilding leave rollups...")
+    for grain, rows in LeaveRollups.rebuild().items():
+        print(f"✓ {grain}: {rows} buckets")
@@ -0,0 +1,255 @@
+# [file name]: leave_search.py
+import os
+from datetime import date, datetime, time, timedelta
+from database import Database
+from text_search import TextSearch, highlight
+import pagination
+from app_logging import get_logger, sampled
+
+log = get_logger('leave_search')
+
+LEAVE_STATUSES = ('pending', 'approved', 'rejected', 'completed')
+LEAVE_TYPES = ('emergency', 'regular', 'medical')
+
+# Estimates at or below this are replaced by an exact COUNT(*)
+EXACT_COUNT_LIMIT = int(os.getenv('LEAVE_EXACT_COUNT_LIMIT', 10000))
+
+# One row per leave: students and proctors are joined on their primary keys,
+# supervisors are attached per page by attach_supervisors()
+SELECT_SQL = """
+    SELECT l.*,
+           s.name as student_name, s.reg_number, s.hostel_block,
+           p.name as proctor_name{extra_columns}
+    FROM leaves l
+    LEFT JOIN students s ON l.student_reg = s.reg_number
+    LEFT JOIN proctors p ON l.proctor_id = p.employee_id
+"""
+
+def _values(value, allowed):
+    """Normalise a single value or list into the allowed members, in order"""
+    if not value:
+        return []
+    if isinstance(value, str):
+        value = value.split(',')
+    return [item for item in allowed if item in {str(v).strip() for v in value}]
+
+def _day_start(value):
+    """Midnight of a date, a datetime as-is, None for anything unparseable"""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, date):
+        return datetime.combine(value, time.min)
+    try:
+        return datetime.combine(date.fromisoformat(str(value)), time.min)
+    except ValueError:
+        return None
+
+def like_prefix(value):
+    """LIKE pattern matching values that start with `value`"""
+    escaped = value.replace('\\', '\\\\').replace('%', '\\%').replace('_', '\\_')
+    return escaped + '%'
+
+def compile_query(filters, after=None):
+    """(where_sql, params, score_sql, score_params); score_sql is None without a text query
+    
+    `after` continues a ranked text search from the (relevance, leave_id) of the last row shown.
+    """
+    clauses = []
+    params = []
+    filters = filters or {}
+    score_sql, score_params = None, []
+    
+    statuses = _values(filters.get('status'), LEAVE_STATUSES)
+    if statuses:
+        clauses.append(f"l.status IN ({', '.join(['%s'] * len(statuses))})")
+        params.extend(statuses)
+    
+    leave_types = _values(filters.get('leave_type'), LEAVE_TYPES)
+    if leave_types:
+        clauses.append(f"l.leave_type IN ({', '.join(['%s'] * len(leave_types))})")
+        params.extend(leave_types)
+    
+    # Half-open range on the raw column: [date_from 00:00, date_to + 1 day 00:00)
+    if filters.get('date_from'):
+        start = _day_start(filters['date_from'])
+        if start:
+            clauses.append("l.applied_at >= %s")
+            params.append(start)
+    if filters.get('date_to'):
+        end = _day_start(filters['date_to'])
+        if end:
+            if not isinstance(filters['date_to'], datetime):
+                end += timedelta(days=1)
+            clauses.append("l.applied_at < %s")
+            params.append(end)
+    
+    if filters.get('hostel_block'):
+        clauses.append("l.student_reg IN (SELECT reg_number FROM students WHERE hostel_block = %s)")
+        params.append(filters['hostel_block'].strip())
+    if filters.get('leave_id'):
+        clauses.append("l.leave_id = %s")
+        params.append(int(filters['leave_id']))
+    if filters.get('proctor_id'):
+        clauses.append("l.proctor_id = %s")
+        params.append(filters['proctor_id'].strip())
+    if filters.get('student'):
+        clauses.append("l.student_reg LIKE %s")
+        params.append(like_prefix(filters['student'].strip()))
+    if filters.get('destination'):
+        clauses.append("l.destination LIKE %s")
+        params.append(like_prefix(filters['destination'].strip()))
+    if filters.get('suspicious_only'):
+        clauses.append("l.suspicious_flag = TRUE")
+    if filters.get('flagged_since'):
+        clauses.append("l.flagged_at >= %s")
+        params.append(filters['flagged_since'])
+    
+    query = (filters.get('q') or '').strip()
+    if query:
+        # The other filters go along so a capped text search keeps only leaves that pass them
+        text_sql, text_params, score_sql, score_params = TextSearch.compile(
+            query, after, " AND ".join(clauses), params
+        )
+        clauses.insert(0, text_sql)
+        params = [*text_params, *params]
+    
+    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    return where_sql, params, score_sql, score_params
+
+def compile_filters(filters):
+    """Turn admin filters into a WHERE clause that only touches indexed leaves columns"""
+    where_sql, params, _, _ = compile_query(filters)
+    return where_sql, params
+
+def _highlight_rows(rows, query):
+    """Add *_highlight markup for each text field when searching"""
+    if query:
+        for row in rows:
+            row['destination_highlight'] = highlight(row.get('destination'), query)
+            row['reason_highlight'] = highlight(row.get('reason'), query, width=160)
+            row['flag_reason_highlight'] = highlight(row.get('flag_reason'), query, width=160)
+    return rows
+
+class LeaveSearch:
+    @staticmethod
+    def attach_supervisors(cursor, rows):
+        """Fill supervisor_name with every supervisor of the student's block"""
+        blocks = sorted({row['hostel_block'] for row in rows if row.get('hostel_block')})
+        names = {}
+        if blocks:
+            cursor.execute(f"""
+                SELECT hostel_block, GROUP_CONCAT(name ORDER BY name SEPARATOR ', ') as names
+                FROM hostel_supervisors
+                WHERE hostel_block IN ({', '.join(['%s'] * len(blocks))})
+                GROUP BY hostel_block
+            """, blocks)
+            names = {row['hostel_block']: row['names'] for row in cursor.fetchall()}
+        for row in rows:
+            row['supervisor_name'] = names.get(row.get('hostel_block'))
+        return rows
+    
+    @staticmethod
+    def find(filters=None, limit=500):
+        """Matching leaves, best match or newest first, up to `limit` rows"""
+        where_sql, params, score_sql, score_params = compile_query(filters)
+        select_sql, order_sql = SELECT_SQL.format(extra_columns=''), "l.applied_at DESC, l.leave_id DESC"
+        if score_sql:
+            select_sql = SELECT_SQL.format(extra_columns=f",\n           {score_sql} as relevance")
+            order_sql = "relevance DESC, l.leave_id DESC"
+        
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(f"""
+                    {select_sql}
+                    {where_sql}
+                    ORDER BY {order_sql}
+                    LIMIT %s
+                """, (*score_params, *params, limit))
+                rows = LeaveSearch.attach_supervisors(cursor, cursor.fetchall())
+                return _highlight_rows(rows, (filters or {}).get('q'))
+        finally:
+            connection.close()
+    
+    @staticmethod
+    def page(filters=None, cursor=None, page_size=None):
+        """One page of matching leaves, keyset on (applied_at, leave_id) or (relevance, leave_id)"""
+        size = pagination.page_size(page_size)
+        
+        if (filters or {}).get('q', '').strip():
+            # Ranked search: page through relevance, newest leave first on ties
+            after = pagination.decode_cursor(cursor, float, int) if cursor else None
+            where_sql, params, score_sql, score_params = compile_query(filters, after)
+            select_sql = SELECT_SQL.format(extra_columns=f",\n           {score_sql} as relevance")
+            order_sql = "relevance DESC, l.leave_id DESC"
+            sort_key = lambda row: (float(row['relevance']), row['leave_id'])
+        else:
+            where_sql, params, score_sql, score_params = compile_query(filters)
+            select_sql, order_sql = SELECT_SQL.format(extra_columns=''), "l.applied_at DESC, l.leave_id DESC"
+            sort_key = lambda row: (row['applied_at'], row['leave_id'])
+            if cursor:
+                applied_at, leave_id = pagination.decode_cursor(cursor, datetime, int)
+                where_sql += " AND " if where_sql else "WHERE "
+                where_sql += "(l.applied_at < %s OR (l.applied_at = %s AND l.leave_id < %s))"
+                params.extend([applied_at, applied_at, leave_id])
+        
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as db_cursor:
+                db_cursor.execute(f"""
+                    {select_sql}
+                    {where_sql}
+                    ORDER BY {order_sql}
+                    LIMIT %s
+                """, (*score_params, *params, size + 1))
+                page = pagination.build_page(db_cursor.fetchall(), size, sort_key)
+                LeaveSearch.attach_supervisors(db_cursor, page['items'])
+                _highlight_rows(page['items'], (filters or {}).get('q'))
+                return page
+        finally:
+            connection.close()
+    
+    @staticmethod
+    def export_query(filters=None):
+        """(sql, params) selecting every matching leave in page order, for streaming exports"""
+        where_sql, params, score_sql, score_params = compile_query(filters)
+        select_sql, order_sql = SELECT_SQL.format(extra_columns=''), "l.applied_at DESC, l.leave_id DESC"
+        if score_sql:
+            select_sql = SELECT_SQL.format(extra_columns=f",\n           {score_sql} as relevance")
+            order_sql = "relevance DESC, l.leave_id DESC"
+        return f"{select_sql} {where_sql} ORDER BY {order_sql}", [*score_params, *params]
+    
+    @staticmethod
+    def count(filters=None):
+        """Matching row count: exact when small, otherwise the optimizer's estimate"""
+        where_sql, params = compile_filters(filters)
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                if where_sql:
+                    # Rows x filtered% of each joined table gives the plan's output estimate
+                    cursor.execute(f"EXPLAIN SELECT l.leave_id FROM leaves l {where_sql}", params)
+                    estimate = 1.0
+                    for step in cursor.fetchall():
+                        if step.get('id') == 1 and step.get('rows') is not None:
+                            estimate *= float(step['rows']) * float(step.get('filtered') or 100) / 100
+                else:
+                    cursor.execute("""
+                        SELECT TABLE_ROWS FROM INFORMATION_SCHEMA.TABLES
+                        WHERE TABLE_SCHEMA = %s AND TABLE_NAME = 'leaves'
+                    """, (db.database,))
+                    row = cursor.fetchone()
+                    estimate = float(row['TABLE_ROWS'] or 0) if row else 0.0
+                
+                if estimate <= EXACT_COUNT_LIMIT:
+                    cursor.execute(f"SELECT COUNT(*) as total FROM leaves l {where_sql}", params)
+                    return {'total': cursor.fetchone()['total'], 'exact': True}
+                return {'total': int(estimate), 'exact': False}
+        except Exception as e:
+            log.warning("Leave count unavailable: %s", e, extra=sampled('leave_count'))
+            return None
+        finally:
+            connection.close()
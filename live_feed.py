@@ -0,0 +1,266 @@
+# [file name]: live_feed.py
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from threading import Lock
+from database import Database
+from app_logging import get_logger, sampled
+
+log = get_logger('live_feed')
+
+# How often a worker with open streams checks for writes made by other workers
+POLL_INTERVAL = float(os.getenv('LIVE_FEED_POLL_INTERVAL', 2))
+
+# Writers touch this file so tailers on the same host only query after a change
+SIGNAL_PATH = os.getenv('LIVE_FEED_SIGNAL_FILE', os.path.join(tempfile.gettempdir(), 'leave-live-feed.signal'))
+
+# Query at least this often even without a signal, for writes from other hosts (0 = never)
+MAX_SILENCE = float(os.getenv('LIVE_FEED_MAX_SILENCE', 0))
+
+# Seconds between keep-alive comments on an idle stream
+HEARTBEAT_INTERVAL = float(os.getenv('LIVE_FEED_HEARTBEAT', 15))
+
+# Events buffered per stream before a slow client is dropped (it reconnects and replays)
+MAX_QUEUED = int(os.getenv('LIVE_FEED_MAX_QUEUED', 200))
+
+# Open streams per web process; each holds a request thread, so the default leaves
+# half of WEB_THREADS for other requests. Further streams are refused with a 503
+MAX_STREAMS = int(os.getenv('LIVE_FEED_MAX_STREAMS', int(os.getenv('WEB_THREADS', 16)) // 2))
+
+# Seconds a refused client waits before trying the stream again
+REFUSED_RETRY = int(os.getenv('LIVE_FEED_REFUSED_RETRY', 60))
+
+# Newest ids a poll re-reads, for rows that commit after a higher id was seen
+LOOKBACK = 100
+
+EVENTS_SQL = """
+    SELECT e.id, e.log_type, e.user_id, e.action, e.details, e.leave_id, e.created_at,
+           l.proctor_id, l.student_reg
+    FROM activity_events e
+    LEFT JOIN leaves l ON l.leave_id = e.leave_id
+    WHERE e.id > %s
+    ORDER BY e.id
+    LIMIT %s
+"""
+
+LEAVE_DECISIONS = ('Leave approved', 'Leave rejected')
+FLAG_ACTIONS = ('FLAG_LEAVE', 'REMOVE_FLAG')
+
+def event_type(log_type, action):
+    """Stream event name for an activity_events row, None if it is not streamed"""
+    if log_type == 'leave':
+        if action == 'Leave pending':
+            return 'leave_applied'
+        if action in LEAVE_DECISIONS:
+            return 'leave_decided'
+    elif log_type == 'verification':
+        return 'scan'
+    elif log_type == 'admin' and action in FLAG_ACTIONS:
+        return 'flag'
+    return None
+
+def make_event(event_id, log_type, action, user_id=None, details=None, leave_id=None,
+               proctor_id=None, student_reg=None, created_at=None):
+    """Event dict for a streamed activity, or None"""
+    name = event_type(log_type, action)
+    if not name or event_id is None:
+        return None
+    return {
+        'id': int(event_id),
+        'event': name,
+        'action': action,
+        'user_id': user_id,
+        'details': details,
+        'leave_id': leave_id,
+        'proctor_id': proctor_id,
+        'student_reg': student_reg,
+        'at': created_at.isoformat() if hasattr(created_at, 'isoformat') else created_at
+    }
+
+def format_event(event):
+    """One SSE frame; the id lets a reconnecting client resume with Last-Event-ID"""
+    data = json.dumps({key: value for key, value in event.items() if key != 'event'})
+    return f"id: {event['id']}\nevent: {event['event']}\ndata: {data}\n\n"
+
+class Subscription:
+    def __init__(self, proctor_id=None):
+        self.proctor_id = proctor_id    # None receives every event (admins)
+        self.queue = queue.Queue(maxsize=MAX_QUEUED)
+        self.dropped = False
+    
+    def wants(self, event):
+        return self.proctor_id is None or event.get('proctor_id') == self.proctor_id
+    
+    def get(self, timeout):
+        """Next event, or None after `timeout` seconds without one"""
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class EventBus:
+    """Fan-out of events to this worker's open streams, delivering each id once"""
+    
+    def __init__(self, remember=2000):
+        self.subscriptions = set()
+        self.seen = OrderedDict()   # recently delivered ids, oldest first
+        self.remember = remember
+        self.lock = Lock()
+    
+    def subscribe(self, proctor_id=None, limit=None):
+        """A new subscription, or None when `limit` streams are already open"""
+        subscription = Subscription(proctor_id)
+        with self.lock:
+            if limit is not None and len(self.subscriptions) >= limit:
+                return None
+            self.subscriptions.add(subscription)
+        return subscription
+    
+    def unsubscribe(self, subscription):
+        with self.lock:
+            self.subscriptions.discard(subscription)
+    
+    def __len__(self):
+        return len(self.subscriptions)
+    
+    def publish(self, event):
+        """Deliver to matching subscribers; False if the id was already delivered"""
+        with self.lock:
+            if event['id'] in self.seen:
+                return False
+            self.seen[event['id']] = True
+            while len(self.seen) > self.remember:
+                self.seen.popitem(last=False)
+            subscribers = list(self.subscriptions)
+        
+        for subscription in subscribers:
+            if subscription.dropped or not subscription.wants(event):
+                continue
+            try:
+                subscription.queue.put_nowait(event)
+            except queue.Full:
+                # The stream ends and the browser reconnects from its last id
+                subscription.dropped = True
+        return True
+
+class LiveFeed:
+    _bus = EventBus()
+    _last_id = None
+    _tailer = None
+    _lock = Lock()
+    
+    @staticmethod
+    def _signal():
+        """Tell tailers in every worker on this host that activity_events changed"""
+        try:
+            os.utime(SIGNAL_PATH)
+        except FileNotFoundError:
+            open(SIGNAL_PATH, 'a').close()
+        except OSError as e:
+            log.warning("Live feed signal not written: %s", e, extra=sampled('live_feed_signal'))
+    
+    @staticmethod
+    def _signal_mtime():
+        try:
+            return os.stat(SIGNAL_PATH).st_mtime_ns
+        except OSError:
+            return None
+    
+    @classmethod
+    def publish(cls, event_id, log_type, action, user_id=None, details=None, leave_id=None,
+                proctor_id=None, student_reg=None):
+        """Push a committed write to this worker's streams and signal the other workers"""
+        event = make_event(event_id, log_type, action, user_id, details, leave_id, proctor_id, student_reg)
+        if not event:
+            return
+        cls._signal()
+        if len(cls._bus):
+            cls._bus.publish(event)
+    
+    @classmethod
+    def subscribe(cls, proctor_id=None):
+        """A subscription, or None when this worker already has MAX_STREAMS open"""
+        subscription = cls._bus.subscribe(proctor_id, limit=MAX_STREAMS)
+        if subscription is None:
+            return None
+        with cls._lock:
+            if cls._tailer is None:
+                cls._tailer = threading.Thread(target=cls._tail, name='live-feed-tailer', daemon=True)
+                cls._tailer.start()
+        return subscription
+    
+    @classmethod
+    def unsubscribe(cls, subscription):
+        cls._bus.unsubscribe(subscription)
+    
+    @classmethod
+    def replay(cls, last_event_id, proctor_id=None, limit=MAX_QUEUED):
+        """Events after a reconnecting client's Last-Event-ID"""
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute(EVENTS_SQL, (last_event_id, limit))
+                events = [cls._row_event(row) for row in cursor.fetchall()]
+        finally:
+            connection.close()
+        return [event for event in events
+                if event and (proctor_id is None or event['proctor_id'] == proctor_id)]
+    
+    @staticmethod
+    def _row_event(row):
+        return make_event(row['id'], row['log_type'], row['action'], row['user_id'], row['details'],
+                          row['leave_id'], row['proctor_id'], row['student_reg'], row['created_at'])
+    
+    @classmethod
+    def _poll(cls, cursor):
+        """Deliver rows written by any worker since the last poll"""
+        if cls._last_id is None:
+            # Streams start from now; older events come from Last-Event-ID replay
+            cursor.execute("SELECT COALESCE(MAX(id), 0) as last_id FROM activity_events")
+            cls._last_id = int(cursor.fetchone()['last_id'])
+            return
+        cursor.execute(EVENTS_SQL, (max(cls._last_id - LOOKBACK, 0), LOOKBACK + MAX_QUEUED))
+        for row in cursor.fetchall():
+            cls._last_id = max(cls._last_id, row['id'])
+            event = cls._row_event(row)
+            if event:
+                cls._bus.publish(event)
+    
+    @classmethod
+    def _tail(cls):
+        """While this worker has open streams, query activity_events only after a signalled write"""
+        connection = None
+        signalled = None
+        last_query = 0.0
+        try:
+            while True:
+                with cls._lock:
+                    if not len(cls._bus):
+                        cls._tailer = None
+                        cls._last_id = None
+                        return
+                
+                mtime = cls._signal_mtime()
+                stale = MAX_SILENCE > 0 and time.monotonic() - last_query >= MAX_SILENCE
+                if cls._last_id is None or mtime != signalled or stale:
+                    try:
+                        if connection is None:
+                            connection = Database().get_connection()
+                        with connection.cursor() as cursor:
+                            cls._poll(cursor)
+                        signalled = mtime
+                        last_query = time.monotonic()
+                    except Exception as e:
+                        log.warning("Live feed poll failed: %s", e, extra=sampled('live_feed_poll'))
+                        if connection is not None:
+                            connection.close()
+                            connection = None
+                time.sleep(POLL_INTERVAL)
+        finally:
+            if connection is not None:
+                connection.close()
@@ -6,6 +6,18 @@ import qrcode
 from io import BytesIO
 import base64
 from database import Database
+from stats_counters import StatCounters, USER_METRICS
+from leave_rollups import LeaveRollups
+from admin_cache import AdminCache, STATS_KEY, LOGS_KEY, SUSPICIOUS_KEY
+from activity_log import ActivityLog, ACTIVITY_REREAD_WINDOW
+from leave_search import LeaveSearch
+from text_search import TextSearch
+from user_directory import UserDirectory
+from prefix_index import UserIndex
+from live_feed import LiveFeed
+from app_logging import get_logger
+
+log = get_logger('models')
 
 # Don't create db instance here - create in each method when needed
 class UserModel:
@@ -77,7 +89,16 @@ class Student:
                 ))
                 
                 leave_id = cursor.lastrowid
+                event_id = ActivityLog.record(cursor, 'leave', student_reg, 'Leave pending',
+                                              leave_data['reason'], leave_id=leave_id)
+                StatCounters.bump(cursor, {'total_leaves': 1, 'pending_leaves': 1})
+                StatCounters.bump(cursor, {'leaves_applied': 1}, today=True)
+                LeaveRollups.bump(cursor, [leave_id], {'total': 1, 'pending': 1})
                 connection.commit()
+                AdminCache.invalidate(STATS_KEY, LOGS_KEY)
+                TextSearch.index_leave(leave_id, leave_data['reason'], leave_data.get('destination', ''))
+                LiveFeed.publish(event_id, 'leave', 'Leave pending', student_reg, leave_data['reason'],
+                                 leave_id, student['proctor_id'], student_reg)
                 return leave_id
         finally:
             connection.close()
@@ -143,7 +164,7 @@ class Proctor:
         try:
             with connection.cursor() as cursor:
                 cursor.execute(
-                    "SELECT proctor_id FROM leaves WHERE leave_id = %s",
+                    "SELECT proctor_id, student_reg, status FROM leaves WHERE leave_id = %s",
                     (leave_id,)
                 )
                 leave = cursor.fetchone()
@@ -162,8 +183,16 @@ class Proctor:
                         qr_expiry = %s
                     WHERE leave_id = %s
                 """, (qr_token, qr_expiry, leave_id))
+                details = f"Leave #{leave_id} of {leave['student_reg']} approved"
+                event_id = ActivityLog.record(cursor, 'leave', proctor_id, 'Leave approved',
+                                              details, leave_id=leave_id)
+                StatCounters.bump(cursor, StatCounters.status_change(leave['status'], 'approved'))
+                LeaveRollups.bump(cursor, [leave_id], LeaveRollups.status_change(leave['status'], 'approved'))
                 
                 connection.commit()
+                AdminCache.invalidate()
+                LiveFeed.publish(event_id, 'leave', 'Leave approved', proctor_id, details,
+                                 leave_id, proctor_id, leave['student_reg'])
                 return qr_token
         finally:
             connection.close()
@@ -175,7 +204,7 @@ class Proctor:
         try:
             with connection.cursor() as cursor:
                 cursor.execute(
-                    "SELECT proctor_id FROM leaves WHERE leave_id = %s",
+                    "SELECT proctor_id, student_reg, status FROM leaves WHERE leave_id = %s",
                     (leave_id,)
                 )
                 leave = cursor.fetchone()
@@ -188,11 +217,117 @@ class Proctor:
                     SET status = 'rejected'
                     WHERE leave_id = %s
                 """, (leave_id,))
+                details = f"Leave #{leave_id} of {leave['student_reg']} rejected"
+                event_id = ActivityLog.record(cursor, 'leave', proctor_id, 'Leave rejected',
+                                              details, leave_id=leave_id)
+                StatCounters.bump(cursor, StatCounters.status_change(leave['status'], 'rejected'))
+                LeaveRollups.bump(cursor, [leave_id], LeaveRollups.status_change(leave['status'], 'rejected'))
                 
                 connection.commit()
+                AdminCache.invalidate()
+                LiveFeed.publish(event_id, 'leave', 'Leave rejected', proctor_id, details,
+                                 leave_id, proctor_id, leave['student_reg'])
                 return True
         finally:
             connection.close()
+    
+    # Upper bound on leave IDs accepted by a single bulk decision
+    MAX_BULK_DECISION = 500
+    
+    @staticmethod
+    def _leave_ids(values, field):
+        """Set of leave IDs from a request; ValueError unless `values` is a list of integers"""
+        if values is None:
+            return set()
+        if not isinstance(values, list) or not all(type(value) is int for value in values):
+            raise ValueError(f"'{field}' must be a list of leave IDs")
+        return set(values)
+    
+    @staticmethod
+    def bulk_decide(proctor_id, approve_ids=None, reject_ids=None):
+        """Approve/reject many pending leaves with one guarded UPDATE per outcome"""
+        approve_ids = sorted(Proctor._leave_ids(approve_ids, 'approve'))
+        reject_ids = sorted(Proctor._leave_ids(reject_ids, 'reject') - set(approve_ids))
+        requested = approve_ids + reject_ids
+        
+        result = {'approved': [], 'rejected': [], 'skipped': []}
+        if not requested:
+            return result
+        if len(requested) > Proctor.MAX_BULK_DECISION:
+            raise ValueError(f"At most {Proctor.MAX_BULK_DECISION} leaves can be decided at once")
+        
+        db = Database()
+        connection = db.get_connection()
+        try:
+            connection.begin()
+            with connection.cursor() as cursor:
+                placeholders = ', '.join(['%s'] * len(requested))
+                cursor.execute(f"""
+                    SELECT leave_id, student_reg FROM leaves
+                    WHERE leave_id IN ({placeholders})
+                    AND proctor_id = %s AND status = 'pending'
+                    FOR UPDATE
+                """, (*requested, proctor_id))
+                eligible = {row['leave_id']: row['student_reg'] for row in cursor.fetchall()}
+                
+                to_approve = [leave_id for leave_id in approve_ids if leave_id in eligible]
+                to_reject = [leave_id for leave_id in reject_ids if leave_id in eligible]
+                
+                if to_approve:
+                    qr_expiry = datetime.now() + timedelta(hours=24)
+                    case_params = []
+                    for leave_id in to_approve:
+                        case_params.extend([leave_id, UserModel.generate_qr_token()])
+                    
+                    placeholders = ', '.join(['%s'] * len(to_approve))
+                    cursor.execute(f"""
+                        UPDATE leaves
+                        SET status = 'approved',
+                            approved_at = NOW(),
+                            qr_token = CASE leave_id {' '.join(['WHEN %s THEN %s'] * len(to_approve))} END,
+                            qr_expiry = %s
+                        WHERE leave_id IN ({placeholders})
+                        AND proctor_id = %s AND status = 'pending'
+                    """, (*case_params, qr_expiry, *to_approve, proctor_id))
+                
+                if to_reject:
+                    placeholders = ', '.join(['%s'] * len(to_reject))
+                    cursor.execute(f"""
+                        UPDATE leaves
+                        SET status = 'rejected'
+                        WHERE leave_id IN ({placeholders})
+                        AND proctor_id = %s AND status = 'pending'
+                    """, (*to_reject, proctor_id))
+                
+                events = [
+                    ('leave', proctor_id, f'Leave {outcome}',
+                     f"Leave #{leave_id} of {eligible[leave_id]} {outcome}", None, leave_id)
+                    for outcome, leave_ids in (('approved', to_approve), ('rejected', to_reject))
+                    for leave_id in leave_ids
+                ]
+                event_ids = ActivityLog.record_many(cursor, events)
+                StatCounters.bump(cursor, {
+                    'pending_leaves': -(len(to_approve) + len(to_reject)),
+                    'approved_leaves': len(to_approve)
+                })
+                LeaveRollups.bump(cursor, to_approve, {'pending': -1, 'approved': 1})
+                LeaveRollups.bump(cursor, to_reject, {'pending': -1, 'rejected': 1})
+                connection.commit()
+                if to_approve or to_reject:
+                    AdminCache.invalidate()
+                for event_id, (_, _, action, details, _, leave_id) in zip(event_ids, events):
+                    LiveFeed.publish(event_id, 'leave', action, proctor_id, details,
+                                     leave_id, proctor_id, eligible[leave_id])
+                
+                result['approved'] = to_approve
+                result['rejected'] = to_reject
+                result['skipped'] = [leave_id for leave_id in requested if leave_id not in eligible]
+                return result
+        except Exception:
+            connection.rollback()
+            raise
+        finally:
+            connection.close()
 
 class HostelSupervisor:
     @staticmethod
@@ -265,6 +400,8 @@ class HostelSupervisor:
                     (leave_id, supervisor_id, action, notes)
                     VALUES (%s, %s, 'granted', 'QR code verified successfully')
                 """, (leave['leave_id'], supervisor_id))
+                event_id = ActivityLog.record(cursor, 'verification', supervisor_id, 'granted',
+                                              'QR code verified successfully', leave_id=leave['leave_id'])
                 
                 cursor.execute("""
                     UPDATE leaves 
@@ -273,6 +410,10 @@ class HostelSupervisor:
                 """, (leave['leave_id'],))
                 
                 connection.commit()
+                AdminCache.invalidate(LOGS_KEY, SUSPICIOUS_KEY)
+                LiveFeed.publish(event_id, 'verification', 'granted', supervisor_id,
+                                 'QR code verified successfully', leave['leave_id'],
+                                 leave['proctor_id'], leave['student_reg'])
                 return leave, "Verification successful"
         finally:
             connection.close()
@@ -319,129 +460,99 @@ class AdminModel:
     
     @staticmethod
     def get_all_logs(limit=100):
-        db = Database()
-        connection = db.get_connection()
-        try:
-            with connection.cursor() as cursor:
-                cursor.execute("""
-                    SELECT * FROM (
-                        SELECT 
-                            'leave' as log_type,
-                            leave_id as id,
-                            student_reg as user_id,
-                            CONCAT('Leave ', status) as action,
-                            applied_at as timestamp,
-                            reason as details,
-                            NULL as ip_address
-                        FROM leaves
-                        
-                        UNION ALL
-                        
-                        SELECT 
-                            'verification' as log_type,
-                            log_id as id,
-                            supervisor_id as user_id,
-                            action,
-                            verified_at as timestamp,
-                            notes as details,
-                            NULL as ip_address
-                        FROM verification_logs
-                        
-                        UNION ALL
-                        
-                        SELECT 
-                            'admin' as log_type,
-                            log_id as id,
-                            admin_id as user_id,
-                            action_type as action,
-                            created_at as timestamp,
-                            details,
-                            ip_address
-                        FROM admin_logs
-                    ) as all_logs
-                    ORDER BY timestamp DESC
-                    LIMIT %s
-                """, (limit,))
-                return cursor.fetchall()
-        finally:
-            connection.close()
+        return ActivityLog.get_recent(limit)
     
     @staticmethod
     def get_all_leaves(filters=None):
+        return LeaveSearch.find(filters, limit=500)
+    
+    @staticmethod
+    def get_leaves_page(filters=None, cursor=None, page_size=None):
+        return LeaveSearch.page(filters, cursor, page_size)
+    
+    @staticmethod
+    def count_leaves(filters=None):
+        return LeaveSearch.count(filters)
+    
+    @staticmethod
+    def get_leaves_export_query(filters=None):
+        return LeaveSearch.export_query(filters)
+    
+    @staticmethod
+    def get_change_version():
         db = Database()
         connection = db.get_connection()
         try:
             with connection.cursor() as cursor:
-                base_query = """
-                    SELECT l.*, 
-                           s.name as student_name, s.reg_number,
-                           p.name as proctor_name,
-                           hs.name as supervisor_name
-                    FROM leaves l
-                    LEFT JOIN students s ON l.student_reg = s.reg_number
-                    LEFT JOIN proctors p ON l.proctor_id = p.employee_id
-                    LEFT JOIN hostel_supervisors hs ON hs.hostel_block = s.hostel_block
-                    WHERE 1=1
-                """
-                params = []
-                
-                if filters:
-                    if filters.get('status'):
-                        base_query += " AND l.status = %s"
-                        params.append(filters['status'])
-                    if filters.get('leave_type'):
-                        base_query += " AND l.leave_type = %s"
-                        params.append(filters['leave_type'])
-                    if filters.get('date_from'):
-                        base_query += " AND DATE(l.applied_at) >= %s"
-                        params.append(filters['date_from'])
-                    if filters.get('date_to'):
-                        base_query += " AND DATE(l.applied_at) <= %s"
-                        params.append(filters['date_to'])
-                    if filters.get('suspicious_only'):
-                        base_query += " AND l.suspicious_flag = TRUE"
-                
-                base_query += " ORDER BY l.applied_at DESC LIMIT 500"
-                cursor.execute(base_query, params)
-                return cursor.fetchall()
+                return ActivityLog.current_version(cursor)
         finally:
             connection.close()
     
     @staticmethod
-    def get_system_stats():
+    def get_dashboard_changes(since=None):
+        """(version, changes) for the dashboard after version `since`; changes is None if nothing changed"""
         db = Database()
         connection = db.get_connection()
         try:
             with connection.cursor() as cursor:
-                stats = {}
-                
-                cursor.execute("SELECT COUNT(*) as count FROM students")
-                stats['total_students'] = cursor.fetchone()['count']
-                
-                cursor.execute("SELECT COUNT(*) as count FROM proctors")
-                stats['total_proctors'] = cursor.fetchone()['count']
+                version = ActivityLog.current_version(cursor)
+                if since == version:
+                    return version, None
                 
-                cursor.execute("SELECT COUNT(*) as count FROM hostel_supervisors")
-                stats['total_supervisors'] = cursor.fetchone()['count']
-                
-                cursor.execute("SELECT COUNT(*) as count FROM leaves")
-                stats['total_leaves'] = cursor.fetchone()['count']
-                
-                cursor.execute("SELECT COUNT(*) as count FROM leaves WHERE status = 'approved'")
-                stats['approved_leaves'] = cursor.fetchone()['count']
-                
-                cursor.execute("SELECT COUNT(*) as count FROM leaves WHERE status = 'pending'")
-                stats['pending_leaves'] = cursor.fetchone()['count']
-                
-                cursor.execute("SELECT COUNT(*) as count FROM leaves WHERE suspicious_flag = TRUE")
-                stats['suspicious_leaves'] = cursor.fetchone()['count']
-                
-                cursor.execute("SELECT COUNT(*) as count FROM leaves WHERE DATE(applied_at) = CURDATE()")
-                stats['today_leaves'] = cursor.fetchone()['count']
+                since_id = ActivityLog.version_id(since)
+                since_time = None
+                if since_id and since_id <= ActivityLog.version_id(version):
+                    # Start from the re-read window so events that committed late are covered
+                    cursor.execute("""
+                        SELECT MIN(created_at) as since_time FROM activity_events
+                        WHERE id > %s AND id <= %s
+                    """, (max(0, since_id - ACTIVITY_REREAD_WINDOW), since_id))
+                    row = cursor.fetchone()
+                    since_time = row['since_time'] if row else None
                 
-                return stats
+                if since_time:
+                    changes = {
+                        'full': False,
+                        'stats': StatCounters.read_changed(cursor, since_time),
+                        'recent_logs': ActivityLog.get_since(cursor, since_id, limit=20),
+                        'removed_flags': AdminModel._removed_flags(cursor, since_id)
+                    }
         finally:
             connection.close()
+        
+        if not since_time:
+            # Unknown or future version: send a full snapshot for the client to replace
+            return version, {
+                'full': True,
+                'stats': AdminModel.get_system_stats(),
+                'recent_logs': AdminModel.get_all_logs(limit=20),
+                'suspicious_leaves': AdminModel.get_all_leaves({'suspicious_only': True}),
+                'removed_flags': []
+            }
+        
+        changes['suspicious_leaves'] = LeaveSearch.find(
+            {'suspicious_only': True, 'flagged_since': since_time}, limit=20
+        )
+        return version, changes
+    
+    @staticmethod
+    def _removed_flags(cursor, since_id):
+        """Leaves unflagged after event `since_id` (or in the re-read window) that are still unflagged"""
+        cursor.execute("""
+            SELECT DISTINCT e.leave_id
+            FROM activity_events e
+            JOIN leaves l ON l.leave_id = e.leave_id
+            WHERE e.id > %s AND e.action = 'REMOVE_FLAG' AND l.suspicious_flag = FALSE
+        """, (max(0, since_id - ACTIVITY_REREAD_WINDOW),))
+        return [row['leave_id'] for row in cursor.fetchall()]
+    
+    @staticmethod
+    def get_system_stats():
+        stats = StatCounters.read()
+        if stats is None:
+            # Counters have never been seeded on this database
+            stats = StatCounters.reconcile()
+        return stats
     
     @staticmethod
     def add_proctor(proctor_data):
@@ -452,7 +563,7 @@ class AdminModel:
                 # Check if proctor already exists
                 cursor.execute("SELECT * FROM proctors WHERE employee_id = %s", (proctor_data['employee_id'],))
                 if cursor.fetchone():
-                    print(f"✗ Proctor {proctor_data['employee_id']} already exists")
+                    log.info("Proctor %s already exists", proctor_data['employee_id'])
                     return False
                 
                 sql = """
@@ -467,13 +578,14 @@ class AdminModel:
                     proctor_data['email'],
                     proctor_data['department']
                 ))
+                StatCounters.bump(cursor, {USER_METRICS['proctor']: 1})
                 connection.commit()
-                print(f"✓ Proctor {proctor_data['employee_id']} added successfully")
+                AdminCache.invalidate(STATS_KEY)
+                UserIndex.upsert('proctor', proctor_data['employee_id'], proctor_data['name'], proctor_data['department'])
+                log.info("Proctor %s added", proctor_data['employee_id'])
                 return True
         except Exception as e:
-            print(f"✗ Error adding proctor: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Error adding proctor")
             return False
         finally:
             connection.close()
@@ -487,13 +599,13 @@ class AdminModel:
                 # Check if student already exists
                 cursor.execute("SELECT * FROM students WHERE reg_number = %s", (student_data['reg_number'],))
                 if cursor.fetchone():
-                    print(f"✗ Student {student_data['reg_number']} already exists")
+                    log.info("Student %s already exists", student_data['reg_number'])
                     return False
                 
                 # Check if proctor exists
                 cursor.execute("SELECT * FROM proctors WHERE employee_id = %s", (student_data['proctor_id'],))
                 if not cursor.fetchone():
-                    print(f"✗ Proctor {student_data['proctor_id']} not found")
+                    log.info("Proctor %s not found for new student", student_data['proctor_id'])
                     return False
                 
                 sql = """
@@ -512,13 +624,14 @@ class AdminModel:
                     student_data['phone'],
                     student_data['parent_phone']
                 ))
+                StatCounters.bump(cursor, {USER_METRICS['student']: 1})
                 connection.commit()
-                print(f"✓ Student {student_data['reg_number']} added successfully")
+                AdminCache.invalidate(STATS_KEY)
+                UserIndex.upsert('student', student_data['reg_number'], student_data['name'], student_data['hostel_block'])
+                log.info("Student %s added", student_data['reg_number'])
                 return True
         except Exception as e:
-            print(f"✗ Error adding student: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Error adding student")
             return False
         finally:
             connection.close()
@@ -532,7 +645,7 @@ class AdminModel:
                 # Check if supervisor already exists
                 cursor.execute("SELECT * FROM hostel_supervisors WHERE supervisor_id = %s", (supervisor_data['supervisor_id'],))
                 if cursor.fetchone():
-                    print(f"✗ Supervisor {supervisor_data['supervisor_id']} already exists")
+                    log.info("Supervisor %s already exists", supervisor_data['supervisor_id'])
                     return False
                 
                 sql = """
@@ -547,13 +660,14 @@ class AdminModel:
                     supervisor_data['hostel_block'],
                     supervisor_data['email']
                 ))
+                StatCounters.bump(cursor, {USER_METRICS['supervisor']: 1})
                 connection.commit()
-                print(f"✓ Supervisor {supervisor_data['supervisor_id']} added successfully")
+                AdminCache.invalidate(STATS_KEY)
+                UserIndex.upsert('supervisor', supervisor_data['supervisor_id'], supervisor_data['name'], supervisor_data['hostel_block'])
+                log.info("Supervisor %s added", supervisor_data['supervisor_id'])
                 return True
         except Exception as e:
-            print(f"✗ Error adding supervisor: {e}")
-            import traceback
-            traceback.print_exc()
+            log.exception("Error adding supervisor")
             return False
         finally:
             connection.close()
@@ -582,7 +696,7 @@ class AdminModel:
                 
                 return cursor.fetchone()
         except Exception as e:
-            print(f"Error getting user: {e}")
+            log.error("Error getting user: %s", e)
             return None
         finally:
             connection.close()
@@ -618,10 +732,17 @@ class AdminModel:
                         update_data['department'],
                         employee_id
                     ))
+                updated = cursor.rowcount > 0
+                if updated:
+                    # Names and blocks appear in the reports
+                    StatCounters.touch(cursor)
                 connection.commit()
-                return cursor.rowcount > 0
+                AdminCache.invalidate(SUSPICIOUS_KEY)
+                if updated:
+                    UserIndex.upsert('proctor', employee_id, update_data['name'], update_data['department'])
+                return updated
         except Exception as e:
-            print(f"Error updating proctor: {e}")
+            log.error("Error updating proctor: %s", e)
             return False
         finally:
             connection.close()
@@ -665,10 +786,17 @@ class AdminModel:
                         update_data['parent_phone'],
                         reg_number
                     ))
+                updated = cursor.rowcount > 0
+                if updated:
+                    # Names and blocks appear in the reports
+                    StatCounters.touch(cursor)
                 connection.commit()
-                return cursor.rowcount > 0
+                AdminCache.invalidate(SUSPICIOUS_KEY)
+                if updated:
+                    UserIndex.upsert('student', reg_number, update_data['name'], update_data['hostel_block'])
+                return updated
         except Exception as e:
-            print(f"Error updating student: {e}")
+            log.error("Error updating student: %s", e)
             return False
         finally:
             connection.close()
@@ -704,10 +832,13 @@ class AdminModel:
                         update_data['email'],
                         supervisor_id
                     ))
+                updated = cursor.rowcount > 0
                 connection.commit()
-                return cursor.rowcount > 0
+                if updated:
+                    UserIndex.upsert('supervisor', supervisor_id, update_data['name'], update_data['hostel_block'])
+                return updated
         except Exception as e:
-            print(f"Error updating supervisor: {e}")
+            log.error("Error updating supervisor: %s", e)
             return False
         finally:
             connection.close()
@@ -735,7 +866,7 @@ class AdminModel:
                 connection.commit()
                 return cursor.rowcount > 0
         except Exception as e:
-            print(f"Error resetting password: {e}")
+            log.error("Error resetting password: %s", e)
             return False
         finally:
             connection.close()
@@ -746,6 +877,9 @@ class AdminModel:
         connection = db.get_connection()
         try:
             with connection.cursor() as cursor:
+                cursor.execute("SELECT suspicious_flag, reason, destination FROM leaves WHERE leave_id = %s", (leave_id,))
+                leave = cursor.fetchone()
+                
                 sql = """
                     UPDATE leaves 
                     SET suspicious_flag = TRUE,
@@ -755,10 +889,17 @@ class AdminModel:
                     WHERE leave_id = %s
                 """
                 cursor.execute(sql, (admin_id, reason, leave_id))
+                updated = cursor.rowcount > 0
+                if updated and not leave['suspicious_flag']:
+                    StatCounters.bump(cursor, {'suspicious_leaves': 1})
+                    LeaveRollups.bump(cursor, [leave_id], {'suspicious': 1})
                 connection.commit()
-                return cursor.rowcount > 0
+                AdminCache.invalidate(STATS_KEY, SUSPICIOUS_KEY)
+                if updated:
+                    TextSearch.index_leave(leave_id, leave['reason'], leave['destination'], reason)
+                return updated
         except Exception as e:
-            print(f"Error flagging suspicious: {e}")
+            log.error("Error flagging suspicious: %s", e)
             return False
         finally:
             connection.close()
@@ -769,6 +910,9 @@ class AdminModel:
         connection = db.get_connection()
         try:
             with connection.cursor() as cursor:
+                cursor.execute("SELECT suspicious_flag, reason, destination FROM leaves WHERE leave_id = %s", (leave_id,))
+                leave = cursor.fetchone()
+                
                 sql = """
                     UPDATE leaves 
                     SET suspicious_flag = FALSE,
@@ -778,10 +922,17 @@ class AdminModel:
                     WHERE leave_id = %s
                 """
                 cursor.execute(sql, (leave_id,))
+                updated = cursor.rowcount > 0
+                if updated and leave['suspicious_flag']:
+                    StatCounters.bump(cursor, {'suspicious_leaves': -1})
+                    LeaveRollups.bump(cursor, [leave_id], {'suspicious': -1})
                 connection.commit()
-                return cursor.rowcount > 0
+                AdminCache.invalidate(STATS_KEY, SUSPICIOUS_KEY)
+                if updated:
+                    TextSearch.index_leave(leave_id, leave['reason'], leave['destination'])
+                return updated
         except Exception as e:
-            print(f"Error removing flag: {e}")
+            log.error("Error removing flag: %s", e)
             return False
         finally:
             connection.close()
@@ -818,6 +969,10 @@ class AdminModel:
         finally:
             connection.close()
     
+    @staticmethod
+    def get_users_page(role=None, search=None, sort='name', cursor=None, page_size=None):
+        return UserDirectory.page(role, search, sort, cursor, page_size)
+    
     @staticmethod
     def log_action(admin_id, action_type, target_type, target_id=None, details=None, request=None):
         """Log admin actions to admin_logs table"""
@@ -855,11 +1010,22 @@ class AdminModel:
                     ip_address,
                     user_agent
                 ))
+                # Leave actions carry the leave so the live feed can route them to its proctor
+                leave = None
+                if target_type == 'LEAVE' and target_id is not None:
+                    cursor.execute("SELECT leave_id, proctor_id, student_reg FROM leaves WHERE leave_id = %s", (target_id,))
+                    leave = cursor.fetchone()
+                event_id = ActivityLog.record(cursor, 'admin', admin_id, action_type, details, ip_address,
+                                              leave_id=leave['leave_id'] if leave else None)
                 connection.commit()
-                print(f"✓ Logged admin action: {action_type} on {target_type} {target_id}")
+                AdminCache.invalidate(LOGS_KEY)
+                if leave:
+                    LiveFeed.publish(event_id, 'admin', action_type, admin_id, details,
+                                     leave['leave_id'], leave['proctor_id'], leave['student_reg'])
+                log.debug("Logged admin action %s on %s %s", action_type, target_type, target_id)
                 return True
         except Exception as e:
-            print(f"✗ Error logging admin action: {e}")
+            log.error("Error logging admin action: %s", e)
             return False
         finally:
             connection.close()
@@ -934,7 +1100,10 @@ def create_sample_data():
                 VALUES (%s, %s, %s, %s, %s)
             """, ("ADMIN002", "Hostel Admin", admin_password, "hostel.admin@vit.ac.in", "admin"))
             
+            StatCounters.touch(cursor)
             connection.commit()
+            StatCounters.reconcile()
+            LeaveRollups.rebuild()
             print("\n✓ Sample data created successfully!")
             print("✓ Student: 24BAI10017 - Sparsh Kapoor (Password: Sparsh123)")
             print("✓ Proctor: P001 - Dr. Rajit Nair (Password: proctor123)")
@@ -0,0 +1,51 @@
+# [file name]: pagination.py
+import base64
+import json
+import os
+from datetime import datetime
+
+DEFAULT_PAGE_SIZE = int(os.getenv('ADMIN_PAGE_SIZE', 50))
+MAX_PAGE_SIZE = int(os.getenv('ADMIN_MAX_PAGE_SIZE', 500))
+
+def page_size(value=None):
+    """Clamp a requested page size to [1, MAX_PAGE_SIZE]"""
+    try:
+        size = int(value) if value else DEFAULT_PAGE_SIZE
+    except (TypeError, ValueError):
+        size = DEFAULT_PAGE_SIZE
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+def encode_cursor(*values):
+    """Opaque token holding the sort key of the last row on a page"""
+    payload = [value.isoformat() if isinstance(value, datetime) else value for value in values]
+    raw = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(token, *types):
+    """Inverse of encode_cursor; raises ValueError for a malformed token"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        payload = json.loads(raw)
+    except Exception:
+        raise ValueError("Invalid page cursor")
+    
+    if not isinstance(payload, list) or len(payload) != len(types):
+        raise ValueError("Invalid page cursor")
+    
+    values = []
+    for value, kind in zip(payload, types):
+        try:
+            values.append(datetime.fromisoformat(value) if kind is datetime else kind(value))
+        except (TypeError, ValueError):
+            raise ValueError("Invalid page cursor")
+    return values
+
+def build_page(rows, size, sort_key):
+    """Trim a LIMIT size+1 result to one page and work out the next cursor"""
+    has_more = len(rows) > size
+    rows = rows[:size]
+    return {
+        'items': rows,
+        'page_size': size,
+        'next_cursor': encode_cursor(*sort_key(rows[-1])) if has_more else None
+    }
@@ -5,21 +5,391 @@ from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib import colors
 from reportlab.lib.units import inch
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase.pdfmetrics import stringWidth
 from io import BytesIO
-import base64
+import functools
+import gc
+import itertools
+import os
+import shutil
+from tempfile import SpooledTemporaryFile
 from datetime import datetime
-from flask import session
-from database import Database
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, NameObject, NumberObject
+from leave_rollups import LeaveRollups
+import leave_analytics
+import snapshot
+from app_logging import get_logger
+
+log = get_logger('pdf_generator')
+
+# Reports larger than this spill from memory to a temporary file while being served
+PDF_SPOOL_MAX_BYTES = int(os.getenv('PDF_SPOOL_MAX_BYTES', 1024 * 1024))
+
+# Leave rows per table flowable in the statistics reports, about one page
+PDF_TABLE_ROWS = int(os.getenv('PDF_TABLE_ROWS', 40))
+
+# Flowables per separately built part of a report. reportlab keeps every page of a
+# document until it is saved, so longer reports are built in parts and concatenated
+PDF_PART_FLOWABLES = int(os.getenv('PDF_PART_FLOWABLES', 50))
+
+LEAVE_TABLE_HEADER = ['ID', 'Student', 'Type', 'From', 'To', 'Status', 'Proctor']
+LEAVE_TABLE_WIDTHS = [0.5*inch, 1.5*inch, 0.8*inch, 1*inch, 1*inch, 1*inch, 1.2*inch]
+LEAVE_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#007bff')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('FONTSIZE', (0, 0), (-1, 0), 9),
+    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+    ('FONTSIZE', (0, 1), (-1, -1), 8),
+    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
+])
+
+# User activity report tables
+ACTIVITY_TABLE_STYLE = TableStyle([
+    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#28a745')),
+    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
+    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
+    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
+    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
+    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
+])
+
+class _FlowableStream(list):
+    """Flowable list for doc.build that pulls from an iterator as the front is consumed
+    
+    build() only looks at the first few entries and deletes each one once it is
+    drawn, so just the current lookahead is ever held in memory.
+    """
+    
+    def __init__(self, head, tail, lookahead=3):
+        super().__init__(head)
+        self.tail = iter(tail)
+        self.lookahead = lookahead
+    
+    def _fill(self):
+        while self.tail is not None and list.__len__(self) < self.lookahead:
+            item = next(self.tail, None)
+            if item is None:
+                self.tail = None
+            else:
+                list.append(self, item)
+    
+    def __len__(self):
+        self._fill()
+        return list.__len__(self)
+    
+    def __getitem__(self, index):
+        self._fill()
+        return list.__getitem__(self, index)
+
+def _leave_row(leave):
+    return [
+        str(leave.get('leave_id', '')),
+        (leave.get('student_name') or '')[:20],
+        leave.get('leave_type') or '',
+        leave['from_date'].strftime('%Y-%m-%d') if leave.get('from_date') else '',
+        leave['to_date'].strftime('%Y-%m-%d') if leave.get('to_date') else '',
+        leave.get('status') or '',
+        (leave.get('proctor_name') or '')[:15]
+    ]
+
+def _leave_tables(leaves, normal_style, progress=None):
+    """Page-sized leave tables with a repeating header, PDF_TABLE_ROWS rows at a time"""
+    count = 0
+    chunk = []
+    for leave in leaves:
+        chunk.append(_leave_row(leave))
+        if len(chunk) == PDF_TABLE_ROWS:
+            count += len(chunk)
+            yield Table([LEAVE_TABLE_HEADER] + chunk, colWidths=LEAVE_TABLE_WIDTHS,
+                        style=LEAVE_TABLE_STYLE, repeatRows=1)
+            chunk = []
+            if progress:
+                progress(count)
+    if chunk:
+        count += len(chunk)
+        yield Table([LEAVE_TABLE_HEADER] + chunk, colWidths=LEAVE_TABLE_WIDTHS,
+                    style=LEAVE_TABLE_STYLE, repeatRows=1)
+        if progress:
+            progress(count)
+    if not count:
+        yield Paragraph("No leaves match the selected filters.", normal_style)
+
+def _page_number(canvas, doc, first=1):
+    canvas.saveState()
+    canvas.setFont('Helvetica', 8)
+    canvas.drawRightString(doc.pagesize[0] - doc.rightMargin, doc.bottomMargin / 2, f"Page {first + doc.page - 1}")
+    canvas.restoreState()
+
+class _PdfConcatenator:
+    """Writes the pages of a series of PDFs to `output` as one document, part by part
+    
+    Each part's objects are renumbered and written straight through, so apart
+    from the part being copied only an offset per object and a reference per
+    page are held.
+    """
+    
+    CATALOG = 1
+    PAGES = 2
+    
+    def __init__(self, output):
+        self.output = output
+        self.start = output.tell()
+        self.offsets = [None, None]     # by object number - 1; the catalog and page tree go last
+        self.pages = []
+        output.write(b"%PDF-1.4\n%\x93\x8c\x8b\x9e\n")
+    
+    def _write(self, number, obj):
+        self.offsets[number - 1] = self.output.tell() - self.start
+        self.output.write(f"{number} 0 obj\n".encode())
+        obj.write_to_stream(self.output)
+        self.output.write(b"\nendobj\n")
+    
+    def append(self, part):
+        reader = PdfReader(part)
+        catalog = reader.trailer.raw_get('/Root')
+        tree = reader.trailer['/Root'].raw_get('/Pages')
+        skip = {catalog.idnum, tree.idnum}
+        if '/Info' in reader.trailer:
+            skip.add(reader.trailer.raw_get('/Info').idnum)
+        base = len(self.offsets)
+        
+        def renumber(value):
+            if isinstance(value, IndirectObject):
+                return IndirectObject(self.PAGES if value.idnum == tree.idnum else base + value.idnum, 0, None)
+            if isinstance(value, DictionaryObject):
+                for key, item in list(dict.items(value)):
+                    dict.__setitem__(value, key, renumber(item))
+            elif isinstance(value, ArrayObject):
+                for i, item in enumerate(list.__iter__(value)):
+                    list.__setitem__(value, i, renumber(item))
+            return value
+        
+        self.pages.extend(base + kid.idnum for kid in list.__iter__(tree.get_object()['/Kids']))
+        size = reader.trailer['/Size']
+        self.offsets.extend([None] * (size - 1))
+        for number in range(1, size):
+            if number in skip:
+                continue
+            obj = reader.get_object(number)
+            if obj is not None:
+                self._write(base + number, renumber(obj))
+    
+    def close(self):
+        self._write(self.PAGES, DictionaryObject({
+            NameObject('/Type'): NameObject('/Pages'),
+            NameObject('/Kids'): ArrayObject(IndirectObject(number, 0, None) for number in self.pages),
+            NameObject('/Count'): NumberObject(len(self.pages))
+        }))
+        self._write(self.CATALOG, DictionaryObject({
+            NameObject('/Type'): NameObject('/Catalog'),
+            NameObject('/Pages'): IndirectObject(self.PAGES, 0, None)
+        }))
+        xref = self.output.tell() - self.start
+        self.output.write(f"xref\n0 {len(self.offsets) + 1}\n0000000000 65535 f \n".encode())
+        for offset in self.offsets:
+            entry = f"{offset:010d} 00000 n \n" if offset is not None else "0000000000 65535 f \n"
+            self.output.write(entry.encode())
+        self.output.write((f"trailer\n<< /Size {len(self.offsets) + 1} /Root {self.CATALOG} 0 R >>\n"
+                           f"startxref\n{xref}\n%%EOF\n").encode())
+
+def _build_in_parts(flowables, output):
+    """Lay `flowables` out into `output`, PDF_PART_FLOWABLES at a time
+    
+    Pages are numbered across the parts. A report that fits in one part is
+    copied over as built; longer ones are concatenated as each part finishes.
+    """
+    flowables = iter(flowables)
+    head = []
+    pages = 0
+    writer = None
+    while True:
+        part = SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES)
+        doc = SimpleDocTemplate(part, pagesize=letter, pageCompression=1)
+        number = functools.partial(_page_number, first=pages + 1)
+        doc.build(_FlowableStream(head, itertools.islice(flowables, PDF_PART_FLOWABLES - len(head))),
+                  onFirstPage=number, onLaterPages=number)
+        pages += doc.page
+        following = next(flowables, None)
+        part.seek(0)
+        if writer is None and following is None:
+            shutil.copyfileobj(part, output)
+        else:
+            writer = writer or _PdfConcatenator(output)
+            writer.append(part)
+        part.close()
+        if following is None:
+            break
+        head = [following]
+        # The finished document and canvas refer to each other; free them before the next part
+        del doc
+        gc.collect()
+    if writer:
+        writer.close()
+
+# Leave slip: one fixed 6x4 inch layout drawn straight onto the canvas.
+# Positions, fonts and colours are worked out once here rather than per slip.
+SLIP_PAGE_SIZE = (6*inch, 4*inch)
+SLIP_MARGIN = 0.3*inch
+SLIP_RED = colors.HexColor('#dc3545')
+SLIP_GREEN = colors.HexColor('#28a745')
+SLIP_GREY = colors.HexColor('#666666')
+SLIP_LINE = 13
+SLIP_COLUMN_WIDTH = (SLIP_PAGE_SIZE[0] - 2 * SLIP_MARGIN) / 2
+SLIP_LABEL_WIDTH = 0.95*inch
+
+# (heading, x, top, [(label, key, default)])
+SLIP_SECTIONS = [
+    ("STUDENT INFORMATION", SLIP_MARGIN, SLIP_PAGE_SIZE[1] - 0.85*inch, [
+        ("Name:", 'student_name', 'N/A'),
+        ("Registration No:", 'reg_number', 'N/A'),
+        ("Hostel Block:", 'hostel_block', 'N/A'),
+        ("Room No:", 'room_number', 'N/A')
+    ]),
+    ("LEAVE DETAILS", SLIP_MARGIN + SLIP_COLUMN_WIDTH, SLIP_PAGE_SIZE[1] - 0.85*inch, [
+        ("From:", ('from_date', 'from_time'), 'N/A'),
+        ("To:", ('to_date', 'to_time'), 'N/A'),
+        ("Destination:", 'destination', 'Not specified'),
+        ("Proctor:", 'proctor_name', 'N/A')
+    ]),
+    ("VERIFICATION", SLIP_MARGIN, SLIP_PAGE_SIZE[1] - 2.1*inch, [
+        ("Verified By:", 'supervisor_name', 'N/A'),
+        ("Verified At:", 'verified_at', 'N/A')
+    ])
+]
+
+def _fit(text, font, size, width):
+    """Text cut down with an ellipsis to fit `width` points"""
+    if stringWidth(text, font, size) <= width:
+        return text
+    while text and stringWidth(text + '...', font, size) > width:
+        text = text[:-1]
+    return text + '...'
+
+def _slip_value(slip_data, key, default):
+    if isinstance(key, tuple):
+        day, at = slip_data.get(key[0]), slip_data.get(key[1])
+        return f"{day or default} at {at or default}"
+    value = slip_data.get(key)
+    return str(value) if value not in (None, '') else default
+
+def _draw_slip_static(pdf):
+    """Everything on a slip that is the same for every student, as one text object"""
+    width, height = SLIP_PAGE_SIZE
+    pdf.setStrokeColor(SLIP_RED)
+    pdf.setLineWidth(1)
+    pdf.line(SLIP_MARGIN, height - 0.58*inch, width - SLIP_MARGIN, height - 0.58*inch)
+    
+    # Grouped by colour and font, so each is set as few times as possible
+    labels = pdf.beginText()
+    labels.setFillColor(SLIP_RED)
+    labels.setFont('Helvetica-Bold', 14)
+    labels.setTextOrigin(SLIP_TITLE_X, height - 0.45*inch)
+    labels.textOut(SLIP_TITLE)
+    labels.setFillColor(SLIP_GREY)
+    labels.setFont('Helvetica-Bold', 9)
+    for heading, x, top, _ in SLIP_SECTIONS:
+        labels.setTextOrigin(x, top)
+        labels.textOut(heading)
+    labels.setFillColor(colors.black)
+    labels.setFont('Helvetica-Bold', 8, leading=SLIP_LINE)
+    for _, x, top, fields in SLIP_SECTIONS:
+        labels.setTextOrigin(x, top - SLIP_LINE - 2)
+        labels.textLines([label for label, _, _ in fields])
+    labels.setTextOrigin(SLIP_MARGIN, SLIP_STATUS_Y)
+    labels.textOut("Status:")
+    labels.setFillColor(SLIP_GREEN)
+    labels.setTextOrigin(SLIP_MARGIN + SLIP_LABEL_WIDTH, SLIP_STATUS_Y)
+    labels.textOut("APPROVED")
+    labels.setFillColor(colors.black)
+    labels.setFont('Helvetica', 7)
+    labels.setTextOrigin(SLIP_NOTICE_X, 0.45*inch)
+    labels.textOut(SLIP_NOTICE)
+    pdf.drawText(labels)
+
+def _slip_form(pdf):
+    """Define the fixed part of the slip as a form XObject on `pdf`, once per canvas"""
+    if not pdf.hasForm(SLIP_FORM):
+        pdf.beginForm(SLIP_FORM)
+        _draw_slip_static(pdf)
+        pdf.endForm()
+
+SLIP_STATUS_Y = SLIP_PAGE_SIZE[1] - 2.1*inch - 3 * SLIP_LINE - 2
+SLIP_TITLE = "VIT LEAVE SLIP"
+SLIP_TITLE_X = (SLIP_PAGE_SIZE[0] - stringWidth(SLIP_TITLE, 'Helvetica-Bold', 14)) / 2
+SLIP_NOTICE = "This slip must be presented when leaving and returning to campus."
+SLIP_NOTICE_X = (SLIP_PAGE_SIZE[0] - stringWidth(SLIP_NOTICE, 'Helvetica', 7)) / 2
+SLIP_FORM = 'slipStatic'
+
+# (x, y, key, default) of each value, in drawing order
+SLIP_VALUES = [
+    (x + SLIP_LABEL_WIDTH, top - SLIP_LINE - 2 - i * SLIP_LINE, key, default)
+    for _, x, top, fields in SLIP_SECTIONS
+    for i, (_, key, default) in enumerate(fields)
+]
+SLIP_VALUE_WIDTH = SLIP_COLUMN_WIDTH - SLIP_LABEL_WIDTH - 6
+
+def draw_slip(pdf, slip_data, show_page=True, save=True, shared=False):
+    """Draw one slip on `pdf` (a fresh canvas sized SLIP_PAGE_SIZE)
+    
+    With `shared`, the fixed drawing is a form that every slip on the canvas
+    references; a one-slip canvas draws it in place instead.
+    """
+    if shared:
+        _slip_form(pdf)
+        pdf.doForm(SLIP_FORM)
+    else:
+        pdf.saveState()
+        _draw_slip_static(pdf)
+        pdf.restoreState()
+    
+    # The values, all in one text object
+    text = pdf.beginText()
+    text.setFont('Helvetica', 8)
+    for x, y, key, default in SLIP_VALUES:
+        text.setTextOrigin(x, y)
+        text.textOut(_fit(_slip_value(slip_data, key, default), 'Helvetica', 8, SLIP_VALUE_WIDTH))
+    slip_id = f"Slip ID: {datetime.now().strftime('%Y%m%d%H%M%S')}"
+    text.setFont('Helvetica', 7)
+    text.setTextOrigin((SLIP_PAGE_SIZE[0] - stringWidth(slip_id, 'Helvetica', 7)) / 2, 0.3*inch)
+    text.textOut(slip_id)
+    pdf.drawText(text)
+    
+    if show_page:
+        pdf.showPage()
+    if save:
+        pdf.save()
+    return pdf
+
+def render_slips(slips, first_page=1, total_pages=None):
+    """One PDF with a page per slip, numbered from `first_page`; runs in slip pack worker processes"""
+    buffer = BytesIO()
+    pdf = canvas.Canvas(buffer, pagesize=SLIP_PAGE_SIZE, pageCompression=1)
+    total_pages = total_pages or first_page + len(slips) - 1
+    for number, slip_data in enumerate(slips, first_page):
+        draw_slip(pdf, slip_data, show_page=False, save=False, shared=True)
+        pdf.setFont('Helvetica', 7)
+        pdf.drawRightString(SLIP_PAGE_SIZE[0] - SLIP_MARGIN, 0.3*inch, f"{number} / {total_pages}")
+        pdf.showPage()
+    pdf.save()
+    return buffer.getvalue()
 
 class PDFGenerator:
     @staticmethod
-    def generate_leave_report(leave_data, report_type="monthly_summary"):
-        """Generate PDF report for leaves"""
-        buffer = BytesIO()
+    def generate_leave_report(leave_data, report_type="monthly_summary", output=None, progress=None):
+        """Write a PDF report to `output` (a new spooled temporary file by default), rewound for reading
+        
+        `progress(rows)` is called after each chunk of a leave statistics report.
+        """
+        if output is None:
+            output = SpooledTemporaryFile(max_size=PDF_SPOOL_MAX_BYTES)
         
-        # Create PDF document
-        doc = SimpleDocTemplate(buffer, pagesize=letter)
         elements = []
+        tail = []
         styles = getSampleStyleSheet()
         
         # Custom styles
@@ -50,7 +420,7 @@ class PDFGenerator:
         # Report details
         elements.append(Paragraph(f"Report Type: {report_type.replace('_', ' ').title()}", normal_style))
         elements.append(Paragraph(f"Generated On: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}", normal_style))
-        elements.append(Paragraph(f"Generated By: {session.get('admin_name', 'Administrator')}", normal_style))
+        elements.append(Paragraph(f"Generated By: {leave_data.get('generated_by') or 'Administrator'}", normal_style))
         
         elements.append(Spacer(1, 20))
         
@@ -90,39 +460,12 @@ class PDFGenerator:
             
             elements.append(summary_table)
         
-        elif report_type == "leave_statistics":
+        elif report_type in ("leave_statistics", "suspicious_activity"):
             elements.append(Paragraph("Detailed Leave Statistics", styles['Heading2']))
             
-            if leave_data.get('leaves'):
-                # Create detailed leaves table
-                leaves_data = [['ID', 'Student', 'Type', 'From', 'To', 'Status', 'Proctor']]
-                
-                for leave in leave_data['leaves'][:50]:  # Limit to 50 rows for PDF
-                    leaves_data.append([
-                        str(leave.get('leave_id', '')),
-                        leave.get('student_name', '')[:20],
-                        leave.get('leave_type', ''),
-                        leave.get('from_date', '').strftime('%Y-%m-%d') if leave.get('from_date') else '',
-                        leave.get('to_date', '').strftime('%Y-%m-%d') if leave.get('to_date') else '',
-                        leave.get('status', ''),
-                        leave.get('proctor_name', '')[:15]
-                    ])
-                
-                leaves_table = Table(leaves_data, colWidths=[0.5*inch, 1.5*inch, 0.8*inch, 1*inch, 1*inch, 1*inch, 1.2*inch])
-                leaves_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#007bff')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'CENTER'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('FONTSIZE', (0, 0), (-1, 0), 9),
-                    ('BOTTOMPADDING', (0, 0), (-1, 0), 10),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                    ('FONTSIZE', (0, 1), (-1, -1), 8),
-                    ('ROWBACKGROUNDS', (0, 1), (-1, -1), [colors.white, colors.HexColor('#f8f9fa')]),
-                ]))
-                
-                elements.append(leaves_table)
+            # Rows may be a generator straight off the database; tables are
+            # built one page-sized chunk at a time as the document consumes them
+            tail = _leave_tables(leave_data.get('leaves') or [], normal_style, progress)
         
         elif report_type == "user_activity":
             elements.append(Paragraph("User Activity Report", styles['Heading2']))
@@ -143,212 +486,68 @@ class PDFGenerator:
                 ]
                 
                 stats_table = Table(stats_data, colWidths=[2*inch, 2*inch])
-                stats_table.setStyle(TableStyle([
-                    ('BACKGROUND', (0, 0), (-1, 0), colors.HexColor('#28a745')),
-                    ('TEXTCOLOR', (0, 0), (-1, 0), colors.white),
-                    ('ALIGN', (0, 0), (-1, -1), 'LEFT'),
-                    ('FONTNAME', (0, 0), (-1, 0), 'Helvetica-Bold'),
-                    ('BACKGROUND', (0, 1), (-1, -1), colors.white),
-                    ('GRID', (0, 0), (-1, -1), 1, colors.grey),
-                ]))
+                stats_table.setStyle(ACTIVITY_TABLE_STYLE)
                 
                 elements.append(stats_table)
+                
+                if user_stats.get('length_histogram'):
+                    elements.append(Spacer(1, 20))
+                    elements.append(Paragraph("Leave Length", styles['Heading3']))
+                    histogram_data = [['Length', 'Leaves']] + [
+                        [label, str(count)] for label, count in user_stats['length_histogram']
+                    ]
+                    histogram_table = Table(histogram_data, colWidths=[2*inch, 2*inch])
+                    histogram_table.setStyle(ACTIVITY_TABLE_STYLE)
+                    elements.append(histogram_table)
+                
+                if user_stats.get('block_percentiles'):
+                    elements.append(Spacer(1, 20))
+                    elements.append(Paragraph("Leave Length by Block (days)", styles['Heading3']))
+                    percentile_data = [['Block', 'Leaves', 'Median', '90th', '95th']] + [
+                        [block, str(row['leaves']), str(row['p50']), str(row['p90']), str(row['p95'])]
+                        for block, row in sorted(user_stats['block_percentiles'].items())
+                    ]
+                    percentile_table = Table(percentile_data, colWidths=[1*inch] * 5, repeatRows=1)
+                    percentile_table.setStyle(ACTIVITY_TABLE_STYLE)
+                    elements.append(percentile_table)
         
         # Footer
-        elements.append(Spacer(1, 30))
-        elements.append(Paragraph("This is an official report generated by VIT Leave Management System", 
-                                 ParagraphStyle('Footer', parent=normal_style, fontSize=8, alignment=1)))
-        elements.append(Paragraph(f"Page 1 of 1 | Report ID: {datetime.now().strftime('%Y%m%d%H%M%S')}", 
-                                 ParagraphStyle('Footer', parent=normal_style, fontSize=8, alignment=1)))
-        
-        # Build PDF
-        doc.build(elements)
-        
-        # Get PDF data
-        pdf_data = buffer.getvalue()
-        buffer.close()
-        
-        # Encode to base64 for download
-        pdf_base64 = base64.b64encode(pdf_data).decode('utf-8')
-        
-        return pdf_base64
+        footer = [
+            Spacer(1, 30),
+            Paragraph("This is an official report generated by VIT Leave Management System", 
+                      ParagraphStyle('Footer', parent=normal_style, fontSize=8, alignment=1)),
+            Paragraph(f"Report ID: {datetime.now().strftime('%Y%m%d%H%M%S')}", 
+                      ParagraphStyle('Footer', parent=normal_style, fontSize=8, alignment=1))
+        ]
+        
+        _build_in_parts(itertools.chain(elements, tail, footer), output)
+        output.seek(0)
+        return output
     
     @staticmethod
     def generate_slip_pdf(slip_data):
         """Generate PDF slip for leave verification"""
         buffer = BytesIO()
-        
-        # Create PDF document
-        doc = SimpleDocTemplate(buffer, pagesize=(6*inch, 4*inch))  # Smaller size for slip
-        elements = []
-        styles = getSampleStyleSheet()
-        
-        # Custom styles for slip
-        header_style = ParagraphStyle(
-            'SlipHeader',
-            parent=styles['Heading1'],
-            fontSize=14,
-            alignment=1,
-            spaceAfter=10,
-            textColor=colors.HexColor('#dc3545')
-        )
-        
-        normal_bold = ParagraphStyle(
-            'NormalBold',
-            parent=styles['Normal'],
-            fontName='Helvetica-Bold'
-        )
-        
-        # Header
-        elements.append(Paragraph("VIT LEAVE SLIP", header_style))
-        
-        # Student Information
-        elements.append(Paragraph("STUDENT INFORMATION", styles['Heading2']))
-        
-        student_info = f"""
-        <b>Name:</b> {slip_data.get('student_name', 'N/A')}<br/>
-        <b>Registration No:</b> {slip_data.get('reg_number', 'N/A')}<br/>
-        <b>Hostel Block:</b> {slip_data.get('hostel_block', 'N/A')}<br/>
-        <b>Room No:</b> {slip_data.get('room_number', 'N/A')}<br/>
-        """
-        elements.append(Paragraph(student_info, styles['Normal']))
-        
-        elements.append(Spacer(1, 10))
-        
-        # Leave Details
-        elements.append(Paragraph("LEAVE DETAILS", styles['Heading2']))
-        
-        leave_info = f"""
-        <b>From:</b> {slip_data.get('from_date', 'N/A')} at {slip_data.get('from_time', 'N/A')}<br/>
-        <b>To:</b> {slip_data.get('to_date', 'N/A')} at {slip_data.get('to_time', 'N/A')}<br/>
-        <b>Destination:</b> {slip_data.get('destination', 'Not specified')}<br/>
-        <b>Proctor:</b> {slip_data.get('proctor_name', 'N/A')}<br/>
-        """
-        elements.append(Paragraph(leave_info, styles['Normal']))
-        
-        elements.append(Spacer(1, 10))
-        
-        # Verification Details
-        elements.append(Paragraph("VERIFICATION", styles['Heading2']))
-        
-        verify_info = f"""
-        <b>Verified By:</b> {slip_data.get('supervisor_name', 'N/A')}<br/>
-        <b>Verified At:</b> {slip_data.get('verified_at', 'N/A')}<br/>
-        <b>Status:</b> <font color="green"><b>APPROVED</b></font><br/>
-        """
-        elements.append(Paragraph(verify_info, styles['Normal']))
-        
-        elements.append(Spacer(1, 20))
-        
-        # Disclaimer
-        elements.append(Paragraph(
-            "This slip must be presented when leaving and returning to campus.",
-            ParagraphStyle('Disclaimer', parent=styles['Normal'], fontSize=8, alignment=1)
-        ))
-        
-        elements.append(Paragraph(
-            f"Slip ID: {datetime.now().strftime('%Y%m%d%H%M%S')}",
-            ParagraphStyle('SlipID', parent=styles['Normal'], fontSize=8, alignment=1)
-        ))
-        
-        # Build PDF
-        doc.build(elements)
-        
-        # Get PDF data
-        pdf_data = buffer.getvalue()
-        buffer.close()
-        
-        return pdf_data
+        draw_slip(canvas.Canvas(buffer, pagesize=SLIP_PAGE_SIZE, pageCompression=0), slip_data)
+        return buffer.getvalue()
+
+# 'snapshot' answers reports from the latest Parquet snapshot instead of MySQL
+REPORT_DATA_SOURCE = os.getenv('REPORT_DATA_SOURCE', 'mysql').lower()
 
 class ReportData:
     @staticmethod
     def get_monthly_summary():
         """Get monthly summary data for reports"""
-        db = Database()
-        connection = db.get_connection()
-        try:
-            with connection.cursor() as cursor:
-                # Get data for last 6 months
-                cursor.execute("""
-                    SELECT 
-                        DATE_FORMAT(applied_at, '%Y-%m') as month,
-                        COUNT(*) as total,
-                        SUM(CASE WHEN status = 'approved' THEN 1 ELSE 0 END) as approved,
-                        SUM(CASE WHEN status = 'rejected' THEN 1 ELSE 0 END) as rejected,
-                        SUM(CASE WHEN status = 'pending' THEN 1 ELSE 0 END) as pending,
-                        SUM(CASE WHEN suspicious_flag = TRUE THEN 1 ELSE 0 END) as suspicious
-                    FROM leaves
-                    WHERE applied_at >= DATE_SUB(NOW(), INTERVAL 6 MONTH)
-                    GROUP BY DATE_FORMAT(applied_at, '%Y-%m')
-                    ORDER BY month DESC
-                """)
-                
-                return cursor.fetchall()
-        finally:
-            connection.close()
+        if REPORT_DATA_SOURCE == 'snapshot':
+            try:
+                return snapshot.monthly_summary()
+            except FileNotFoundError as e:
+                log.warning("%s; reading MySQL instead", e)
+        
+        # Read off the monthly rollup instead of grouping every leave
+        return LeaveRollups.monthly_summary(months=6)
     
     @staticmethod
     def get_user_activity_stats():
         """Get user activity statistics"""
-        db = Database()
-        connection = db.get_connection()
-        try:
-            with connection.cursor() as cursor:
-                stats = {}
-                
-                # Basic counts
-                cursor.execute("SELECT COUNT(*) as count FROM students")
-                stats['total_students'] = cursor.fetchone()['count']
-                
-                cursor.execute("SELECT COUNT(*) as count FROM proctors")
-                stats['total_proctors'] = cursor.fetchone()['count']
-                
-                cursor.execute("SELECT COUNT(*) as count FROM hostel_supervisors")
-                stats['total_supervisors'] = cursor.fetchone()['count']
-                
-                # Active users (last 30 days)
-                cursor.execute("""
-                    SELECT COUNT(DISTINCT student_reg) as count 
-                    FROM leaves 
-                    WHERE applied_at >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-                """)
-                stats['active_students'] = cursor.fetchone()['count']
-                
-                # Average leaves per student
-                cursor.execute("""
-                    SELECT AVG(leave_count) as avg_count 
-                    FROM (
-                        SELECT student_reg, COUNT(*) as leave_count 
-                        FROM leaves 
-                        GROUP BY student_reg
-                    ) as student_leaves
-                """)
-                stats['avg_leaves_per_student'] = cursor.fetchone()['avg_count'] or 0
-                
-                # Most active proctor
-                cursor.execute("""
-                    SELECT p.name, COUNT(l.leave_id) as leave_count
-                    FROM leaves l
-                    JOIN proctors p ON l.proctor_id = p.employee_id
-                    GROUP BY l.proctor_id
-                    ORDER BY leave_count DESC
-                    LIMIT 1
-                """)
-                most_active = cursor.fetchone()
-                stats['most_active_proctor'] = f"{most_active['name']} ({most_active['leave_count']} leaves)" if most_active else "N/A"
-                
-                # Most active hostel block
-                cursor.execute("""
-                    SELECT s.hostel_block, COUNT(l.leave_id) as leave_count
-                    FROM leaves l
-                    JOIN students s ON l.student_reg = s.reg_number
-                    GROUP BY s.hostel_block
-                    ORDER BY leave_count DESC
-                    LIMIT 1
-                """)
-                most_active_block = cursor.fetchone()
-                stats['most_active_block'] = f"{most_active_block['hostel_block']} ({most_active_block['leave_count']} leaves)" if most_active_block else "N/A"
-                
-                return stats
-        finally:
-            connection.close()
\ No newline at end of file
+        return leave_analytics.user_activity_stats()
\ No newline at end of file
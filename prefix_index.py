@@ -0,0 +1,187 @@
+# [file name]: prefix_index.py
+import os
+import threading
+import time
+from bisect import bisect_left, insort
+from threading import Lock
+from database import Database
+from app_logging import get_logger, sampled
+
+log = get_logger('prefix_index')
+
+# Rebuild when older than this, to pick up writes handled by other workers
+INDEX_MAX_AGE = int(os.getenv('USER_INDEX_MAX_AGE', 600))
+
+# Tables feeding the typeahead: type -> (table, id column, detail column)
+USER_SOURCES = {
+    'student': ('students', 'reg_number', 'hostel_block'),
+    'proctor': ('proctors', 'employee_id', 'department'),
+    'supervisor': ('hostel_supervisors', 'supervisor_id', 'hostel_block')
+}
+
+def _index_keys(user_id, name):
+    """Lower-cased ID, full name and each later word of the name"""
+    keys = {str(user_id).lower()}
+    words = (name or '').lower().split()
+    if words:
+        keys.add(' '.join(words))
+        keys.update(words[1:])
+    return keys
+
+class PrefixIndex:
+    """Sorted array of (key, type, id) searched with bisect"""
+    
+    def __init__(self):
+        self.entries = []
+        self.users = {}     # (type, id) -> {'id', 'name', 'type', 'detail'}
+        self.built_at = 0.0
+        self.lock = Lock()
+    
+    def upsert(self, user_type, user_id, name, detail=None):
+        with self.lock:
+            self._remove(user_type, user_id)
+            self.users[(user_type, user_id)] = {
+                'id': user_id, 'name': name, 'type': user_type, 'detail': detail
+            }
+            for key in _index_keys(user_id, name):
+                insort(self.entries, (key, user_type, user_id))
+    
+    def remove(self, user_type, user_id):
+        with self.lock:
+            self._remove(user_type, user_id)
+    
+    def _remove(self, user_type, user_id):
+        user = self.users.pop((user_type, user_id), None)
+        if not user:
+            return
+        for key in _index_keys(user_id, user['name']):
+            position = bisect_left(self.entries, (key, user_type, user_id))
+            if position < len(self.entries) and self.entries[position] == (key, user_type, user_id):
+                del self.entries[position]
+    
+    def lookup(self, prefix, user_types=None, limit=10):
+        """Users whose ID or any name word starts with prefix, in key order"""
+        prefix = ' '.join(prefix.lower().split())
+        if not prefix:
+            return []
+        results = []
+        seen = set()
+        with self.lock:
+            position = bisect_left(self.entries, (prefix,))
+            while position < len(self.entries) and len(results) < limit:
+                key, user_type, user_id = self.entries[position]
+                if not key.startswith(prefix):
+                    break
+                position += 1
+                if (user_types and user_type not in user_types) or (user_type, user_id) in seen:
+                    continue
+                seen.add((user_type, user_id))
+                results.append(dict(self.users[(user_type, user_id)]))
+        return results
+    
+    def __len__(self):
+        return len(self.users)
+
+class UserIndex:
+    _index = PrefixIndex()
+    _build_lock = Lock()
+    # Mutations seen while a build is reading the tables, replayed before the swap
+    _pending = None
+    _pending_lock = Lock()
+    
+    @classmethod
+    def warm(cls, force=False):
+        """Build the worker's index from the user tables if it is missing or stale"""
+        if not force and time.monotonic() - cls._index.built_at < INDEX_MAX_AGE:
+            return cls._index
+        with cls._build_lock:
+            if not force and time.monotonic() - cls._index.built_at < INDEX_MAX_AGE:
+                return cls._index
+            with cls._pending_lock:
+                cls._pending = []
+            rows = []
+            db = Database()
+            connection = db.get_connection()
+            try:
+                with connection.cursor() as cursor:
+                    for user_type, (table, id_column, detail_column) in USER_SOURCES.items():
+                        cursor.execute(f"SELECT {id_column} as id, name, {detail_column} as detail FROM {table}")
+                        rows.extend((user_type, row) for row in cursor.fetchall())
+            except Exception:
+                with cls._pending_lock:
+                    cls._pending = None
+                raise
+            finally:
+                connection.close()
+            
+            # Build the array in one sort rather than inserting row by row
+            index = PrefixIndex()
+            for user_type, row in rows:
+                index.users[(user_type, row['id'])] = {
+                    'id': row['id'], 'name': row['name'], 'type': user_type, 'detail': row['detail']
+                }
+                index.entries.extend((key, user_type, row['id']) for key in _index_keys(row['id'], row['name']))
+            index.entries.sort()
+            index.built_at = time.monotonic()
+            with cls._pending_lock:
+                # Writes that landed after the SELECT would otherwise be lost with the old index
+                for method, args in cls._pending:
+                    getattr(index, method)(*args)
+                cls._pending = None
+                cls._index = index
+            log.info("User prefix index built (%d users)", len(index))
+            return index
+    
+    @classmethod
+    def lookup(cls, prefix, user_types=None, limit=10):
+        index = cls._index
+        if not index.built_at:
+            # Nothing to serve yet, so this request waits for the first build
+            try:
+                index = cls.warm()
+            except Exception as e:
+                log.warning("User prefix index unavailable: %s", e, extra=sampled('prefix_index'))
+        elif time.monotonic() - index.built_at >= INDEX_MAX_AGE:
+            # Keep answering from the stale index while a fresh one is built
+            start_warmup()
+        return index.lookup(prefix, user_types, limit)
+    
+    @classmethod
+    def upsert(cls, user_type, user_id, name, detail=None):
+        """Apply an add or edit; skipped until the index has been built"""
+        if user_type in USER_SOURCES:
+            cls._apply('upsert', (user_type, user_id, name, detail))
+    
+    @classmethod
+    def remove(cls, user_type, user_id):
+        cls._apply('remove', (user_type, user_id))
+    
+    @classmethod
+    def _apply(cls, method, args):
+        with cls._pending_lock:
+            if cls._pending is not None:
+                cls._pending.append((method, args))
+            index = cls._index
+        if index.built_at:
+            getattr(index, method)(*args)
+
+_warmup_lock = Lock()
+
+def start_warmup():
+    """Build the index on a background thread, unless one is already building it"""
+    if not _warmup_lock.acquire(blocking=False):
+        return
+    
+    def warm():
+        try:
+            UserIndex.warm()
+        except Exception as e:
+            log.error("User prefix index warm-up failed: %s", e)
+        finally:
+            _warmup_lock.release()
+    
+    try:
+        threading.Thread(target=warm, name='user-index-warmup', daemon=True).start()
+    except Exception:
+        _warmup_lock.release()
+        raise
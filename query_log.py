@@ -0,0 +1,215 @@
+# [file name]: query_log.py
+import hashlib
+import math
+import os
+import re
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from pymysql.cursors import DictCursor, SSCursor
+from app_logging import get_logger, sampled
+
+log = get_logger('query_log')
+
+# Set to 0 to stop collecting per-query statistics
+QUERY_LOG_ENABLED = os.getenv('QUERY_LOG_ENABLED', '1') != '0'
+
+# Statements at least this slow are logged and get their EXPLAIN captured
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', 200))
+
+# Durations kept per fingerprint for the percentiles
+QUERY_LOG_SAMPLES = int(os.getenv('QUERY_LOG_SAMPLES', 500))
+
+# Distinct fingerprints tracked; later ones are counted under OTHER
+QUERY_LOG_MAX_FINGERPRINTS = int(os.getenv('QUERY_LOG_MAX_FINGERPRINTS', 1000))
+
+# Recent slow statements kept for the admin page
+SLOW_QUERY_RECENT = 100
+
+# Longer statements, such as executemany()'s multi-row INSERTs, are shortened
+# before fingerprinting and never cached
+FINGERPRINT_MAX_SQL = 4096
+
+OTHER = '(other statements)'
+
+PERCENTILES = (50, 95, 99)
+
+# Statements MySQL can EXPLAIN without running them
+EXPLAINABLE = ('select', 'update', 'delete', 'insert', 'replace')
+
+# Functions MySQL may evaluate while explaining; statements using them are left alone
+UNSAFE_TO_EXPLAIN = ('get_lock(', 'release_lock(', 'is_free_lock(', 'sleep(')
+
+_COMMENTS = re.compile(r'/\*.*?\*/|--[^\n]*|#[^\n]*', re.S)
+_STRINGS = re.compile(r"'(?:[^'\\]|\\.|'')*'|\"(?:[^\"\\]|\\.|\"\")*\"")
+_PLACEHOLDERS = re.compile(r'%\(\w+\)s|%s')
+_NUMBERS = re.compile(r'\b-?\d+(?:\.\d+)?\b')
+_SPACES = re.compile(r'\s+')
+_LISTS = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ROWS = re.compile(r'\(\?\+\)(?:\s*,\s*\(\?\+\))+')
+_VALUES = re.compile(r'\bvalues\s*\(', re.I)
+_ON_DUPLICATE = re.compile(r'\bon\s+duplicate\s+key\s+update\b', re.I)
+_CUT_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*[^()]*$')
+
+def _shorten(sql):
+    """A long statement cut down to its shape: rows of VALUES dropped, other text truncated"""
+    head = _VALUES.search(sql, 0, FINGERPRINT_MAX_SQL)
+    if head:
+        tail = sql[-FINGERPRINT_MAX_SQL:]
+        update = _ON_DUPLICATE.search(tail)
+        return sql[:head.end()] + '?+)' + (' ' + tail[update.start():] if update else ''), False
+    return sql[:FINGERPRINT_MAX_SQL], True
+
+def fingerprint(sql):
+    """SQL with literals and placeholders as ?, value lists collapsed, in lower case"""
+    truncated = False
+    if len(sql) > FINGERPRINT_MAX_SQL:
+        sql, truncated = _shorten(sql)
+    sql = _STRINGS.sub('?', sql)
+    sql = _COMMENTS.sub(' ', sql)
+    sql = _PLACEHOLDERS.sub('?', sql)
+    sql = _NUMBERS.sub('?', sql)
+    sql = _SPACES.sub(' ', sql).strip().lower()
+    sql = _LISTS.sub('(?+)', sql)
+    sql = _ROWS.sub('(?+)', sql)
+    if truncated:
+        # The cut may land inside a long IN (...) list
+        sql = _CUT_LIST.sub('(?+', sql) + ' ...'
+    return sql
+
+def fingerprint_id(text):
+    return hashlib.md5(text.encode()).hexdigest()[:12]
+
+class _QueryStats:
+    __slots__ = ('count', 'total', 'max', 'rows', 'errors', 'slow', 'samples', 'last_seen', 'explain')
+    
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.rows = 0
+        self.errors = 0
+        self.slow = 0
+        self.samples = deque(maxlen=QUERY_LOG_SAMPLES)
+        self.last_seen = None
+        self.explain = None     # None, 'pending', a list of EXPLAIN rows or an error string
+
+_lock = threading.Lock()
+_stats = {}          # fingerprint -> _QueryStats
+_slow = deque(maxlen=SLOW_QUERY_RECENT)
+_fingerprints = {}   # SQL template -> fingerprint, so repeated statements skip the regexes
+
+def _fingerprint_cached(sql):
+    if len(sql) > FINGERPRINT_MAX_SQL:
+        return fingerprint(sql)
+    text = _fingerprints.get(sql)
+    if text is None:
+        if len(_fingerprints) > 4 * QUERY_LOG_MAX_FINGERPRINTS:
+            _fingerprints.clear()
+        text = _fingerprints[sql] = fingerprint(sql)
+    return text
+
+def observe(cursor, sql, seconds, rows=0, failed=False, route=None):
+    """Record one statement run on `cursor`; EXPLAINs it the first time it is slow"""
+    if not QUERY_LOG_ENABLED:
+        return
+    text = _fingerprint_cached(sql)
+    ms = seconds * 1000
+    slow = ms >= SLOW_QUERY_MS
+    explain = False
+    with _lock:
+        stats = _stats.get(text)
+        if stats is None:
+            if len(_stats) >= QUERY_LOG_MAX_FINGERPRINTS:
+                text = OTHER
+                stats = _stats.get(OTHER)
+            if stats is None:
+                stats = _stats[text] = _QueryStats()
+        stats.count += 1
+        stats.total += ms
+        stats.max = max(stats.max, ms)
+        stats.rows += rows
+        stats.errors += failed
+        stats.samples.append(ms)
+        stats.last_seen = time.time()
+        if slow:
+            stats.slow += 1
+            _slow.append({
+                'at': datetime.now().isoformat(timespec='seconds'),
+                'ms': round(ms, 1),
+                'fingerprint_id': fingerprint_id(text),
+                'fingerprint': text,
+                'route': route
+            })
+            if stats.explain is None and not failed and text != OTHER:
+                stats.explain = 'pending'
+                explain = True
+    
+    if slow:
+        # Sampled per fingerprint, so one hot slow statement cannot flood the log
+        log.warning("Slow query (%.0f ms)", ms, extra=sampled(f"slow_query:{fingerprint_id(text)}",
+                                                          route=route, fingerprint=text[:300]))
+    if explain:
+        stats.explain = _explain(cursor, text)
+
+def _explain(cursor, text):
+    """EXPLAIN rows for the statement the cursor just ran, on the same connection"""
+    executed = cursor._executed or ''
+    words = executed.split(None, 1)
+    if not words or words[0].lower() not in EXPLAINABLE or any(name in text for name in UNSAFE_TO_EXPLAIN):
+        return 'Not explainable'
+    if isinstance(cursor, SSCursor):
+        # The connection is still streaming this statement's rows
+        return 'Not explained: unbuffered cursor'
+    try:
+        # A plain cursor, so the EXPLAIN itself is not recorded
+        explain_cursor = DictCursor(cursor.connection)
+        try:
+            explain_cursor.execute(f"EXPLAIN {executed}")
+            return [dict(row) for row in explain_cursor.fetchall()]
+        finally:
+            explain_cursor.close()
+    except Exception as e:
+        return f"EXPLAIN failed: {e}"
+
+def _percentile(ordered, p):
+    return ordered[max(0, math.ceil(p / 100 * len(ordered)) - 1)]
+
+def snapshot(sort='total_ms'):
+    """Per-fingerprint statistics, slowest total first, plus the recent slow statements"""
+    with _lock:
+        entries = [(text, stats.count, stats.total, stats.max, stats.rows, stats.errors, stats.slow,
+                    sorted(stats.samples), stats.last_seen, stats.explain)
+                   for text, stats in _stats.items()]
+        slow = list(_slow)
+    
+    queries = []
+    for text, count, total, longest, rows, errors, slow_count, samples, last_seen, explain in entries:
+        queries.append({
+            'fingerprint_id': fingerprint_id(text),
+            'fingerprint': text,
+            'count': count,
+            'total_ms': round(total, 1),
+            'avg_ms': round(total / count, 2),
+            'max_ms': round(longest, 1),
+            **{f"p{p}_ms": round(_percentile(samples, p), 2) for p in PERCENTILES},
+            'rows': rows,
+            'errors': errors,
+            'slow': slow_count,
+            'last_seen': datetime.fromtimestamp(last_seen).isoformat(timespec='seconds'),
+            'explain': None if explain == 'pending' else explain
+        })
+    key = sort if sort in ('total_ms', 'count', 'max_ms', 'p95_ms', 'slow') else 'total_ms'
+    queries.sort(key=lambda query: query[key], reverse=True)
+    return {
+        'slow_query_ms': SLOW_QUERY_MS,
+        'samples_per_fingerprint': QUERY_LOG_SAMPLES,
+        'queries': queries,
+        'recent_slow': slow[::-1]
+    }
+
+def reset():
+    with _lock:
+        _stats.clear()
+        _slow.clear()
@@ -0,0 +1,115 @@
+# [file name]: report_cache.py
+import hashlib
+import json
+import os
+import shutil
+from datetime import date
+from threading import Lock
+from app_logging import get_logger
+
+log = get_logger('report_cache')
+
+# Finished PDF reports are kept here as <key>.pdf
+REPORT_CACHE_DIR = os.getenv('REPORT_CACHE_DIR', 'report_cache')
+
+# Total size the cache may grow to before the least recently read reports go (0 disables)
+REPORT_CACHE_MAX_BYTES = int(os.getenv('REPORT_CACHE_MAX_BYTES', 200 * 1024 * 1024))
+
+class ReportCache:
+    """Disk cache of generated reports, shared by every worker on the host.
+    
+    Keys cover the report type, its parameters, the data version and the day,
+    so a write anywhere, or a new day for the date-relative reports, gives new
+    keys and old entries simply stop being read until eviction removes them.
+    """
+    _lock = Lock()
+    _metrics = {'hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+    
+    @staticmethod
+    def enabled():
+        return REPORT_CACHE_MAX_BYTES > 0
+    
+    @staticmethod
+    def key(report_type, params, data_version):
+        """Cache key, also used as the report's ETag"""
+        payload = json.dumps([report_type, params, data_version, date.today().isoformat()],
+                             sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    @staticmethod
+    def path(key):
+        return os.path.join(REPORT_CACHE_DIR, f"{key}.pdf")
+    
+    @classmethod
+    def _count(cls, metric, n=1):
+        with cls._lock:
+            cls._metrics[metric] += n
+    
+    @classmethod
+    def get(cls, key):
+        """Path of the cached report, marked as just used, or None"""
+        path = cls.path(key)
+        try:
+            # The modification time orders eviction
+            os.utime(path)
+        except FileNotFoundError:
+            cls._count('misses')
+            return None
+        cls._count('hits')
+        return path
+    
+    @classmethod
+    def put(cls, key, source):
+        """Copy a finished report into the cache, then evict down to the size bound"""
+        if not cls.enabled():
+            return
+        os.makedirs(REPORT_CACHE_DIR, exist_ok=True)
+        staging = os.path.join(REPORT_CACHE_DIR, f".{key}.{os.getpid()}.tmp")
+        try:
+            shutil.copyfile(source, staging)
+            os.replace(staging, cls.path(key))
+        except OSError as e:
+            log.warning("Report not cached: %s", e)
+            if os.path.exists(staging):
+                os.remove(staging)
+            return
+        cls._count('stores')
+        cls.evict()
+    
+    @classmethod
+    def evict(cls, max_bytes=None):
+        """Delete the least recently used reports until the cache fits in max_bytes"""
+        max_bytes = REPORT_CACHE_MAX_BYTES if max_bytes is None else max_bytes
+        entries = []
+        with os.scandir(REPORT_CACHE_DIR) as scan:
+            for entry in scan:
+                if entry.name.endswith('.pdf'):
+                    try:
+                        info = entry.stat()
+                    except FileNotFoundError:
+                        continue
+                    entries.append((info.st_mtime, info.st_size, entry.path))
+        
+        total = sum(size for _, size, _ in entries)
+        removed = 0
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            try:
+                os.remove(path)
+                removed += 1
+            except FileNotFoundError:
+                pass
+            total -= size
+        if removed:
+            cls._count('evictions', removed)
+        return removed
+    
+    @classmethod
+    def stats(cls):
+        with cls._lock:
+            metrics = dict(cls._metrics)
+        lookups = metrics['hits'] + metrics['misses']
+        metrics['hit_ratio'] = round(metrics['hits'] / lookups, 3) if lookups else 0.0
+        metrics['max_bytes'] = REPORT_CACHE_MAX_BYTES
+        return metrics
@@ -0,0 +1,221 @@
+# [file name]: request_metrics.py
+import bisect
+import os
+import threading
+from contextlib import contextmanager
+from time import perf_counter
+import pymysql
+from pymysql.cursors import SSCursor
+import query_log
+
+# Set to 0 to turn off the per-request accounting and /metrics
+METRICS_ENABLED = os.getenv('METRICS_ENABLED', '1') != '0'
+
+# When set, /metrics requires "Authorization: Bearer <token>"; otherwise a signed-in admin
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+METRIC_PREFIX = 'vit_lms_'
+
+SECONDS_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+QUERY_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100, 250, 1000)
+ROW_BUCKETS = (0, 1, 10, 100, 1000, 10000, 100000)
+
+# Histograms observed once per request: name -> (help, buckets)
+HISTOGRAMS = {
+    'request_seconds': ('Wall time per request', SECONDS_BUCKETS),
+    'db_seconds': ('Time spent running MySQL queries and reading their rows, per request', SECONDS_BUCKETS),
+    'db_queries': ('MySQL queries per request', QUERY_BUCKETS),
+    'db_rows': ('Rows read from MySQL per request', ROW_BUCKETS),
+    'db_connect_seconds': ('Time spent acquiring database connections, per request', SECONDS_BUCKETS),
+    'bcrypt_seconds': ('Time spent hashing and checking passwords, per request', SECONDS_BUCKETS),
+    'render_seconds': ('Time spent rendering templates, per request', SECONDS_BUCKETS)
+}
+
+# Accumulated while a request runs; request_seconds is measured around it
+REQUEST_COUNTERS = tuple(name for name in HISTOGRAMS if name != 'request_seconds')
+
+_local = threading.local()
+
+def _current():
+    return getattr(_local, 'counters', None)
+
+@contextmanager
+def timed(metric):
+    """Add the time spent in the block to `metric` of the current request, if any"""
+    counters = _current()
+    if counters is None:
+        yield
+        return
+    started = perf_counter()
+    try:
+        yield
+    finally:
+        counters[metric] += perf_counter() - started
+
+class _TimedCursor:
+    def execute(self, query, args=None):
+        # executemany() runs through here too, once per statement sent
+        started = perf_counter()
+        failed = True
+        try:
+            result = super().execute(query, args)
+            failed = False
+            return result
+        finally:
+            elapsed = perf_counter() - started
+            rows = len(self._rows) if self._rows is not None and not failed else 0
+            counters = _current()
+            route = None
+            if counters is not None:
+                counters['db_seconds'] += elapsed
+                counters['db_queries'] += 1
+                counters['db_rows'] += rows
+                route = _local.route
+            query_log.observe(self, query, elapsed, rows, failed, route)
+
+class _TimedUnbufferedCursor(_TimedCursor):
+    def read_next(self):
+        # Unbuffered rows come off the socket as they are fetched
+        counters = _current()
+        if counters is None:
+            return super().read_next()
+        started = perf_counter()
+        row = super().read_next()
+        counters['db_seconds'] += perf_counter() - started
+        if row is not None:
+            counters['db_rows'] += 1
+        return row
+
+_cursor_classes = {}
+
+def _timed_cursor_class(cursor_class):
+    if cursor_class not in _cursor_classes:
+        mixin = _TimedUnbufferedCursor if issubclass(cursor_class, SSCursor) else _TimedCursor
+        _cursor_classes[cursor_class] = type(f"Timed{cursor_class.__name__}", (mixin, cursor_class), {})
+    return _cursor_classes[cursor_class]
+
+class InstrumentedConnection(pymysql.connections.Connection):
+    """PyMySQL connection whose cursors, of any class, report to the current request and the query log"""
+    
+    def cursor(self, cursor=None):
+        return super().cursor(_timed_cursor_class(cursor or self.cursorclass))
+
+class _Histogram:
+    __slots__ = ('buckets', 'counts', 'sum', 'count')
+    
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+    
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class Registry:
+    """Per-process histograms keyed by metric, route and method"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}   # (metric, route, method) -> _Histogram
+        self._requests = {}     # (route, method, status) -> count
+    
+    def observe_request(self, route, method, status, values):
+        with self._lock:
+            key = (route, method, status)
+            self._requests[key] = self._requests.get(key, 0) + 1
+            for metric, value in values.items():
+                histogram = self._histograms.get((metric, route, method))
+                if histogram is None:
+                    histogram = self._histograms[(metric, route, method)] = _Histogram(HISTOGRAMS[metric][1])
+                histogram.observe(value)
+    
+    def exposition(self):
+        """All metrics in the Prometheus text format"""
+        with self._lock:
+            requests = sorted(self._requests.items())
+            histograms = sorted((key, list(h.counts), h.sum, h.count) for key, h in self._histograms.items())
+        
+        lines = [
+            f"# HELP {METRIC_PREFIX}requests_total Requests handled, by route, method and status",
+            f"# TYPE {METRIC_PREFIX}requests_total counter"
+        ]
+        for (route, method, status), count in requests:
+            lines.append(f'{METRIC_PREFIX}requests_total{{{_labels(route, method)},status="{status}"}} {count}')
+        
+        for metric, (help_text, buckets) in HISTOGRAMS.items():
+            name = METRIC_PREFIX + metric
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} histogram")
+            for (key_metric, route, method), counts, total, count in histograms:
+                if key_metric != metric:
+                    continue
+                labels = _labels(route, method)
+                cumulative = 0
+                for bound, bucket_count in zip(buckets, counts):
+                    cumulative += bucket_count
+                    lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+                lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {count}')
+                lines.append(f'{name}_sum{{{labels}}} {total:.6f}')
+                lines.append(f'{name}_count{{{labels}}} {count}')
+        return '\n'.join(lines) + '\n'
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(route, method):
+    return f'route="{_escape(route)}",method="{method}"'
+
+registry = Registry()
+
+def init_app(app):
+    """Record every request of `app` and serve the histograms at /metrics"""
+    if not METRICS_ENABLED:
+        return
+    from flask import Response, abort, before_render_template, request, session, template_rendered
+    
+    @app.before_request
+    def start_request_metrics():
+        _local.counters = dict.fromkeys(REQUEST_COUNTERS, 0)
+        _local.route = request.url_rule.rule if request.url_rule else 'unmatched'
+        _local.started = perf_counter()
+        _local.status = 500
+    
+    @app.after_request
+    def note_request_status(response):
+        _local.status = response.status_code
+        return response
+    
+    @app.teardown_request
+    def finish_request_metrics(error=None):
+        counters = _current()
+        if counters is None:
+            return
+        _local.counters = None
+        values = dict(counters, request_seconds=perf_counter() - _local.started)
+        # Unmatched URLs share one label so 404 scans cannot grow the registry
+        registry.observe_request(_local.route, request.method, _local.status, values)
+    
+    def render_started(sender, template, context, **extra):
+        _local.render_started = perf_counter()
+    
+    def render_finished(sender, template, context, **extra):
+        counters = _current()
+        started = getattr(_local, 'render_started', None)
+        if counters is not None and started is not None:
+            counters['render_seconds'] += perf_counter() - started
+            _local.render_started = None
+    
+    before_render_template.connect(render_started, app, weak=False)
+    template_rendered.connect(render_finished, app, weak=False)
+    
+    @app.route('/metrics')
+    def metrics():
+        if METRICS_TOKEN:
+            if request.headers.get('Authorization') != f"Bearer {METRICS_TOKEN}":
+                abort(401)
+        elif 'admin_id' not in session:
+            abort(401)
+        return Response(registry.exposition(), mimetype='text/plain; version=0.0.4')
@@ -0,0 +1,449 @@
+# [file name]: seed_data.py
+"""Seeded synthetic data at production scale, for reproducing performance locally
+
+    python seed_data.py [leaves] [--reset]
+
+Volumes, the random seed and the loader are read from the SEED_* variables.
+"""
+import os
+import random
+import string
+import sys
+import tempfile
+from datetime import date, datetime, time, timedelta
+from itertools import accumulate
+from time import perf_counter
+import pymysql
+sys.path.append('.')
+from database import Database
+from request_metrics import InstrumentedConnection
+from stats_counters import StatCounters
+from leave_rollups import LeaveRollups
+
+# The same seed and end date always produce the same rows
+SEED_RANDOM = int(os.getenv('SEED_RANDOM', 42))
+SEED_END_DATE = os.getenv('SEED_END_DATE')   # YYYY-MM-DD, default today
+
+SEED_STUDENTS = int(os.getenv('SEED_STUDENTS', 20000))
+SEED_PROCTORS = int(os.getenv('SEED_PROCTORS', 300))
+SEED_ADMINS = int(os.getenv('SEED_ADMINS', 5))
+SEED_LEAVES = int(os.getenv('SEED_LEAVES', 1000000))
+
+# Leaves are spread over this many days before the end date
+SEED_DAYS = int(os.getenv('SEED_DAYS', 730))
+
+# Distinct passwords hashed for all generated accounts (bcrypt is the slow part)
+SEED_PASSWORD_POOL = int(os.getenv('SEED_PASSWORD_POOL', 8))
+
+# 'executemany' sends multi-row INSERTs; 'infile' streams TSV files through
+# LOAD DATA LOCAL INFILE, which needs local_infile enabled on the server
+SEED_LOAD = os.getenv('SEED_LOAD', 'executemany')
+
+# Rows per INSERT batch, and per file for the infile loader
+SEED_BATCH_ROWS = int(os.getenv('SEED_BATCH_ROWS', 5000))
+SEED_INFILE_ROWS = int(os.getenv('SEED_INFILE_ROWS', 200000))
+
+# Progress is printed every this many leaves
+PROGRESS_LEAVES = 100000
+
+# Generated ids carry these prefixes, so a seeded database is easy to recognise
+PROCTOR_PREFIX = 'SP'
+SUPERVISOR_PREFIX = 'SS'
+ADMIN_PREFIX = 'SADMIN'
+
+TABLE_COLUMNS = {
+    'proctors': ('employee_id', 'name', 'password_hash', 'email', 'department'),
+    'students': ('reg_number', 'name', 'password_hash', 'proctor_id', 'hostel_block',
+                 'room_number', 'phone', 'parent_phone'),
+    'hostel_supervisors': ('supervisor_id', 'name', 'password_hash', 'hostel_block', 'email'),
+    'admins': ('admin_id', 'name', 'password_hash', 'email', 'role'),
+    'leaves': ('leave_id', 'student_reg', 'proctor_id', 'leave_type', 'from_date', 'to_date',
+               'from_time', 'to_time', 'reason', 'destination', 'parent_contacted', 'status',
+               'applied_at', 'approved_at', 'qr_token', 'qr_expiry', 'verification_count',
+               'suspicious_flag', 'flagged_by', 'flag_reason', 'flagged_at', 'verified_at'),
+    'verification_logs': ('log_id', 'leave_id', 'supervisor_id', 'verified_at', 'action', 'notes'),
+    'admin_logs': ('log_id', 'admin_id', 'action_type', 'target_type', 'target_id', 'details',
+                   'ip_address', 'user_agent', 'created_at'),
+    'admin_leave_flags': ('leave_id', 'flagged_by', 'reason', 'created_at'),
+    # Same shape as ActivityLog.backfill(), so that backfill sees the history as copied
+    'activity_events': ('log_type', 'user_id', 'action', 'details', 'ip_address', 'leave_id',
+                        'created_at', 'source_table', 'source_id')
+}
+
+# Emptied by --reset; admins keep their real accounts and only lose the seeded ones
+RESET_TABLES = ('leaves', 'students', 'proctors', 'hostel_supervisors', 'verification_logs',
+                'admin_logs', 'admin_leave_flags', 'parent_contacts', 'leave_audit_log',
+                'activity_events', 'stat_counters', 'leave_rollup_daily', 'leave_rollup_monthly')
+
+# Block -> share of the students living there
+HOSTEL_BLOCKS = {'A Block': 18, 'B Block': 16, 'C Block': 14, 'D Block': 14,
+                 'E Block': 12, 'F Block': 10, 'G Block': 8, 'H Block': 8}
+SUPERVISORS_PER_BLOCK = 2
+
+BRANCHES = ('BCE', 'BAI', 'BEC', 'BME', 'BCY', 'BDS', 'BEE', 'BIT')
+DEPARTMENTS = ('CSE', 'ECE', 'EEE', 'Mechanical', 'Civil', 'Biotechnology', 'Mathematics', 'Physics')
+FIRST_NAMES = ('Aarav', 'Vivaan', 'Aditya', 'Vihaan', 'Arjun', 'Sai', 'Reyansh', 'Krishna', 'Ishaan',
+               'Rohan', 'Kabir', 'Rahul', 'Ananya', 'Diya', 'Saanvi', 'Aadhya', 'Kavya', 'Priya',
+               'Meera', 'Isha', 'Nisha', 'Pooja', 'Sneha', 'Riya', 'Tanvi', 'Neha', 'Karthik',
+               'Siddharth', 'Varun', 'Nikhil', 'Aisha', 'Fatima', 'Zoya', 'Harpreet', 'Gurleen',
+               'Lakshmi', 'Divya', 'Shreya', 'Manav', 'Yash')
+LAST_NAMES = ('Sharma', 'Verma', 'Iyer', 'Nair', 'Reddy', 'Rao', 'Kapoor', 'Gupta', 'Singh', 'Kumar',
+              'Patel', 'Shah', 'Mehta', 'Joshi', 'Menon', 'Pillai', 'Das', 'Bose', 'Chatterjee',
+              'Mukherjee', 'Khan', 'Ahmed', 'Fernandes', 'DSouza', 'Agarwal', 'Bansal', 'Malhotra',
+              'Chopra', 'Saxena', 'Mishra')
+CITIES = ('Chennai', 'Bengaluru', 'Hyderabad', 'Mumbai', 'Delhi', 'Pune', 'Kolkata', 'Bhopal',
+          'Indore', 'Jaipur', 'Lucknow', 'Kochi', 'Coimbatore', 'Vellore', 'Nagpur', 'Patna',
+          'Ahmedabad', 'Chandigarh')
+
+# Leave type -> (share, reason templates)
+LEAVE_TYPES = {
+    'regular': (70, ("Going home for the weekend", "Family function at home",
+                     "Attending cousin's wedding in {city}", "Festival celebration with family",
+                     "Visiting parents in {city}", "Personal work at home")),
+    'medical': (15, ("Doctor appointment in {city}", "Fever and cold, going home to recover",
+                     "Dental treatment", "Follow-up check-up at hospital", "Eye check-up in {city}")),
+    'emergency': (15, ("Family emergency at home", "Grandparent hospitalised in {city}",
+                       "Urgent family matter", "Accident in the family"))
+}
+
+# Share of leaves applied in each hour of the day
+HOUR_WEIGHTS = (1, 1, 1, 1, 1, 2, 4, 6, 9, 12, 12, 10, 8, 8, 9, 10, 10, 11, 12, 13, 12, 9, 5, 2)
+
+DEPARTURE_TIMES = ('06:00:00', '08:00:00', '09:00:00', '10:00:00', '14:00:00', '17:00:00', '18:00:00')
+RETURN_TIMES = ('12:00:00', '17:00:00', '18:00:00', '19:00:00', '20:00:00', '21:00:00')
+
+# Status shares for leaves that are over, upcoming, and applied in the last two days
+STATUS_PAST = {'completed': 62, 'approved': 13, 'rejected': 18, 'pending': 7}
+STATUS_UPCOMING = {'approved': 65, 'pending': 25, 'rejected': 10}
+STATUS_RECENT = {'pending': 60, 'approved': 30, 'rejected': 10}
+
+SUSPICIOUS_RATE = 0.004
+FLAG_REASONS = ('Destination does not match parent confirmation', 'Repeated late returns',
+                'QR code shown by another student', 'Left before the approved time')
+
+# Roughly one admin action per this many leaves, with its share of action types
+LEAVES_PER_ADMIN_ACTION = 40
+ADMIN_ACTIONS = {'LOGIN': 50, 'EXPORT_LEAVES': 8, 'GENERATE_REPORT': 12, 'EDIT_USER': 15,
+                 'RESET_PASSWORD': 10, 'SNAPSHOT': 5}
+
+QR_ALPHABET = string.ascii_letters + string.digits
+
+def password_pool(size=SEED_PASSWORD_POOL):
+    """(password, bcrypt hash) pairs; generated account n uses entry n % size"""
+    return [(f"Seed@{i}", Database.hash_password(f"Seed@{i}")) for i in range(max(1, size))]
+
+def _phone(rng):
+    return str(rng.randint(6000000000, 9999999999))
+
+def _name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+def people(rng, hashes, students=SEED_STUDENTS, proctors=SEED_PROCTORS, admins=SEED_ADMINS):
+    """Rows for every account table, plus each student's home city for destinations"""
+    rows = {table: [] for table in ('proctors', 'students', 'hostel_supervisors', 'admins')}
+    for n in range(1, proctors + 1):
+        rows['proctors'].append((f"{PROCTOR_PREFIX}{n:04d}", f"Dr. {_name(rng)}", hashes[n % len(hashes)],
+                                 f"proctor{n}@vit.ac.in", rng.choice(DEPARTMENTS)))
+    
+    blocks = list(HOSTEL_BLOCKS)
+    cum_blocks = list(accumulate(HOSTEL_BLOCKS.values()))
+    homes = {}
+    for n in range(1, students + 1):
+        reg_number = f"{rng.randint(21, 24)}{rng.choice(BRANCHES)}{10000 + n:05d}"
+        block = rng.choices(blocks, cum_weights=cum_blocks)[0]
+        room = f"{rng.randint(1, 10)}{rng.randint(1, 40):02d}"
+        proctor = rows['proctors'][rng.randrange(proctors)][0]
+        rows['students'].append((reg_number, _name(rng), hashes[n % len(hashes)], proctor, block, room,
+                                 _phone(rng), _phone(rng)))
+        homes[reg_number] = rng.choice(CITIES)
+    
+    n = 0
+    for block in blocks:
+        for _ in range(SUPERVISORS_PER_BLOCK):
+            n += 1
+            rows['hostel_supervisors'].append((f"{SUPERVISOR_PREFIX}{n:03d}", f"Mr. {_name(rng)}",
+                                               hashes[n % len(hashes)], block, f"warden{n}@vit.ac.in"))
+    for n in range(1, admins + 1):
+        rows['admins'].append((f"{ADMIN_PREFIX}{n:02d}", _name(rng), hashes[n % len(hashes)],
+                               f"admin{n}@vit.ac.in", 'moderator' if n > 2 else 'admin'))
+    return rows, homes
+
+def day_weights(end, days=SEED_DAYS):
+    """(day, weight) for each day up to `end`: weekends, the festival season and growth weigh more"""
+    weights = []
+    for offset in range(days):
+        day = end - timedelta(days=days - 1 - offset)
+        weight = (1.6, 1.0, 1.0, 1.0, 1.8, 1.4, 0.7)[day.weekday()]
+        if day.month in (10, 11, 12):
+            weight *= 1.5
+        elif day.month in (5, 6):
+            weight *= 0.4   # summer break: most students are already home
+        weight *= 0.7 + 0.6 * offset / max(days - 1, 1)
+        weights.append((day, weight))
+    return weights
+
+def daily_counts(rng, weights, total):
+    """Split `total` leaves over the days in proportion to their weights, with some noise"""
+    noisy = [weight * rng.uniform(0.85, 1.15) for _, weight in weights]
+    scale = total / sum(noisy)
+    counts, carry = [], 0.0
+    for weight in noisy:
+        carry += weight * scale
+        counts.append(int(carry))
+        carry -= int(carry)
+    counts[-1] += total - sum(counts)
+    return counts
+
+def _pick(rng, shares):
+    return rng.choices(list(shares), weights=list(shares.values()))[0]
+
+def activity(rng, accounts, homes, end, total=SEED_LEAVES, days=SEED_DAYS, first_ids=None):
+    """Yield (table, row) for leaves and their logs, day by day in time order"""
+    first_ids = first_ids or {}
+    leave_id = first_ids.get('leaves', 1)
+    verification_id = first_ids.get('verification_logs', 1)
+    admin_log_id = first_ids.get('admin_logs', 1)
+    now = datetime.combine(end, time(23, 59, 59))
+    
+    students = accounts['students']
+    # Some students go home far more often than others
+    cum_students = list(accumulate(rng.lognormvariate(0, 0.6) for _ in students))
+    supervisors = {}
+    for supervisor in accounts['hostel_supervisors']:
+        supervisors.setdefault(supervisor[3], []).append(supervisor[0])
+    admin_ids = [admin[0] for admin in accounts['admins']]
+    types = list(LEAVE_TYPES)
+    cum_types = list(accumulate(share for share, _ in LEAVE_TYPES.values()))
+    cum_hours = list(accumulate(HOUR_WEIGHTS))
+    
+    weights = day_weights(end, days)
+    for (day, _), count in zip(weights, daily_counts(rng, weights, total)):
+        hours = rng.choices(range(24), cum_weights=cum_hours, k=count)
+        seconds = sorted(hour * 3600 + rng.randrange(3600) for hour in hours)
+        picked = rng.choices(students, cum_weights=cum_students, k=count)
+        
+        for offset, student in zip(seconds, picked):
+            reg_number, proctor_id, block = student[0], student[3], student[4]
+            applied_at = datetime.combine(day, time()) + timedelta(seconds=offset)
+            leave_type = rng.choices(types, cum_weights=cum_types)[0]
+            if leave_type == 'emergency':
+                lead, length = 0, min(int(rng.expovariate(1 / 1.5)), 5)
+            elif leave_type == 'medical':
+                lead, length = rng.randint(0, 3), 1 + min(int(rng.expovariate(1 / 3)), 19)
+            else:
+                lead, length = min(int(rng.expovariate(1 / 4)), 14), 1 + min(int(rng.expovariate(1 / 2.5)), 14)
+            from_date = day + timedelta(days=lead)
+            to_date = from_date + timedelta(days=length)
+            from_time = '08:00:00' if leave_type == 'emergency' and rng.random() < 0.3 else rng.choice(DEPARTURE_TIMES)
+            city = homes[reg_number] if rng.random() < 0.8 else rng.choice(CITIES)
+            reason = rng.choice(LEAVE_TYPES[leave_type][1]).format(city=city)
+            
+            if to_date < end:
+                status = _pick(rng, STATUS_PAST)
+            elif applied_at > now - timedelta(days=2):
+                status = _pick(rng, STATUS_RECENT)
+            else:
+                status = _pick(rng, STATUS_UPCOMING)
+            
+            approved_at = qr_token = qr_expiry = verified_at = None
+            flagged_by = flag_reason = flagged_at = None
+            verification_count, suspicious = 0, False
+            if status in ('approved', 'completed'):
+                approved_at = min(applied_at + timedelta(minutes=int(rng.expovariate(1 / 300))), now)
+                qr_token = ''.join(rng.choices(QR_ALPHABET, k=32))
+                departure = datetime.combine(from_date, time.fromisoformat(from_time))
+                qr_expiry = departure + timedelta(days=1)
+                leaves_at = departure + timedelta(minutes=rng.randint(0, 90))
+                if leaves_at < now and (status == 'completed' or rng.random() < 0.5):
+                    verification_count = 1 if rng.random() < 0.85 else 2
+                    verified_at = leaves_at
+                if rng.random() < SUSPICIOUS_RATE:
+                    suspicious = True
+                    flagged_by = rng.choice(admin_ids) if admin_ids else 'ADMIN001'
+                    flag_reason = rng.choice(FLAG_REASONS)
+                    flagged_at = min((verified_at or approved_at) + timedelta(hours=rng.randint(1, 48)), now)
+            
+            yield 'leaves', (leave_id, reg_number, proctor_id, leave_type, from_date, to_date, from_time,
+                             rng.choice(RETURN_TIMES), reason, city,
+                             leave_type == 'emergency' or rng.random() < 0.4, status, applied_at,
+                             approved_at, qr_token, qr_expiry, verification_count, suspicious,
+                             flagged_by, flag_reason, flagged_at, verified_at)
+            yield 'activity_events', ('leave', reg_number, f"Leave {status}", reason, None, leave_id,
+                                      applied_at, 'leaves', leave_id)
+            
+            block_supervisors = supervisors.get(block) or ['S001']
+            for n in range(verification_count):
+                logged_at = verified_at + timedelta(minutes=n * rng.randint(5, 120))
+                supervisor_id = rng.choice(block_supervisors)
+                notes = 'QR code verified successfully'
+                yield 'verification_logs', (verification_id, leave_id, supervisor_id, logged_at, 'granted', notes)
+                yield 'activity_events', ('verification', supervisor_id, 'granted', notes, None, leave_id,
+                                          logged_at, 'verification_logs', verification_id)
+                verification_id += 1
+            if suspicious:
+                yield 'admin_leave_flags', (leave_id, flagged_by, flag_reason, flagged_at)
+            leave_id += 1
+        
+        # Admin actions through the working day
+        actions = count // LEAVES_PER_ADMIN_ACTION + (rng.random() < count % LEAVES_PER_ADMIN_ACTION / LEAVES_PER_ADMIN_ACTION)
+        for offset in sorted(rng.randrange(8 * 3600, 20 * 3600) for _ in range(actions if admin_ids else 0)):
+            created_at = datetime.combine(day, time()) + timedelta(seconds=offset)
+            admin_id = rng.choice(admin_ids)
+            action_type = _pick(rng, ADMIN_ACTIONS)
+            target_type, target_id, details = 'SYSTEM', None, None
+            if action_type in ('EDIT_USER', 'RESET_PASSWORD'):
+                target = rng.choice(students)
+                target_type, target_id = 'STUDENT', target[0]
+                details = f"Updated student {target[0]}" if action_type == 'EDIT_USER' else f"Password reset for {target[0]}"
+            elif action_type == 'EXPORT_LEAVES':
+                details = f"Exported leaves as {rng.choice(('csv', 'xlsx', 'jsonl'))}"
+            elif action_type == 'GENERATE_REPORT':
+                details = f"Queued {rng.choice(('monthly_summary', 'suspicious', 'user_activity'))} PDF report"
+            ip_address = f"10.{rng.randint(0, 255)}.{rng.randint(0, 255)}.{rng.randint(1, 254)}"
+            yield 'admin_logs', (admin_log_id, admin_id, action_type, target_type, target_id, details,
+                                 ip_address, 'Mozilla/5.0 (seed)', created_at)
+            yield 'activity_events', ('admin', admin_id, action_type, details, ip_address, None,
+                                      created_at, 'admin_logs', admin_log_id)
+            admin_log_id += 1
+
+def tsv_value(value):
+    """One field in MySQL's default LOAD DATA format"""
+    if value is None:
+        return '\\N'
+    if isinstance(value, bool):
+        return '1' if value else '0'
+    if isinstance(value, datetime):
+        return value.strftime('%Y-%m-%d %H:%M:%S')
+    if isinstance(value, date):
+        return value.isoformat()
+    return str(value).replace('\\', '\\\\').replace('\t', '\\t').replace('\n', '\\n')
+
+class _Loader:
+    """Buffers rows per table and writes them in batches with the chosen method"""
+    
+    def __init__(self, connection, method=SEED_LOAD):
+        self.connection = connection
+        self.method = method
+        self.buffers = {table: [] for table in TABLE_COLUMNS}
+        self.loaded = dict.fromkeys(TABLE_COLUMNS, 0)
+    
+    def add(self, table, row):
+        buffer = self.buffers[table]
+        buffer.append(row)
+        if len(buffer) >= (SEED_INFILE_ROWS if self.method == 'infile' else SEED_BATCH_ROWS):
+            self.flush(table)
+    
+    def flush(self, table=None):
+        for name in ([table] if table else list(self.buffers)):
+            rows = self.buffers[name]
+            if not rows:
+                continue
+            if self.method == 'infile':
+                self._load_infile(name, rows)
+            else:
+                self._insert(name, rows)
+            self.loaded[name] += len(rows)
+            self.buffers[name] = []
+    
+    def _insert(self, table, rows):
+        columns = TABLE_COLUMNS[table]
+        with self.connection.cursor() as cursor:
+            # PyMySQL folds these into multi-row INSERTs of up to 1 MB each
+            cursor.executemany(f"""
+                INSERT INTO {table} ({', '.join(columns)})
+                VALUES ({', '.join(['%s'] * len(columns))})
+            """, rows)
+        self.connection.commit()
+    
+    def _load_infile(self, table, rows):
+        with tempfile.NamedTemporaryFile('w', suffix='.tsv', encoding='utf-8', delete=False) as data:
+            for row in rows:
+                data.write('\t'.join(tsv_value(value) for value in row) + '\n')
+        try:
+            with self.connection.cursor() as cursor:
+                cursor.execute(f"""
+                    LOAD DATA LOCAL INFILE %s INTO TABLE {table}
+                    CHARACTER SET utf8mb4 ({', '.join(TABLE_COLUMNS[table])})
+                """, (data.name,))
+            self.connection.commit()
+        finally:
+            os.remove(data.name)
+
+def _connect(db, method):
+    if method != 'infile':
+        return db.get_connection()
+    # Database.get_connection() leaves LOCAL INFILE off, as the app never needs it
+    return InstrumentedConnection(host=db.host, user=db.user, password=db.password, database=db.database,
+                                  port=db.port, cursorclass=pymysql.cursors.DictCursor, charset='utf8mb4',
+                                  local_infile=True, autocommit=True)
+
+def seed(leaves=SEED_LEAVES, reset=False, method=SEED_LOAD):
+    """Generate and load the whole dataset, then rebuild the derived tables"""
+    end = date.fromisoformat(SEED_END_DATE) if SEED_END_DATE else date.today()
+    rng = random.Random(SEED_RANDOM)
+    db = Database()
+    connection = _connect(db, method)
+    started = perf_counter()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM proctors WHERE employee_id = %s", (f"{PROCTOR_PREFIX}0001",))
+            if cursor.fetchone() and not reset:
+                print("✗ Seeded data already present; run with --reset to replace it")
+                return None
+            # Bulk load: the generator guarantees uniqueness and that students and leaves
+            # point at rows it wrote. Checks are off before the TRUNCATEs too, since MySQL
+            # refuses to truncate students, proctors or leaves while other tables reference
+            # them (admin_leave_flags, parent_contacts and leave_audit_log reference leaves)
+            cursor.execute("SET SESSION unique_checks = 0, foreign_key_checks = 0")
+            if reset:
+                for table in RESET_TABLES:
+                    cursor.execute(f"TRUNCATE TABLE {table}")
+                cursor.execute("DELETE FROM admins WHERE admin_id LIKE %s", (f"{ADMIN_PREFIX}%",))
+                print(f"✓ Emptied {len(RESET_TABLES)} tables")
+            first_ids = {}
+            for table in ('leaves', 'verification_logs', 'admin_logs'):
+                cursor.execute(f"SELECT COALESCE(MAX({'leave_id' if table == 'leaves' else 'log_id'}), 0) + 1 as next_id FROM {table}")
+                first_ids[table] = cursor.fetchone()['next_id']
+        
+        pool = password_pool()
+        print(f"✓ Hashed {len(pool)} passwords: {', '.join(password for password, _ in pool)}")
+        accounts, homes = people(rng, [hashed for _, hashed in pool])
+        
+        loader = _Loader(connection, method)
+        for table, rows in accounts.items():
+            for row in rows:
+                loader.add(table, row)
+        loader.flush()
+        generated = 0
+        for table, row in activity(rng, accounts, homes, end, leaves, first_ids=first_ids):
+            loader.add(table, row)
+            if table == 'leaves':
+                generated += 1
+                if generated % PROGRESS_LEAVES == 0:
+                    print(f"  {generated:,} leaves ({perf_counter() - started:.0f}s)")
+        loader.flush()
+        
+        with connection.cursor() as cursor:
+            for table in TABLE_COLUMNS:
+                cursor.execute(f"ANALYZE TABLE {table}")
+                cursor.fetchall()
+            StatCounters.touch(cursor)
+            connection.commit()
+    finally:
+        connection.close()
+    
+    StatCounters.reconcile()
+    LeaveRollups.rebuild()
+    elapsed = perf_counter() - started
+    total = sum(loader.loaded.values())
+    print(f"✓ {total:,} rows in {elapsed:.0f}s ({total / max(elapsed, 0.001):,.0f} rows/s, {method})")
+    return loader.loaded
+
+if __name__ == "__main__":
+    from dotenv import load_dotenv
+    load_dotenv()
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('--')]
+    print("Generating synthetic data...")
+    loaded = seed(int(args[0]) if args else SEED_LEAVES, reset='--reset' in sys.argv)
+    for table, count in (loaded or {}).items():
+        print(f"  {table}: {count:,}")
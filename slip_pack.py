@@ -0,0 +1,134 @@
+# [file name]: slip_pack.py
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from concurrent.futures.process import BrokenProcessPool
+from datetime import date, timedelta
+from io import BytesIO
+from threading import Lock
+from pypdf import PdfWriter
+from database import Database
+from pdf_generator import render_slips
+
+# Worker processes rendering slips (default: one per CPU)
+SLIP_PACK_PROCESSES = int(os.getenv('SLIP_PACK_PROCESSES', 0)) or os.cpu_count() or 1
+
+# Slips per task sent to a worker process
+SLIP_PACK_CHUNK = int(os.getenv('SLIP_PACK_CHUNK', 50))
+
+# Longest date range one pack may cover
+SLIP_PACK_MAX_DAYS = int(os.getenv('SLIP_PACK_MAX_DAYS', 31))
+
+# Approved leaves of a block starting in a date range, in the order they leave
+SLIPS_SQL = """
+    SELECT l.leave_id, l.from_date, l.to_date, l.from_time, l.to_time, l.destination, l.verified_at,
+           s.name as student_name, s.reg_number, s.hostel_block, s.room_number,
+           p.name as proctor_name,
+           (SELECT h.name FROM verification_logs v
+            JOIN hostel_supervisors h ON h.supervisor_id = v.supervisor_id
+            WHERE v.leave_id = l.leave_id AND v.action = 'granted'
+            ORDER BY v.verified_at DESC LIMIT 1) as supervisor_name
+    FROM leaves l
+    JOIN students s ON l.student_reg = s.reg_number
+    LEFT JOIN proctors p ON l.proctor_id = p.employee_id
+    WHERE l.status IN ('approved', 'completed')
+      AND l.from_date BETWEEN %s AND %s
+      AND s.hostel_block = %s
+    ORDER BY l.from_date, l.from_time, s.room_number, s.reg_number
+"""
+
+def _clock(value):
+    """HH:MM for a TIME column, which PyMySQL returns as a timedelta"""
+    if isinstance(value, timedelta):
+        total_seconds = int(value.total_seconds())
+        return f"{total_seconds // 3600:02d}:{(total_seconds % 3600) // 60:02d}"
+    if hasattr(value, 'strftime'):
+        return value.strftime('%H:%M')
+    return str(value) if value else None
+
+def slip_fields(row):
+    """Slip data in the shape generate_slip_pdf and the gate page use"""
+    return {
+        'student_name': row['student_name'],
+        'reg_number': row['reg_number'],
+        'hostel_block': row['hostel_block'],
+        'room_number': row['room_number'],
+        'from_date': row['from_date'].isoformat() if row['from_date'] else None,
+        'to_date': row['to_date'].isoformat() if row['to_date'] else None,
+        'from_time': _clock(row['from_time']),
+        'to_time': _clock(row['to_time']),
+        'proctor_name': row['proctor_name'],
+        'verified_at': row['verified_at'].strftime('%Y-%m-%d %H:%M:%S') if row['verified_at'] else 'Not yet verified',
+        'supervisor_name': row['supervisor_name'] or 'Not yet verified',
+        'destination': row['destination']
+    }
+
+def parse_range(date_from, date_to):
+    """(from, to) dates for a pack request; raises ValueError for a bad or too long range"""
+    start = date.fromisoformat(date_from)
+    end = date.fromisoformat(date_to) if date_to else start
+    if end < start:
+        raise ValueError("The end date is before the start date")
+    if (end - start).days >= SLIP_PACK_MAX_DAYS:
+        raise ValueError(f"A slip pack covers at most {SLIP_PACK_MAX_DAYS} days")
+    return start, end
+
+def fetch_slips(hostel_block, date_from, date_to):
+    db = Database()
+    connection = db.get_connection()
+    try:
+        with connection.cursor() as cursor:
+            cursor.execute(SLIPS_SQL, (date_from, date_to, hostel_block))
+            return [slip_fields(row) for row in cursor.fetchall()]
+    finally:
+        connection.close()
+
+_pool = None
+_pool_lock = Lock()
+
+def _get_pool():
+    """Process pool shared by every pack in this process, started on first use
+    
+    Children come from a fork server rather than a fork of the web process, whose
+    request, job and logging threads may hold locks that a forked child would
+    inherit held. The server preloads pdf_generator, so each child starts with
+    the renderer imported; render_slips is pickled by reference to it.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            context = multiprocessing.get_context('forkserver')
+            context.set_forkserver_preload(['pdf_generator'])
+            _pool = ProcessPoolExecutor(max_workers=SLIP_PACK_PROCESSES, mp_context=context)
+        return _pool
+
+def build_pack(slips, output, progress=None):
+    """Render `slips` across the process pool and write them to `output` as one PDF"""
+    if not slips:
+        return 0
+    chunks = [slips[i:i + SLIP_PACK_CHUNK] for i in range(0, len(slips), SLIP_PACK_CHUNK)]
+    futures = {
+        _get_pool().submit(render_slips, chunk, i * SLIP_PACK_CHUNK + 1, len(slips)): i
+        for i, chunk in enumerate(chunks)
+    }
+    parts = [None] * len(chunks)
+    done = 0
+    try:
+        for future in as_completed(futures):
+            index = futures[future]
+            parts[index] = future.result()
+            done += len(chunks[index])
+            if progress:
+                progress(done, len(slips))
+    except BrokenProcessPool:
+        # A worker process died; start a fresh pool for the retry
+        global _pool
+        with _pool_lock:
+            _pool = None
+        raise
+    
+    writer = PdfWriter()
+    for part in parts:
+        writer.append(BytesIO(part))
+    writer.write(output)
+    return len(slips)
@@ -0,0 +1,340 @@
+# [file name]: snapshot.py
+import json
+import os
+import shutil
+import threading
+import time
+from datetime import datetime, timedelta
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+import pymysql
+from database import Database
+from app_logging import get_logger
+
+log = get_logger('snapshot')
+
+# Snapshots live in SNAPSHOT_DIR/<stamp>/; CURRENT names the newest complete one
+SNAPSHOT_DIR = os.getenv('SNAPSHOT_DIR', 'snapshots')
+
+# Complete snapshots kept on disk, the current one included
+SNAPSHOT_KEEP = int(os.getenv('SNAPSHOT_KEEP', 3))
+
+# Rows fetched from MySQL, and buffered per partition, before a write
+SNAPSHOT_BATCH = int(os.getenv('SNAPSHOT_BATCH_ROWS', 10000))
+
+COMPRESSION = os.getenv('SNAPSHOT_COMPRESSION', 'zstd')
+
+PARTITIONING = ds.partitioning(pa.schema([('month', pa.string())]), flavor='hive')
+
+# table -> (SELECT, arrow schema, column whose month partitions the table or None).
+# Password hashes are never selected.
+TABLES = {
+    'leaves': ("""
+        SELECT leave_id, student_reg, proctor_id, leave_type, from_date, to_date, from_time, to_time,
+               reason, destination, parent_contacted, status, applied_at, approved_at,
+               verification_count, suspicious_flag, flagged_by, flag_reason, flagged_at, verified_at
+        FROM leaves
+    """, pa.schema([
+        ('leave_id', pa.int64()),
+        ('student_reg', pa.string()),
+        ('proctor_id', pa.string()),
+        ('leave_type', pa.string()),
+        ('from_date', pa.date32()),
+        ('to_date', pa.date32()),
+        ('from_time', pa.time32('s')),
+        ('to_time', pa.time32('s')),
+        ('reason', pa.string()),
+        ('destination', pa.string()),
+        ('parent_contacted', pa.bool_()),
+        ('status', pa.string()),
+        ('applied_at', pa.timestamp('s')),
+        ('approved_at', pa.timestamp('s')),
+        ('verification_count', pa.int32()),
+        ('suspicious_flag', pa.bool_()),
+        ('flagged_by', pa.string()),
+        ('flag_reason', pa.string()),
+        ('flagged_at', pa.timestamp('s')),
+        ('verified_at', pa.timestamp('s'))
+    ]), 'applied_at'),
+    'verification_logs': ("""
+        SELECT log_id, leave_id, supervisor_id, verified_at, action, notes
+        FROM verification_logs
+    """, pa.schema([
+        ('log_id', pa.int64()),
+        ('leave_id', pa.int64()),
+        ('supervisor_id', pa.string()),
+        ('verified_at', pa.timestamp('s')),
+        ('action', pa.string()),
+        ('notes', pa.string())
+    ]), 'verified_at'),
+    'students': ("""
+        SELECT reg_number, name, proctor_id, hostel_block, room_number, created_at
+        FROM students
+    """, pa.schema([
+        ('reg_number', pa.string()),
+        ('name', pa.string()),
+        ('proctor_id', pa.string()),
+        ('hostel_block', pa.string()),
+        ('room_number', pa.string()),
+        ('created_at', pa.timestamp('s'))
+    ]), None),
+    'proctors': ("""
+        SELECT employee_id, name, department, created_at
+        FROM proctors
+    """, pa.schema([
+        ('employee_id', pa.string()),
+        ('name', pa.string()),
+        ('department', pa.string()),
+        ('created_at', pa.timestamp('s'))
+    ]), None),
+    'hostel_supervisors': ("""
+        SELECT supervisor_id, name, hostel_block, created_at
+        FROM hostel_supervisors
+    """, pa.schema([
+        ('supervisor_id', pa.string()),
+        ('name', pa.string()),
+        ('hostel_block', pa.string()),
+        ('created_at', pa.timestamp('s'))
+    ]), None)
+}
+
+def _arrow_value(value, field_type):
+    """MySQL driver value -> value pyarrow accepts for the field"""
+    if value is None:
+        return None
+    if pa.types.is_boolean(field_type):
+        return bool(value)
+    if pa.types.is_time(field_type) and isinstance(value, timedelta):
+        # TIME columns arrive as timedelta since midnight
+        return (datetime.min + value).time()
+    return value
+
+def _month(value):
+    return value.strftime('%Y-%m') if value else 'unknown'
+
+class _PartitionWriter:
+    """Buffers rows per partition and writes them as row groups of SNAPSHOT_BATCH rows"""
+    
+    def __init__(self, path, schema, partition_column):
+        self.path = path
+        self.schema = schema
+        self.partition_column = partition_column
+        self.buffers = {}
+        self.writers = {}
+        self.rows = 0
+    
+    def add(self, rows):
+        for row in rows:
+            key = _month(row[self.partition_column]) if self.partition_column else None
+            buffer = self.buffers.setdefault(key, [])
+            buffer.append({field.name: _arrow_value(row[field.name], field.type) for field in self.schema})
+            if len(buffer) >= SNAPSHOT_BATCH:
+                self._flush(key)
+    
+    def _flush(self, key):
+        rows = self.buffers.pop(key, None)
+        if not rows:
+            return
+        writer = self.writers.get(key)
+        if writer is None:
+            directory = os.path.join(self.path, f"month={key}") if key else self.path
+            os.makedirs(directory, exist_ok=True)
+            writer = pq.ParquetWriter(os.path.join(directory, 'part-0.parquet'), self.schema,
+                                      compression=COMPRESSION)
+            self.writers[key] = writer
+        writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=self.schema))
+        self.rows += len(rows)
+    
+    def close(self):
+        for key in list(self.buffers):
+            self._flush(key)
+        if not self.writers:
+            # Empty table: still write a file so the schema can be loaded
+            os.makedirs(self.path, exist_ok=True)
+            pq.write_table(self.schema.empty_table(), os.path.join(self.path, 'part-0.parquet'),
+                           compression=COMPRESSION)
+        for writer in self.writers.values():
+            writer.close()
+        return self.rows
+
+def current_path():
+    """Directory of the newest complete snapshot, or None"""
+    try:
+        with open(os.path.join(SNAPSHOT_DIR, 'CURRENT')) as f:
+            path = os.path.join(SNAPSHOT_DIR, f.read().strip())
+    except FileNotFoundError:
+        return None
+    return path if os.path.isdir(path) else None
+
+def manifest():
+    """Metadata of the current snapshot, or None"""
+    path = current_path()
+    if not path:
+        return None
+    with open(os.path.join(path, 'manifest.json')) as f:
+        return json.load(f)
+
+def take_snapshot():
+    """Write every table from one consistent read and make it the current snapshot"""
+    stamp = datetime.now().strftime('%Y%m%dT%H%M%S')
+    target = os.path.join(SNAPSHOT_DIR, stamp)
+    staging = os.path.join(SNAPSHOT_DIR, f".{stamp}.tmp")
+    os.makedirs(staging, exist_ok=True)
+    started = time.monotonic()
+    
+    db = Database()
+    connection = db.get_connection()
+    try:
+        with connection.cursor() as cursor:
+            # Only one worker or host snapshots at a time
+            cursor.execute("SELECT GET_LOCK('leave_snapshot', 0) as acquired")
+            if not cursor.fetchone()['acquired']:
+                log.warning("Snapshot already running elsewhere, skipped")
+                shutil.rmtree(staging, ignore_errors=True)
+                return None
+            cursor.execute("START TRANSACTION WITH CONSISTENT SNAPSHOT")
+        
+        tables = {}
+        for name, (sql, schema, partition_column) in TABLES.items():
+            writer = _PartitionWriter(os.path.join(staging, name), schema, partition_column)
+            cursor = connection.cursor(pymysql.cursors.SSDictCursor)
+            try:
+                cursor.execute(sql)
+                while True:
+                    rows = cursor.fetchmany(SNAPSHOT_BATCH)
+                    if not rows:
+                        break
+                    writer.add(rows)
+            finally:
+                cursor.close()
+            tables[name] = {
+                'rows': writer.close(),
+                'partitioned_by': f"month({partition_column})" if partition_column else None
+            }
+        connection.commit()
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+    finally:
+        connection.close()
+    
+    info = {
+        'snapshot': stamp,
+        'created_at': datetime.now().isoformat(timespec='seconds'),
+        'seconds': round(time.monotonic() - started, 1),
+        'compression': COMPRESSION,
+        'tables': tables
+    }
+    with open(os.path.join(staging, 'manifest.json'), 'w') as f:
+        json.dump(info, f, indent=2)
+    os.replace(staging, target)
+    
+    # Readers follow CURRENT, so switching it is the atomic publish step
+    pointer = os.path.join(SNAPSHOT_DIR, 'CURRENT.tmp')
+    with open(pointer, 'w') as f:
+        f.write(stamp)
+    os.replace(pointer, os.path.join(SNAPSHOT_DIR, 'CURRENT'))
+    _prune()
+    log.info("Snapshot %s written (%d rows)", stamp, sum(t['rows'] for t in tables.values()))
+    return info
+
+def _prune():
+    stamps = sorted(entry for entry in os.listdir(SNAPSHOT_DIR)
+                    if os.path.isdir(os.path.join(SNAPSHOT_DIR, entry)) and not entry.startswith('.'))
+    for stamp in stamps[:-SNAPSHOT_KEEP] if SNAPSHOT_KEEP > 0 else []:
+        shutil.rmtree(os.path.join(SNAPSHOT_DIR, stamp), ignore_errors=True)
+
+def load(table, columns=None, month_from=None, month_to=None, filter=None, path=None):
+    """One table of a snapshot as a pandas DataFrame
+    
+    month_from/month_to ('YYYY-MM', inclusive) prune whole partitions of the
+    month-partitioned tables before any file is read; `filter` is an optional
+    pyarrow.dataset expression pushed down to the row groups.
+    """
+    path = path or current_path()
+    if not path:
+        raise FileNotFoundError("No snapshot available; run `python snapshot.py` first")
+    if table not in TABLES:
+        raise ValueError(f"Unknown snapshot table: {table}")
+    
+    partitioned = TABLES[table][2] is not None
+    dataset = ds.dataset(os.path.join(path, table), format='parquet',
+                         partitioning=PARTITIONING if partitioned else None)
+    expression = filter
+    if partitioned:
+        for bound, compare in ((month_from, 'ge'), (month_to, 'le')):
+            if bound:
+                clause = ds.field('month') >= bound if compare == 'ge' else ds.field('month') <= bound
+                expression = clause if expression is None else expression & clause
+    return dataset.to_table(columns=columns, filter=expression).to_pandas()
+
+def monthly_summary(months=6, path=None):
+    """ReportData.get_monthly_summary computed from the snapshot, newest month first"""
+    cutoff = (pd.Timestamp.now() - pd.DateOffset(months=months)).to_pydatetime().replace(microsecond=0)
+    frame = load('leaves', columns=['month', 'status', 'suspicious_flag'],
+                 month_from=cutoff.strftime('%Y-%m'),
+                 filter=ds.field('applied_at') >= pa.scalar(cutoff, pa.timestamp('s')), path=path)
+    if frame.empty:
+        return []
+    
+    status = frame['status']
+    summary = frame.assign(
+        approved=(status == 'approved'),
+        rejected=(status == 'rejected'),
+        pending=(status == 'pending'),
+        suspicious=frame['suspicious_flag'].fillna(False)
+    ).groupby('month').agg(
+        total=('status', 'size'),
+        approved=('approved', 'sum'),
+        rejected=('rejected', 'sum'),
+        pending=('pending', 'sum'),
+        suspicious=('suspicious', 'sum')
+    ).sort_index(ascending=False)
+    return [{'month': month, **{key: int(value) for key, value in row.items()}}
+            for month, row in summary.iterrows()]
+
+_scheduler_started = False
+_running = threading.Lock()
+
+def run_in_background():
+    """Start a snapshot on a daemon thread; False if this worker is already taking one"""
+    if not _running.acquire(blocking=False):
+        return False
+    
+    def run():
+        try:
+            take_snapshot()
+        except Exception as e:
+            log.error("Snapshot failed: %s", e)
+        finally:
+            _running.release()
+    
+    threading.Thread(target=run, name='snapshot', daemon=True).start()
+    return True
+
+def start_scheduler(interval=None):
+    """Snapshot every `interval` seconds (SNAPSHOT_INTERVAL, 0 disables) unless a fresh one exists"""
+    global _scheduler_started
+    interval = interval if interval is not None else int(os.getenv('SNAPSHOT_INTERVAL', 0))
+    if interval <= 0 or _scheduler_started:
+        return
+    _scheduler_started = True
+    
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                info = manifest()
+                age = (datetime.now() - datetime.fromisoformat(info['created_at'])).total_seconds() if info else None
+                if age is None or age >= interval:
+                    run_in_background()
+            except Exception as e:
+                log.error("Scheduled snapshot failed: %s", e)
+    
+    threading.Thread(target=loop, name='snapshot-scheduler', daemon=True).start()
+
+if __name__ == "__main__":
+    print("Writing analytics snapshot...")
+    print(json.dumps(take_snapshot(), indent=2))
@@ -0,0 +1,206 @@
+# [file name]: stats_counters.py
+import os
+import threading
+import time
+from datetime import date
+from database import Database, in_transaction, rolled_back
+from app_logging import get_logger, sampled
+
+log = get_logger('stats_counters')
+
+# All-time counters are stored against this sentinel day; per-day
+# counters use the real date so "today" is a primary-key lookup too.
+ALL_TIME = date(1970, 1, 1)
+
+# Statuses whose totals are shown on the admin dashboard
+TRACKED_STATUSES = ('pending', 'approved')
+
+# Bumped by every all-time counter change, and by touch() for writes that
+# change report data without moving a counter; caches compare it to go stale
+DATA_VERSION = 'data_version'
+
+USER_METRICS = {
+    'student': 'total_students',
+    'proctor': 'total_proctors',
+    'supervisor': 'total_supervisors'
+}
+
+class StatCounters:
+    @staticmethod
+    def bump(cursor, deltas, today=False):
+        """Apply counter deltas using the caller's cursor"""
+        rows = [(metric, delta) for metric, delta in deltas.items() if delta]
+        if not rows:
+            return
+        
+        if today:
+            values_sql = "(CURDATE(), %s, %s)"
+        else:
+            values_sql = "(%s, %s, %s)"
+            if DATA_VERSION not in deltas:
+                rows.append((DATA_VERSION, 1))
+            rows = [(ALL_TIME, metric, delta) for metric, delta in rows]
+        
+        transaction = in_transaction(cursor)
+        try:
+            cursor.executemany(f"""
+                INSERT INTO stat_counters (day, metric, value)
+                VALUES {values_sql}
+                ON DUPLICATE KEY UPDATE value = value + VALUES(value)
+            """, rows)
+        except Exception as e:
+            if transaction and rolled_back(e):
+                # The caller's own writes went with it; it must not commit or report success
+                raise
+            # Drift is corrected by the next reconciliation run
+            log.warning("Counter update failed: %s", e, extra=sampled('counter_update'))
+    
+    @staticmethod
+    def touch(cursor):
+        """Move the data version for a write that changes no counter"""
+        StatCounters.bump(cursor, {DATA_VERSION: 1})
+    
+    @staticmethod
+    def data_version():
+        """Stamp that changes whenever committed data behind the reports changes"""
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT value, updated_at FROM stat_counters
+                    WHERE day = %s AND metric = %s
+                """, (ALL_TIME, DATA_VERSION))
+                row = cursor.fetchone()
+        finally:
+            connection.close()
+        # The timestamp keeps a recreated database from reusing old stamps
+        return f"{row['value']}-{row['updated_at']:%Y%m%d%H%M%S}" if row else '0'
+    
+    @staticmethod
+    def status_change(old_status, new_status):
+        """Counter deltas for a leave moving between statuses"""
+        deltas = {}
+        if old_status == new_status:
+            return deltas
+        if old_status in TRACKED_STATUSES:
+            deltas[f'{old_status}_leaves'] = -1
+        if new_status in TRACKED_STATUSES:
+            deltas[f'{new_status}_leaves'] = 1
+        return deltas
+    
+    @staticmethod
+    def read():
+        """Read every dashboard stat in a single primary-key lookup"""
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT day, metric, value FROM stat_counters
+                    WHERE day IN (%s, CURDATE())
+                """, (ALL_TIME,))
+                rows = cursor.fetchall()
+        finally:
+            connection.close()
+        
+        if not any(row['day'] == ALL_TIME for row in rows):
+            return None
+        
+        stats = {metric: 0 for metric in USER_METRICS.values()}
+        stats.update({
+            'total_leaves': 0,
+            'approved_leaves': 0,
+            'pending_leaves': 0,
+            'suspicious_leaves': 0,
+            'today_leaves': 0
+        })
+        for row in rows:
+            if row['metric'] == DATA_VERSION:
+                continue
+            if row['day'] == ALL_TIME:
+                stats[row['metric']] = int(row['value'])
+            elif row['metric'] == 'leaves_applied':
+                stats['today_leaves'] = int(row['value'])
+        return stats
+    
+    @staticmethod
+    def read_changed(cursor, since):
+        """Dashboard stats whose counters were updated at or after `since`"""
+        cursor.execute("""
+            SELECT day, metric, value FROM stat_counters
+            WHERE day IN (%s, CURDATE()) AND updated_at >= %s
+        """, (ALL_TIME, since))
+        changed = {}
+        for row in cursor.fetchall():
+            if row['metric'] == DATA_VERSION:
+                continue
+            if row['day'] == ALL_TIME:
+                changed[row['metric']] = int(row['value'])
+            elif row['metric'] == 'leaves_applied':
+                changed['today_leaves'] = int(row['value'])
+        return changed
+    
+    @staticmethod
+    def reconcile():
+        """Recount every metric from the base tables and overwrite the counters"""
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("""
+                    SELECT
+                        (SELECT COUNT(*) FROM students) as total_students,
+                        (SELECT COUNT(*) FROM proctors) as total_proctors,
+                        (SELECT COUNT(*) FROM hostel_supervisors) as total_supervisors,
+                        (SELECT COUNT(*) FROM leaves) as total_leaves,
+                        (SELECT COUNT(*) FROM leaves WHERE status = 'approved') as approved_leaves,
+                        (SELECT COUNT(*) FROM leaves WHERE status = 'pending') as pending_leaves,
+                        (SELECT COUNT(*) FROM leaves WHERE suspicious_flag = TRUE) as suspicious_leaves,
+                        (SELECT COUNT(*) FROM leaves
+                         WHERE applied_at >= CURDATE()
+                         AND applied_at < CURDATE() + INTERVAL 1 DAY) as today_leaves
+                """)
+                counts = {key: int(value or 0) for key, value in cursor.fetchone().items()}
+                
+                today_leaves = counts.pop('today_leaves')
+                cursor.executemany("""
+                    INSERT INTO stat_counters (day, metric, value)
+                    VALUES (%s, %s, %s)
+                    ON DUPLICATE KEY UPDATE value = VALUES(value)
+                """, [(ALL_TIME, metric, value) for metric, value in counts.items()])
+                cursor.execute("""
+                    INSERT INTO stat_counters (day, metric, value)
+                    VALUES (CURDATE(), 'leaves_applied', %s)
+                    ON DUPLICATE KEY UPDATE value = VALUES(value)
+                """, (today_leaves,))
+                connection.commit()
+                
+                counts['today_leaves'] = today_leaves
+                return counts
+        finally:
+            connection.close()
+
+_reconciler_started = False
+
+def start_reconciler(interval=None):
+    """Run reconcile() every `interval` seconds on a daemon thread"""
+    global _reconciler_started
+    interval = interval if interval is not None else int(os.getenv('STATS_RECONCILE_INTERVAL', 600))
+    if interval <= 0 or _reconciler_started:
+        return
+    _reconciler_started = True
+    
+    def loop():
+        while True:
+            time.sleep(interval)
+            try:
+                StatCounters.reconcile()
+            except Exception as e:
+                log.error("Counter reconciliation failed: %s", e)
+    
+    threading.Thread(target=loop, name='stats-reconciler', daemon=True).start()
+
+if __name__ == "__main__":
+    print("Reconciling dashboard counters...")
+    print(StatCounters.reconcile())
@@ -0,0 +1,64 @@
+# [file name]: test_admin_cache.py
+import sys
+import threading
+import time
+sys.path.append('.')
+from admin_cache import AdminCache
+
+def test_admin_cache():
+    print("="*60)
+    print("TESTING ADMIN CACHE")
+    print("="*60)
+    
+    calls = []
+    
+    def compute():
+        calls.append(1)
+        time.sleep(0.05)
+        return len(calls)
+    
+    # Test 1: Second read is served from the cache
+    print("\n1. Testing read-through...")
+    AdminCache.invalidate('test_key')
+    assert AdminCache.get_or_compute('test_key', compute, ttl=60) == 1
+    assert AdminCache.get_or_compute('test_key', compute, ttl=60) == 1
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Invalidation forces a recompute
+    print("\n2. Testing invalidation...")
+    AdminCache.invalidate('test_key')
+    assert AdminCache.get_or_compute('test_key', compute, ttl=60) == 2
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: Concurrent misses recompute only once
+    print("\n3. Testing stampede protection...")
+    AdminCache.invalidate('test_key')
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(AdminCache.get_or_compute('test_key', compute, ttl=60)))
+               for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == [3] * 10
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 4: Expired entries are recomputed
+    print("\n4. Testing TTL expiry...")
+    AdminCache.get_or_compute('short_key', compute, ttl=0.01)
+    time.sleep(0.02)
+    before = len(calls)
+    AdminCache.get_or_compute('short_key', compute, ttl=0.01)
+    assert len(calls) == before + 1
+    print("   Result: ✓ SUCCESS")
+    
+    stats = AdminCache.stats()
+    print(f"\n   Metrics: {stats}")
+    assert stats['hits'] >= 1 and stats['waits'] >= 1
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_admin_cache()
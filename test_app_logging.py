@@ -0,0 +1,59 @@
+# [file name]: test_app_logging.py
+import sys
+import json
+import logging
+import queue
+sys.path.append('.')
+import app_logging
+
+def make_record(msg, *args, **extra):
+    record = logging.LogRecord('vit_lms.test', logging.WARNING, __file__, 1, msg, args, None)
+    record.__dict__.update(extra)
+    return record
+
+def test_app_logging():
+    print("="*60)
+    print("TESTING STRUCTURED LOGGING")
+    print("="*60)
+    
+    # Test 1: Sampled events keep the first and then one in every N per key
+    print("\n1. Testing sampling...")
+    sampler = app_logging.SampleFilter(every=10)
+    kept = [record for record in (make_record("Slow", **app_logging.sampled('q1')) for _ in range(25))
+            if sampler.filter(record)]
+    assert [record.occurrences for record in kept] == [1, 11, 21]
+    assert not hasattr(kept[0], 'sample_rate') and kept[1].sample_rate == 10
+    assert sampler.filter(make_record("Other key", **app_logging.sampled('q2')))
+    assert all(sampler.filter(make_record("Unsampled")) for _ in range(5))
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Records are rendered before queuing and serialised as JSON lines
+    print("\n2. Testing JSON output...")
+    handler = app_logging._QueueHandler(queue.Queue(2))
+    try:
+        1 / 0
+    except ZeroDivisionError:
+        record = make_record("Job %s failed", 7, route='/admin/jobs')
+        record.exc_info = sys.exc_info()
+    prepared = handler.prepare(record)
+    assert prepared.msg == "Job 7 failed" and prepared.args is None and prepared.exc_info is None
+    entry = json.loads(app_logging.JsonFormatter().format(prepared))
+    assert entry['msg'] == "Job 7 failed" and entry['level'] == 'WARNING' and entry['route'] == '/admin/jobs'
+    assert 'ZeroDivisionError' in entry['exc'] and 'sample' not in entry
+    text = app_logging.TextFormatter().format(prepared)
+    assert "Job 7 failed route=/admin/jobs\nTraceback" in text
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: A full queue drops records instead of blocking the caller
+    print("\n3. Testing full queue...")
+    for _ in range(5):
+        handler.handle(make_record("Burst"))
+    assert handler.queue.qsize() == 2 and handler.dropped == 3
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_app_logging()
@@ -0,0 +1,42 @@
+# [file name]: test_bulk_decision.py
+import sys
+sys.path.append('.')
+from models import Proctor
+
+def test_bulk_decision():
+    print("="*60)
+    print("TESTING BULK DECISIONS")
+    print("="*60)
+    
+    # Test 1: Only lists of integer IDs are accepted
+    print("\n1. Testing ID validation...")
+    for approve, reject in [("123", None), ([1, "2"], None), ([True], None), ([[1]], None),
+                            (None, {'id': 1}), (None, [1.0]), (7, None)]:
+        try:
+            Proctor.bulk_decide('P1', approve, reject)
+            assert False, (approve, reject)
+        except ValueError:
+            pass
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Nothing requested means no database work
+    print("\n2. Testing empty request...")
+    assert Proctor.bulk_decide('P1', [], None) == {'approved': [], 'rejected': [], 'skipped': []}
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: The size limit applies to the distinct IDs of both lists
+    print("\n3. Testing request limit...")
+    ids = list(range(Proctor.MAX_BULK_DECISION))
+    try:
+        Proctor.bulk_decide('P1', ids, [Proctor.MAX_BULK_DECISION])
+        assert False
+    except ValueError as e:
+        assert str(Proctor.MAX_BULK_DECISION) in str(e)
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_bulk_decision()
@@ -0,0 +1,82 @@
+# [file name]: test_exporter.py
+import csv
+import io
+import sys
+import zipfile
+from datetime import date, datetime, timedelta
+sys.path.append('.')
+import exporter
+
+COLUMNS = [('leave_id', 'Leave ID'), ('reason', 'Reason'), ('from_time', 'From Time'), ('applied_at', 'Applied At')]
+
+def sample_rows(count):
+    for n in range(count):
+        yield {'leave_id': n, 'reason': f'Trip <{n}> & back', 'from_time': timedelta(hours=9, minutes=30),
+               'applied_at': datetime(2024, 3, 1, 8, 0, 0)}
+
+def test_exporter():
+    print("="*60)
+    print("TESTING STREAMING EXPORTS")
+    print("="*60)
+    
+    # Test 1: Values are made spreadsheet-safe
+    print("\n1. Testing cell values...")
+    assert exporter.cell_value(None) == ''
+    assert exporter.cell_value(timedelta(hours=18, minutes=5)) == '18:05'
+    assert exporter.cell_value(date(2024, 1, 2)) == '2024-01-02'
+    assert exporter.cell_value('=HYPERLINK("x")') == '\'=HYPERLINK("x")'
+    assert exporter.cell_value(7) == 7
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: CSV arrives in batches and parses back
+    print("\n2. Testing CSV stream...")
+    saved_batch = exporter.EXPORT_BATCH
+    try:
+        exporter.EXPORT_BATCH = 10
+        chunks = list(exporter.csv_stream(COLUMNS, sample_rows(25)))
+    finally:
+        exporter.EXPORT_BATCH = saved_batch
+    assert len(chunks) == 3
+    rows = list(csv.reader(io.StringIO(b''.join(chunks).decode('utf-8-sig'))))
+    assert rows[0] == ['Leave ID', 'Reason', 'From Time', 'Applied At']
+    assert len(rows) == 26 and rows[25] == ['24', 'Trip <24> & back', '09:30', '2024-03-01 08:00:00']
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: XLSX is a valid zip with one worksheet per sheet
+    print("\n3. Testing XLSX stream...")
+    chunks = list(exporter.xlsx_stream([('Leaves', COLUMNS, sample_rows(25)), ('Empty', COLUMNS, iter([]))]))
+    assert len(chunks) == 3
+    with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as archive:
+        assert archive.testzip() is None
+        sheet = archive.read('xl/worksheets/sheet1.xml').decode('utf-8')
+        assert sheet.count('<row ') == 26
+        assert 'Trip &lt;3&gt; &amp; back' in sheet and '<c r="A2"><v>0</v></c>' in sheet
+        assert archive.read('xl/worksheets/sheet2.xml').decode('utf-8').count('<row ') == 1
+        assert 'name="Empty"' in archive.read('xl/workbook.xml').decode('utf-8')
+    assert exporter._column_name(0) == 'A' and exporter._column_name(27) == 'AB'
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 4: Rows past the worksheet limit continue on numbered worksheets
+    print("\n4. Testing XLSX row limit...")
+    saved_max = exporter.XLSX_MAX_ROWS
+    try:
+        exporter.XLSX_MAX_ROWS = 11
+        chunks = list(exporter.xlsx_stream([('Leaves', COLUMNS, sample_rows(25)), ('Full', COLUMNS, sample_rows(10))]))
+    finally:
+        exporter.XLSX_MAX_ROWS = saved_max
+    with zipfile.ZipFile(io.BytesIO(b''.join(chunks))) as archive:
+        workbook = archive.read('xl/workbook.xml').decode('utf-8')
+        for name in ('Leaves', 'Leaves (2)', 'Leaves (3)', 'Full'):
+            assert f'name="{name}"' in workbook
+        assert 'Full (2)' not in workbook
+        counts = [archive.read(f'xl/worksheets/sheet{n}.xml').decode('utf-8').count('<row ') for n in range(1, 5)]
+        assert counts == [11, 11, 6, 11]
+        assert '<c r="A2"><v>10</v></c>' in archive.read('xl/worksheets/sheet2.xml').decode('utf-8')
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_exporter()
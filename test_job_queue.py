@@ -0,0 +1,97 @@
+# [file name]: test_job_queue.py
+import os
+import sys
+import tempfile
+from datetime import datetime
+sys.path.append('.')
+import job_queue
+
+def test_job_queue():
+    print("="*60)
+    print("TESTING JOB QUEUE")
+    print("="*60)
+    
+    # Test 1: Retry delay doubles per attempt and is capped
+    print("\n1. Testing backoff...")
+    assert [job_queue.backoff(n, jitter=False) for n in (1, 2, 3)] == [10, 20, 40]
+    assert job_queue.backoff(30, jitter=False) == job_queue.BACKOFF_MAX
+    assert 7 <= job_queue.backoff(1) <= 13
+    print("   Result: ✓ SUCCESS")
+    
+    # The test registers a handler and points RESULT_DIR at a temporary directory
+    saved_handlers = dict(job_queue.HANDLERS)
+    saved_result_dir = job_queue.RESULT_DIR
+    saved_database = job_queue.Database
+    try:
+        # Test 2: Registration keeps the handler and its limits
+        print("\n2. Testing register...")
+        @job_queue.register('test_job', limit=3, max_attempts=5)
+        def handler(context):
+            return context.params['value']
+        assert job_queue.HANDLERS['test_job'] == {'handler': handler, 'limit': 3, 'max_attempts': 5}
+        print("   Result: ✓ SUCCESS")
+        
+        # Test 3: Each job writes its result into its own directory
+        print("\n3. Testing result paths...")
+        job = {'job_id': 7, 'job_type': 'test_job', 'params': '{"value": 1}', 'attempts': 1}
+        with tempfile.TemporaryDirectory() as path:
+            job_queue.RESULT_DIR = path
+            context = job_queue.JobContext(job)
+            assert handler(context) == 1
+            result_path = context.output('../report.pdf')
+            assert result_path == os.path.join(path, '7', 'report.pdf')
+            open(result_path, 'w').close()
+            # A retry starts from an empty directory
+            context.output('report.pdf')
+            assert os.listdir(os.path.join(path, '7')) == []
+        print("   Result: ✓ SUCCESS")
+        
+        # Test 4: Status shows only the last line of a traceback
+        print("\n4. Testing status view...")
+        row = {'job_id': 7, 'job_type': 'test_job', 'status': 'failed', 'progress': 1, 'progress_total': 2,
+               'attempts': 5, 'max_attempts': 5, 'error': 'Traceback...\n  line 1\nValueError: bad\n',
+               'created_at': datetime(2024, 3, 1, 9, 0), 'finished_at': None, 'result_path': None}
+        status = job_queue.Jobs.status(row)
+        assert status['error'] == 'ValueError: bad' and status['created_at'] == '2024-03-01T09:00:00'
+        assert not status['has_result']
+        print("   Result: ✓ SUCCESS")
+        
+        # Test 5: A dedupe lock that times out still queues the job and is not released
+        print("\n5. Testing enqueue without the dedupe lock...")
+        statements = []
+        
+        class LockCursor:
+            lastrowid = 42
+            def __enter__(self):
+                return self
+            def __exit__(self, *exc):
+                return False
+            def execute(self, sql, args=None):
+                statements.append(sql.split()[0] + ' ' + sql.split()[1].split('(')[0])
+            def fetchone(self):
+                return {'acquired': 0}
+        
+        class LockConnection:
+            def cursor(self):
+                return LockCursor()
+            def commit(self):
+                pass
+            def close(self):
+                pass
+        
+        job_queue.Database = lambda: type('LockDatabase', (), {'get_connection': lambda self: LockConnection()})()
+        assert job_queue.Jobs.enqueue('test_job', {'key': 'a'}, dedupe_on='key') == 42
+        assert statements == ['SELECT GET_LOCK', 'INSERT INTO']
+        print("   Result: ✓ SUCCESS")
+    finally:
+        job_queue.HANDLERS.clear()
+        job_queue.HANDLERS.update(saved_handlers)
+        job_queue.RESULT_DIR = saved_result_dir
+        job_queue.Database = saved_database
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_job_queue()
@@ -0,0 +1,56 @@
+# [file name]: test_leave_analytics.py
+import sys
+import pandas as pd
+sys.path.append('.')
+import leave_analytics
+
+def chunk(rows):
+    return pd.DataFrame.from_records(rows, columns=leave_analytics.PROJECTION_COLUMNS)
+
+def test_leave_analytics():
+    print("="*60)
+    print("TESTING LEAVE ANALYTICS")
+    print("="*60)
+    
+    # Test 1: Totals carry across chunks
+    print("\n1. Testing activity metrics...")
+    chunks = [
+        chunk([('S1', 'A', 1, 1), ('S1', 'A', 2, 0), ('S2', 'B', 3, 0)]),
+        chunk([]),
+        chunk([('S2', 'B', 10, 0), ('S2', 'B', 20, 1), ('S3', None, 1, 0)])
+    ]
+    summary = leave_analytics.summarize(chunks)
+    assert summary['total_leaves'] == 6 and summary['active_students'] == 2
+    assert summary['avg_leaves_per_student'] == 2.0
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Lengths fall into the histogram bins
+    print("\n2. Testing length histogram...")
+    assert summary['length_histogram'] == [
+        ('1 day', 2), ('2 days', 1), ('3 days', 1), ('4-7 days', 0), ('8-14 days', 1), ('15+ days', 1)
+    ]
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: Nearest-rank percentiles per block; leaves without a block are left out
+    print("\n3. Testing block percentiles...")
+    assert summary['block_percentiles'] == {
+        'A': {'leaves': 2, 'p50': 1, 'p90': 2, 'p95': 2},
+        'B': {'leaves': 3, 'p50': 10, 'p90': 20, 'p95': 20}
+    }
+    counts = pd.Series([50, 40, 10], index=[1, 2, 30])
+    assert leave_analytics.length_percentiles(counts) == {'p50': 1, 'p90': 2, 'p95': 30}
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 4: No leaves at all
+    print("\n4. Testing empty input...")
+    summary = leave_analytics.summarize([chunk([])])
+    assert summary['total_leaves'] == 0 and summary['active_students'] == 0
+    assert summary['block_percentiles'] == {}
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_leave_analytics()
@@ -0,0 +1,75 @@
+# [file name]: test_leave_rollups.py
+import sys
+import pymysql
+from pymysql.constants import SERVER_STATUS
+sys.path.append('.')
+from leave_rollups import LeaveRollups, ROLLUP_TABLES
+
+class RecordingCursor:
+    def __init__(self):
+        self.queries = []
+    
+    def execute(self, sql, params=None):
+        self.queries.append((' '.join(sql.split()), params))
+
+class FailingCursor:
+    def __init__(self, error, server_status=0):
+        self.error = error
+        self.connection = type('Connection', (), {'server_status': server_status})()
+    
+    def execute(self, sql, params=None):
+        raise self.error
+
+def test_leave_rollups():
+    print("="*60)
+    print("TESTING LEAVE ROLLUPS")
+    print("="*60)
+    
+    # Test 1: Status transitions move one leave between columns
+    print("\n1. Testing status changes...")
+    assert LeaveRollups.status_change('pending', 'approved') == {'pending': -1, 'approved': 1}
+    assert LeaveRollups.status_change('approved', 'approved') == {}
+    assert LeaveRollups.status_change('draft', 'rejected') == {'rejected': 1}
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: One upsert per grain, with the deltas before the leave IDs
+    print("\n2. Testing bump...")
+    cursor = RecordingCursor()
+    LeaveRollups.bump(cursor, [4, 9], {'pending': -1, 'approved': 1, 'rejected': 0})
+    assert len(cursor.queries) == len(ROLLUP_TABLES)
+    sql, params = cursor.queries[0]
+    assert sql.startswith("INSERT INTO leave_rollup_daily (day, hostel_block, proctor_id, pending, approved)")
+    assert "WHERE l.leave_id IN (%s, %s)" in sql
+    assert "pending = pending + VALUES(pending)" in sql and "rejected" not in sql
+    assert params == (-1, 1, 4, 9)
+    assert sql.count('%s') == len(params)
+    assert "'%%Y-%%m-01'" in cursor.queries[1][0]
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: Nothing to record writes nothing
+    print("\n3. Testing empty bumps...")
+    cursor = RecordingCursor()
+    LeaveRollups.bump(cursor, [], {'total': 1})
+    LeaveRollups.bump(cursor, [4], {})
+    assert cursor.queries == []
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 4: Failures are logged, except those that rolled back the caller's transaction
+    print("\n4. Testing failures...")
+    deadlock = pymysql.err.OperationalError(1213, "Deadlock found")
+    in_transaction = SERVER_STATUS.SERVER_STATUS_IN_TRANS
+    LeaveRollups.bump(FailingCursor(pymysql.err.ProgrammingError(1146, "No table"), in_transaction), [4], {'total': 1})
+    LeaveRollups.bump(FailingCursor(deadlock), [4], {'total': 1})
+    try:
+        LeaveRollups.bump(FailingCursor(deadlock, in_transaction), [4], {'total': 1})
+        assert False
+    except pymysql.err.OperationalError:
+        pass
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_leave_rollups()
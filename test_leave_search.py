@@ -0,0 +1,44 @@
+# [file name]: test_leave_search.py
+import sys
+from datetime import datetime
+sys.path.append('.')
+from leave_search import compile_filters
+
+def test_leave_search():
+    print("="*60)
+    print("TESTING LEAVE SEARCH FILTERS")
+    print("="*60)
+    
+    # Test 1: No filters means no WHERE clause
+    print("\n1. Testing empty filters...")
+    assert compile_filters({}) == ("", [])
+    assert compile_filters({'status': [''], 'leave_type': None}) == ("", [])
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Date filters become a half-open range on the raw column
+    print("\n2. Testing date range...")
+    where_sql, params = compile_filters({'date_from': '2024-01-01', 'date_to': '2024-01-31'})
+    assert "DATE(" not in where_sql
+    assert where_sql == "WHERE l.applied_at >= %s AND l.applied_at < %s"
+    assert params == [datetime(2024, 1, 1), datetime(2024, 2, 1)]
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: Status sets keep only known values
+    print("\n3. Testing status sets...")
+    where_sql, params = compile_filters({'status': ['approved', 'bogus', 'pending']})
+    assert where_sql == "WHERE l.status IN (%s, %s)"
+    assert params == ['pending', 'approved']
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 4: Prefix filters escape LIKE wildcards
+    print("\n4. Testing prefix filters...")
+    where_sql, params = compile_filters({'student': '21B_%', 'destination': 'Goa'})
+    assert params == ['21B\\_\\%%', 'Goa%']
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_leave_search()
@@ -0,0 +1,55 @@
+# [file name]: test_live_feed.py
+import json
+import sys
+sys.path.append('.')
+from live_feed import EventBus, make_event, format_event
+
+def test_live_feed():
+    print("="*60)
+    print("TESTING LIVE FEED")
+    print("="*60)
+    
+    # Test 1: Only leave, scan and flag activity is streamed
+    print("\n1. Testing event mapping...")
+    assert make_event(1, 'leave', 'Leave pending')['event'] == 'leave_applied'
+    assert make_event(2, 'leave', 'Leave rejected')['event'] == 'leave_decided'
+    assert make_event(3, 'verification', 'granted')['event'] == 'scan'
+    assert make_event(4, 'admin', 'FLAG_LEAVE')['event'] == 'flag'
+    assert make_event(5, 'admin', 'DELETE_USER') is None
+    assert make_event(None, 'leave', 'Leave pending') is None
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Frames carry the id for Last-Event-ID resumption
+    print("\n2. Testing SSE framing...")
+    frame = format_event(make_event(7, 'leave', 'Leave approved', leave_id=3, proctor_id='P1'))
+    lines = frame.split('\n')
+    assert lines[0] == 'id: 7' and lines[1] == 'event: leave_decided' and frame.endswith('\n\n')
+    assert json.loads(lines[2][len('data: '):])['leave_id'] == 3
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: Proctors only see their own students; each id is delivered once
+    print("\n3. Testing fan-out and de-duplication...")
+    bus = EventBus()
+    admin = bus.subscribe()
+    proctor = bus.subscribe('P1')
+    assert bus.publish(make_event(8, 'leave', 'Leave pending', proctor_id='P1'))
+    assert bus.publish(make_event(9, 'leave', 'Leave pending', proctor_id='P2'))
+    assert not bus.publish(make_event(8, 'leave', 'Leave pending', proctor_id='P1'))
+    assert [admin.get(0)['id'], admin.get(0)['id'], admin.get(0)] == [8, 9, None]
+    assert [proctor.get(0)['id'], proctor.get(0)] == [8, None]
+    bus.unsubscribe(proctor)
+    assert len(bus) == 1
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 4: Streams past the limit are refused
+    print("\n4. Testing stream limit...")
+    assert bus.subscribe('P1', limit=2) is not None
+    assert bus.subscribe('P2', limit=2) is None and len(bus) == 2
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_live_feed()
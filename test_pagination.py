@@ -0,0 +1,52 @@
+# [file name]: test_pagination.py
+import sys
+from datetime import datetime
+sys.path.append('.')
+import pagination
+
+def test_pagination():
+    print("="*60)
+    print("TESTING KEYSET PAGINATION")
+    print("="*60)
+    
+    # Test 1: Cursors round-trip their sort key
+    print("\n1. Testing cursor round-trip...")
+    applied_at = datetime(2024, 3, 1, 9, 30, 15)
+    token = pagination.encode_cursor(applied_at, 42)
+    assert pagination.decode_cursor(token, datetime, int) == [applied_at, 42]
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Tampered cursors are rejected
+    print("\n2. Testing invalid cursors...")
+    for bad in ('not-a-cursor', pagination.encode_cursor(1), pagination.encode_cursor('x', 'y')):
+        try:
+            pagination.decode_cursor(bad, datetime, int)
+            assert False, f"accepted {bad}"
+        except ValueError:
+            pass
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: The extra row only signals that another page exists
+    print("\n3. Testing page building...")
+    rows = [{'id': n} for n in range(5, 0, -1)]
+    page = pagination.build_page(rows, 4, lambda row: (row['id'],))
+    assert [row['id'] for row in page['items']] == [5, 4, 3, 2]
+    assert pagination.decode_cursor(page['next_cursor'], int) == [2]
+    assert pagination.build_page(rows[:3], 4, lambda row: (row['id'],))['next_cursor'] is None
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 4: Page sizes are clamped
+    print("\n4. Testing page size limits...")
+    assert pagination.page_size(None) == pagination.DEFAULT_PAGE_SIZE
+    assert pagination.page_size('abc') == pagination.DEFAULT_PAGE_SIZE
+    assert pagination.page_size('25') == 25
+    assert pagination.page_size(-3) == 1
+    assert pagination.page_size(10**6) == pagination.MAX_PAGE_SIZE
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_pagination()
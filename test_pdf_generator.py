@@ -0,0 +1,60 @@
+# [file name]: test_pdf_generator.py
+import re
+import sys
+import tempfile
+import tracemalloc
+from datetime import date
+sys.path.append('.')
+from pypdf import PdfReader
+import pdf_generator
+from pdf_generator import PDFGenerator
+
+def sample_leaves(count):
+    for n in range(count):
+        yield {'leave_id': n, 'student_name': f'Student {n}', 'leave_type': 'home', 'from_date': date(2024, 3, 1),
+               'to_date': date(2024, 3, 3), 'status': 'approved', 'proctor_name': 'Dr. Meera Iyer'}
+
+def report_peak(count):
+    """(peak traced bytes, report file) for a leave statistics report of `count` rows"""
+    output = tempfile.TemporaryFile()
+    tracemalloc.start()
+    try:
+        PDFGenerator.generate_leave_report({'leaves': sample_leaves(count)}, 'leave_statistics', output)
+        return tracemalloc.get_traced_memory()[1], output
+    finally:
+        tracemalloc.stop()
+
+def test_pdf_generator():
+    print("="*60)
+    print("TESTING PDF REPORTS")
+    print("="*60)
+    
+    saved = pdf_generator.PDF_TABLE_ROWS, pdf_generator.PDF_PART_FLOWABLES
+    try:
+        pdf_generator.PDF_TABLE_ROWS = 10
+        pdf_generator.PDF_PART_FLOWABLES = 5
+        
+        # Test 1: Parts are concatenated into one document numbered throughout
+        print("\n1. Testing report parts...")
+        _, output = report_peak(300)
+        pages = PdfReader(output).pages
+        numbers = [int(re.search(r'Page (\d+)', page.extract_text()).group(1)) for page in pages]
+        assert numbers == list(range(1, len(pages) + 1)) and len(pages) > 5
+        assert 'Student 299' in pages[-1].extract_text() or 'Student 299' in pages[-2].extract_text()
+        print("   Result: ✓ SUCCESS")
+        
+        # Test 2: Peak memory does not grow with the number of rows
+        print("\n2. Testing peak memory...")
+        small, _ = report_peak(300)
+        large, _ = report_peak(1200)
+        assert large < small * 1.25, (small, large)
+        print("   Result: ✓ SUCCESS")
+    finally:
+        pdf_generator.PDF_TABLE_ROWS, pdf_generator.PDF_PART_FLOWABLES = saved
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_pdf_generator()
@@ -0,0 +1,116 @@
+# [file name]: test_prefix_index.py
+import sys
+import threading
+sys.path.append('.')
+import prefix_index
+from prefix_index import PrefixIndex, UserIndex
+
+def test_prefix_index():
+    print("="*60)
+    print("TESTING USER PREFIX INDEX")
+    print("="*60)
+    
+    index = PrefixIndex()
+    index.upsert('student', '21BCE1001', 'Ravi Kumar', 'A')
+    index.upsert('student', '21BCE1002', 'Kumar Sanu', 'B')
+    index.upsert('proctor', 'EMP042', 'Anita Rao', 'CSE')
+    
+    # Test 1: IDs and every name word are searchable by prefix
+    print("\n1. Testing prefix lookup...")
+    assert [user['id'] for user in index.lookup('21bce')] == ['21BCE1001', '21BCE1002']
+    assert {user['id'] for user in index.lookup('kum')} == {'21BCE1001', '21BCE1002'}
+    assert [user['id'] for user in index.lookup('ravi ku')] == ['21BCE1001']
+    assert index.lookup('xyz') == [] and index.lookup('  ') == []
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Type filters and limits
+    print("\n2. Testing type filter and limit...")
+    assert [user['id'] for user in index.lookup('a', user_types=['proctor'])] == ['EMP042']
+    assert len(index.lookup('21', limit=1)) == 1
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: Edits replace old keys and deletes remove them
+    print("\n3. Testing incremental updates...")
+    index.upsert('student', '21BCE1001', 'Ravi Shankar', 'A')
+    assert [user['id'] for user in index.lookup('kumar')] == ['21BCE1002']
+    assert index.lookup('shan')[0]['name'] == 'Ravi Shankar'
+    index.remove('student', '21BCE1002')
+    assert index.lookup('kumar') == []
+    assert len(index) == 2 and len(index.entries) == 6
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 4: A stale index keeps answering while one background rebuild runs
+    print("\n4. Testing background rebuild...")
+    saved_index, saved_warm = UserIndex._index, UserIndex.__dict__['warm']
+    release, builds = threading.Event(), []
+    fresh = PrefixIndex()
+    fresh.upsert('student', '21BCE1003', 'Meera Nair', 'C')
+    fresh.built_at = float('inf')
+    
+    def slow_warm(cls, force=False):
+        builds.append(threading.current_thread().name)
+        release.wait(5)
+        cls._index = fresh
+        return fresh
+    
+    try:
+        index.built_at = 1.0
+        UserIndex._index = index
+        UserIndex.warm = classmethod(slow_warm)
+        assert UserIndex.lookup('ravi')[0]['id'] == '21BCE1001'
+        assert UserIndex.lookup('ravi')[0]['id'] == '21BCE1001'
+        release.set()
+        while prefix_index._warmup_lock.locked():
+            release.wait(0.01)
+        assert builds == ['user-index-warmup']
+        assert UserIndex.lookup('meera')[0]['id'] == '21BCE1003'
+    finally:
+        UserIndex._index = saved_index
+        UserIndex.warm = saved_warm
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 5: Edits made while a build reads the tables survive the swap
+    print("\n5. Testing edits during a rebuild...")
+    
+    class BuildCursor:
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def execute(self, sql, args=None):
+            self.rows = []
+            if 'FROM students' in sql:
+                self.rows = [{'id': '21BCE1001', 'name': 'Ravi Kumar', 'detail': 'A'},
+                             {'id': '21BCE1002', 'name': 'Kumar Sanu', 'detail': 'B'}]
+                # Committed by another request after this snapshot was read
+                UserIndex.upsert('student', '21BCE1004', 'Divya Menon', 'D')
+                UserIndex.remove('student', '21BCE1002')
+        def fetchall(self):
+            return self.rows
+    
+    class BuildConnection:
+        def cursor(self):
+            return BuildCursor()
+        def close(self):
+            pass
+    
+    saved_database = prefix_index.Database
+    try:
+        UserIndex._index = index
+        prefix_index.Database = lambda: type('BuildDatabase', (), {'get_connection': lambda self: BuildConnection()})()
+        rebuilt = UserIndex.warm(force=True)
+        assert rebuilt is UserIndex._index and UserIndex._pending is None
+        assert rebuilt.lookup('divya')[0]['id'] == '21BCE1004'
+        assert rebuilt.lookup('sanu') == []
+        assert rebuilt.lookup('ravi')[0]['id'] == '21BCE1001'
+    finally:
+        prefix_index.Database = saved_database
+        UserIndex._index = saved_index
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_prefix_index()
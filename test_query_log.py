@@ -0,0 +1,64 @@
+# [file name]: test_query_log.py
+import sys
+sys.path.append('.')
+import query_log
+
+class RanCursor:
+    def __init__(self, executed):
+        self._executed = executed
+
+def test_query_log():
+    print("="*60)
+    print("TESTING QUERY LOG")
+    print("="*60)
+    query_log.reset()
+    query_log.SLOW_QUERY_MS = 100
+    
+    # Test 1: Literals, placeholders and value lists collapse into one fingerprint
+    print("\n1. Testing fingerprints...")
+    template = query_log.fingerprint("""
+        SELECT * FROM leaves  -- pending only
+        WHERE leave_id IN (%s, %s, %s) AND status = 'pending' AND reason = 'it''s #2'
+    """)
+    assert template == "select * from leaves where leave_id in (?+) and status = ? and reason = ?"
+    assert query_log.fingerprint("SELECT * FROM leaves WHERE leave_id IN (4, 9) AND status = 'x' AND reason = \"y\"") == template
+    assert query_log.fingerprint(
+        "INSERT INTO t (a, b) VALUES (1, 'x'), (2, 'y'), (3, 'z')"
+    ) == "insert into t (a, b) values (?+)"
+    assert query_log.fingerprint("SELECT idx_2 FROM t1") == "select idx_2 from t1"
+    # executemany() inlines every row; long statements are shortened and not cached
+    rows = ", ".join(f"({i}, 'name {i}')" for i in range(20000))
+    assert query_log._fingerprint_cached(f"INSERT INTO t (a, b) VALUES {rows}") == "insert into t (a, b) values (?+)"
+    ids = ", ".join(str(i) for i in range(3000))
+    assert query_log.fingerprint(f"SELECT * FROM t WHERE id IN ({ids})") == "select * from t where id in (?+ ..."
+    assert not any(len(sql) > query_log.FINGERPRINT_MAX_SQL for sql in query_log._fingerprints)
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Calls aggregate per fingerprint with nearest-rank percentiles
+    print("\n2. Testing aggregation...")
+    sql = "SELECT name FROM students WHERE reg_number = %s"
+    for ms in range(1, 101):
+        query_log.observe(RanCursor(sql), sql, ms / 1000, rows=1)
+    query_log.observe(RanCursor(sql), sql, 0.001, failed=True)
+    entry = query_log.snapshot()['queries'][0]
+    assert entry['fingerprint'] == "select name from students where reg_number = ?"
+    assert entry['count'] == 101 and entry['rows'] == 100 and entry['errors'] == 1
+    assert entry['p50_ms'] == 50 and entry['p99_ms'] == 99 and entry['max_ms'] == 100
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: Slow statements are listed, and EXPLAIN is tried once per fingerprint
+    print("\n3. Testing slow statements...")
+    assert entry['slow'] == 1 and entry['explain'].startswith('EXPLAIN failed')
+    lock_sql = "SELECT GET_LOCK('job_slot', 0) as acquired"
+    query_log.observe(RanCursor(lock_sql), lock_sql, 0.5, route='/admin/jobs')
+    report = query_log.snapshot(sort='max_ms')
+    assert report['queries'][0]['explain'] == 'Not explainable'
+    assert report['recent_slow'][0]['route'] == '/admin/jobs' and len(report['recent_slow']) == 2
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_query_log()
@@ -0,0 +1,57 @@
+# [file name]: test_report_cache.py
+import os
+import sys
+import tempfile
+import time
+sys.path.append('.')
+import report_cache
+from report_cache import ReportCache
+
+def test_report_cache():
+    print("="*60)
+    print("TESTING REPORT CACHE")
+    print("="*60)
+
+    # Test 1: Keys depend on type, parameters and data version, not dict order
+    print("\n1. Testing keys...")
+    key = ReportCache.key('leave_statistics', {'status': ['pending'], 'hostel_block': 'A'}, '7-20240301090000')
+    assert key == ReportCache.key('leave_statistics', {'hostel_block': 'A', 'status': ['pending']}, '7-20240301090000')
+    assert key != ReportCache.key('leave_statistics', {'status': ['pending'], 'hostel_block': 'B'}, '7-20240301090000')
+    assert key != ReportCache.key('leave_statistics', {'status': ['pending'], 'hostel_block': 'A'}, '8-20240301090000')
+    assert key != ReportCache.key('user_activity', {'status': ['pending'], 'hostel_block': 'A'}, '7-20240301090000')
+    assert len(key) == 64
+    print("   Result: ✓ SUCCESS")
+
+    with tempfile.TemporaryDirectory() as path:
+        report_cache.REPORT_CACHE_DIR = os.path.join(path, 'cache')
+        report_cache.REPORT_CACHE_MAX_BYTES = 2500
+        source = os.path.join(path, 'report.pdf')
+        with open(source, 'wb') as f:
+            f.write(b'x' * 1000)
+
+        # Test 2: Stored reports are read back
+        print("\n2. Testing put and get...")
+        assert ReportCache.get('a' * 64) is None
+        ReportCache.put('a' * 64, source)
+        assert open(ReportCache.get('a' * 64), 'rb').read() == b'x' * 1000
+        print("   Result: ✓ SUCCESS")
+
+        # Test 3: The least recently read report is evicted first
+        print("\n3. Testing LRU eviction...")
+        ReportCache.put('b' * 64, source)
+        past = time.time() - 60
+        os.utime(ReportCache.path('a' * 64), (past, past))
+        os.utime(ReportCache.path('b' * 64), (past - 60, past - 60))
+        ReportCache.get('b' * 64)
+        ReportCache.put('c' * 64, source)
+        assert ReportCache.get('a' * 64) is None
+        assert ReportCache.get('b' * 64) and ReportCache.get('c' * 64)
+        assert not [name for name in os.listdir(report_cache.REPORT_CACHE_DIR) if name.endswith('.tmp')]
+        print("   Result: ✓ SUCCESS")
+
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_report_cache()
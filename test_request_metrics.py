@@ -0,0 +1,84 @@
+# [file name]: test_request_metrics.py
+import sys
+import time
+from flask import Flask, render_template_string
+from pymysql.cursors import DictCursor, SSDictCursor
+sys.path.append('.')
+import request_metrics
+
+def test_request_metrics():
+    print("="*60)
+    print("TESTING REQUEST METRICS")
+    print("="*60)
+    
+    # Test 1: Cursors of every class are swapped for timed subclasses
+    print("\n1. Testing cursor classes...")
+    timed_dict = request_metrics._timed_cursor_class(DictCursor)
+    timed_unbuffered = request_metrics._timed_cursor_class(SSDictCursor)
+    assert issubclass(timed_dict, DictCursor) and issubclass(timed_dict, request_metrics._TimedCursor)
+    assert issubclass(timed_unbuffered, request_metrics._TimedUnbufferedCursor)
+    assert request_metrics._timed_cursor_class(DictCursor) is timed_dict
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Timers outside a request do nothing
+    print("\n2. Testing timers outside requests...")
+    with request_metrics.timed('bcrypt_seconds'):
+        pass
+    assert request_metrics._current() is None
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: Requests are recorded per route and exported as histograms
+    print("\n3. Testing middleware and exposition...")
+    app = Flask(__name__)
+    request_metrics.registry = request_metrics.Registry()
+    request_metrics.init_app(app)
+    
+    @app.route('/leave/<int:leave_id>')
+    def leave(leave_id):
+        with request_metrics.timed('bcrypt_seconds'):
+            time.sleep(0.02)
+        return render_template_string("Leave {{ leave_id }}", leave_id=leave_id)
+    
+    client = app.test_client()
+    assert client.get('/leave/1').data == b'Leave 1'
+    client.get('/leave/2')
+    client.get('/no/such/page')
+    saved_token = request_metrics.METRICS_TOKEN
+    try:
+        request_metrics.METRICS_TOKEN = 'scrape'
+        assert client.get('/metrics').status_code == 401
+        text = client.get('/metrics', headers={'Authorization': 'Bearer scrape'}).get_data(as_text=True)
+    finally:
+        request_metrics.METRICS_TOKEN = saved_token
+    
+    labels = 'route="/leave/<int:leave_id>",method="GET"'
+    assert f'vit_lms_requests_total{{{labels},status="200"}} 2' in text
+    assert 'vit_lms_requests_total{route="unmatched",method="GET",status="404"} 1' in text
+    assert f'vit_lms_bcrypt_seconds_bucket{{{labels},le="0.01"}} 0' in text
+    assert f'vit_lms_bcrypt_seconds_bucket{{{labels},le="0.025"}} 2' in text
+    assert f'vit_lms_bcrypt_seconds_count{{{labels}}} 2' in text
+    assert f'vit_lms_db_queries_bucket{{{labels},le="0"}} 2' in text
+    assert f'vit_lms_render_seconds_count{{{labels}}} 2' in text
+    assert '# TYPE vit_lms_request_seconds histogram' in text
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 4: Without a token only a signed-in admin can read /metrics
+    print("\n4. Testing access without a token...")
+    saved_token = request_metrics.METRICS_TOKEN
+    try:
+        request_metrics.METRICS_TOKEN = None
+        app.secret_key = 'test'
+        assert client.get('/metrics').status_code == 401
+        with client.session_transaction() as session:
+            session['admin_id'] = 1
+        assert client.get('/metrics').status_code == 200
+    finally:
+        request_metrics.METRICS_TOKEN = saved_token
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_request_metrics()
@@ -0,0 +1,71 @@
+# [file name]: test_seed_data.py
+import sys
+import random
+from collections import Counter
+from datetime import date
+sys.path.append('.')
+import seed_data
+
+END = date(2026, 10, 19)
+
+def generate(seed):
+    rng = random.Random(seed)
+    accounts, homes = seed_data.people(rng, ['hash-a', 'hash-b'], students=500, proctors=10, admins=2)
+    rows = list(seed_data.activity(rng, accounts, homes, END, total=5000, days=120,
+                                   first_ids={'leaves': 101, 'verification_logs': 7, 'admin_logs': 1}))
+    return accounts, rows
+
+def test_seed_data():
+    print("="*60)
+    print("TESTING SYNTHETIC DATA GENERATOR")
+    print("="*60)
+    
+    # Test 1: The same seed gives the same rows
+    print("\n1. Testing determinism...")
+    accounts, rows = generate(7)
+    assert generate(7) == (accounts, rows)
+    assert generate(8)[1] != rows
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Volumes, ids and time order
+    print("\n2. Testing volumes and ids...")
+    assert len(accounts['students']) == 500 and len({s[0] for s in accounts['students']}) == 500
+    assert {s[2] for s in accounts['students']} == {'hash-a', 'hash-b'}
+    leaves = [row for table, row in rows if table == 'leaves']
+    assert len(leaves) == 5000
+    assert [leave[0] for leave in leaves] == list(range(101, 5101))
+    assert all(a[12] <= b[12] for a, b in zip(leaves, leaves[1:]))
+    assert leaves[-1][12].date() <= END
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: Logs point at generated rows and agree with the leaves
+    print("\n3. Testing references...")
+    by_id = {leave[0]: leave for leave in leaves}
+    verifications = [row for table, row in rows if table == 'verification_logs']
+    assert verifications[0][0] == 7
+    assert len(verifications) == sum(leave[16] for leave in leaves)
+    assert all(by_id[log[1]][11] in ('approved', 'completed') for log in verifications)
+    assert all(leave[14] for leave in leaves if leave[11] in ('approved', 'completed'))
+    assert not any(leave[14] for leave in leaves if leave[11] in ('pending', 'rejected'))
+    events = Counter(row[0] for table, row in rows if table == 'activity_events')
+    admin_logs = sum(1 for table, _ in rows if table == 'admin_logs')
+    assert events == {'leave': 5000, 'verification': len(verifications), 'admin': admin_logs}
+    statuses = Counter(leave[11] for leave in leaves)
+    assert statuses.most_common(1)[0][0] == 'completed'
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 4: Day counts add up and TSV fields use MySQL's escapes
+    print("\n4. Testing day split and TSV fields...")
+    weights = seed_data.day_weights(END, 30)
+    assert sum(seed_data.daily_counts(random.Random(1), weights, 1001)) == 1001
+    assert seed_data.tsv_value("a\tb\\c\nd") == "a\\tb\\\\c\\nd"
+    assert seed_data.tsv_value(None) == "\\N" and seed_data.tsv_value(False) == "0"
+    assert seed_data.tsv_value(date(2026, 1, 2)) == "2026-01-02"
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_seed_data()
@@ -0,0 +1,63 @@
+# [file name]: test_slip_pack.py
+import sys
+from datetime import date, timedelta
+from io import BytesIO
+sys.path.append('.')
+from pypdf import PdfReader
+import slip_pack
+
+def slip_row(reg_number):
+    return {
+        'leave_id': 1, 'student_name': 'Aarav Sharma', 'reg_number': reg_number, 'hostel_block': 'A',
+        'room_number': '214', 'from_date': date(2024, 3, 1), 'to_date': date(2024, 3, 4),
+        'from_time': timedelta(hours=9), 'to_time': timedelta(hours=18, minutes=30),
+        'destination': 'Chennai', 'proctor_name': 'Dr. Meera Iyer',
+        'verified_at': None, 'supervisor_name': None
+    }
+
+def test_slip_pack():
+    print("="*60)
+    print("TESTING SLIP PACK")
+    print("="*60)
+    
+    # Test 1: Date ranges are validated
+    print("\n1. Testing date range...")
+    assert slip_pack.parse_range('2024-03-01', None) == (date(2024, 3, 1), date(2024, 3, 1))
+    for bad in [('2024-03-05', '2024-03-01'), ('2024-01-01', '2024-06-01'), ('', None)]:
+        try:
+            slip_pack.parse_range(*bad)
+            assert False, bad
+        except ValueError:
+            pass
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Rows become slip data
+    print("\n2. Testing slip fields...")
+    slip = slip_pack.slip_fields(slip_row('21BCE10001'))
+    assert slip['from_time'] == '09:00' and slip['to_time'] == '18:30'
+    assert slip['from_date'] == '2024-03-01' and slip['supervisor_name'] == 'Not yet verified'
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: Chunks are merged in order with one numbered page per slip
+    print("\n3. Testing merged pack...")
+    slips = [slip_pack.slip_fields(slip_row(f'21BCE{i:05d}')) for i in range(20)]
+    output = BytesIO()
+    seen = []
+    saved_chunk = slip_pack.SLIP_PACK_CHUNK
+    try:
+        slip_pack.SLIP_PACK_CHUNK = 7
+        assert slip_pack.build_pack(slips, output, lambda done, total: seen.append((done, total))) == 20
+    finally:
+        slip_pack.SLIP_PACK_CHUNK = saved_chunk
+    pages = PdfReader(BytesIO(output.getvalue())).pages
+    assert len(pages) == 20
+    assert '21BCE00013' in pages[13].extract_text() and '14 / 20' in pages[13].extract_text()
+    assert seen[-1] == (20, 20) and len(seen) == 3
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_slip_pack()
@@ -0,0 +1,62 @@
+# [file name]: test_snapshot.py
+import os
+import sys
+import tempfile
+from datetime import date, datetime, timedelta
+sys.path.append('.')
+import pyarrow.dataset as ds
+import snapshot
+
+def leave_row(leave_id, applied_at, status):
+    return {
+        'leave_id': leave_id, 'student_reg': '21BCE1001', 'proctor_id': 'EMP001', 'leave_type': 'regular',
+        'from_date': date(2024, 3, 1), 'to_date': date(2024, 3, 2),
+        'from_time': timedelta(hours=9), 'to_time': timedelta(hours=18, minutes=30),
+        'reason': 'Home visit', 'destination': 'Chennai', 'parent_contacted': 1, 'status': status,
+        'applied_at': applied_at, 'approved_at': None, 'verification_count': 0, 'suspicious_flag': 0,
+        'flagged_by': None, 'flag_reason': None, 'flagged_at': None, 'verified_at': None
+    }
+
+def test_snapshot():
+    print("="*60)
+    print("TESTING PARQUET SNAPSHOT")
+    print("="*60)
+    
+    _, schema, column = snapshot.TABLES['leaves']
+    rows = [leave_row(1, datetime(2024, 2, 10), 'approved'),
+            leave_row(2, datetime(2024, 3, 5), 'pending'),
+            leave_row(3, datetime(2024, 3, 20), 'approved')]
+    
+    with tempfile.TemporaryDirectory() as path:
+        # Test 1: Rows land in one directory per month
+        print("\n1. Testing month partitioning...")
+        writer = snapshot._PartitionWriter(os.path.join(path, 'leaves'), schema, column)
+        writer.add(rows)
+        assert writer.close() == 3
+        assert sorted(os.listdir(os.path.join(path, 'leaves'))) == ['month=2024-02', 'month=2024-03']
+        print("   Result: ✓ SUCCESS")
+        
+        # Test 2: The loader prunes months and keeps driver types
+        print("\n2. Testing loader...")
+        frame = snapshot.load('leaves', month_from='2024-03', path=path)
+        assert sorted(frame['leave_id']) == [2, 3]
+        assert str(frame['from_time'].iloc[0]) == '09:00:00' and frame['parent_contacted'].all()
+        frame = snapshot.load('leaves', columns=['leave_id'], filter=ds.field('status') == 'approved', path=path)
+        assert sorted(frame['leave_id']) == [1, 3]
+        print("   Result: ✓ SUCCESS")
+        
+        # Test 3: Unknown tables are rejected
+        print("\n3. Testing invalid table...")
+        try:
+            snapshot.load('admins', path=path)
+            assert False, "loaded admins"
+        except ValueError:
+            pass
+        print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_snapshot()
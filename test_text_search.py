@@ -0,0 +1,120 @@
+# [file name]: test_text_search.py
+import sys
+sys.path.append('.')
+import text_search
+from text_search import InvertedIndex, boolean_query, highlight
+
+def test_text_search():
+    print("="*60)
+    print("TESTING LEAVE TEXT SEARCH")
+    print("="*60)
+    
+    index = InvertedIndex()
+    index.add(1, "Family function at home", "Chennai", None)
+    index.add(2, "Medical checkup", "Chennai Apollo hospital", None)
+    index.add(3, "Going home for the weekend", "Bangalore", "Same destination every weekend")
+    
+    # Test 1: Ranking prefers documents where the term is rarer and denser
+    print("\n1. Testing ranked search...")
+    hits = index.search("weekend")
+    assert [leave_id for leave_id, _ in hits] == [3]
+    hits = index.search("chennai hospital")
+    assert hits[0][0] == 2 and {leave_id for leave_id, _ in hits} == {1, 2}
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 2: Trailing * matches word prefixes
+    print("\n2. Testing prefix search...")
+    assert {leave_id for leave_id, _ in index.search("bang*")} == {3}
+    assert index.search("bang") == []
+    assert boolean_query('bang* +home -"x" (y)') == "bang* home x y"
+    where_sql, params, _, _ = text_search.TextSearch.compile("bang* home")
+    assert "IN BOOLEAN MODE" in where_sql and params == ["bang* home"]
+    assert "NATURAL LANGUAGE" in text_search.TextSearch.compile("+bang")[0]
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 3: Re-indexing replaces the old postings
+    print("\n3. Testing incremental updates...")
+    index.add(1, "Family function", "Pune", None)
+    assert {leave_id for leave_id, _ in index.search("chennai")} == {2}
+    index.remove(2)
+    assert index.search("chennai") == []
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 4: Highlighting escapes HTML and marks matches
+    print("\n4. Testing highlighting...")
+    marked = highlight("Trip to <Goa> with friends", "goa")
+    assert str(marked) == "Trip to &lt;<mark>Goa</mark>&gt; with friends"
+    snippet = highlight("x " * 200 + "hospital visit", "hospital", width=40)
+    assert snippet.startswith("…") and "<mark>hospital</mark>" in snippet
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 5: Writes made while the memory index is being built survive the swap
+    print("\n5. Testing writes during a rebuild...")
+    TextSearch = text_search.TextSearch
+    
+    class BuildCursor:
+        def __enter__(self):
+            return self
+        def __exit__(self, *exc):
+            return False
+        def execute(self, sql, args=None):
+            # Committed by another request after this snapshot was read
+            TextSearch.index_leave(5, "Sports meet", "Kochi", None)
+            TextSearch.index_leave(1, None, None, None)
+        def fetchall(self):
+            return [{'leave_id': 1, 'reason': "Family function", 'destination': "Pune", 'flag_reason': None}]
+    
+    class BuildConnection:
+        def cursor(self):
+            return BuildCursor()
+        def close(self):
+            pass
+    
+    saved = text_search.BACKEND, text_search.Database, TextSearch._index
+    try:
+        text_search.BACKEND = 'memory'
+        text_search.Database = lambda: type('BuildDatabase', (), {'get_connection': lambda self: BuildConnection()})()
+        TextSearch._index = InvertedIndex()
+        rebuilt = TextSearch._memory_index()
+        assert rebuilt is TextSearch._index and TextSearch._pending is None
+        assert [leave_id for leave_id, _ in rebuilt.search("kochi")] == [5]
+        assert rebuilt.search("pune") == []
+    finally:
+        text_search.BACKEND, text_search.Database, TextSearch._index = saved
+    print("   Result: ✓ SUCCESS")
+    
+    # Test 6: Filters are applied before the memory backend caps its hits
+    print("\n6. Testing filters before the result cap...")
+    
+    class FilterCursor(BuildCursor):
+        def execute(self, sql, args=None):
+            self.rows = [{'leave_id': leave_id} for leave_id in args[1:] if leave_id in (11, 14)]
+        def fetchall(self):
+            return self.rows
+    
+    class FilterConnection(BuildConnection):
+        def cursor(self):
+            return FilterCursor()
+    
+    saved = text_search.BACKEND, text_search.Database, text_search.MAX_TEXT_RESULTS, TextSearch._index
+    try:
+        text_search.BACKEND = 'memory'
+        text_search.MAX_TEXT_RESULTS = 2
+        text_search.Database = lambda: type('FilterDatabase', (), {'get_connection': lambda self: FilterConnection()})()
+        TextSearch._index = InvertedIndex()
+        for leave_id in range(10, 15):
+            TextSearch._index.add(leave_id, "Trip " * (20 - leave_id), "Goa", None)
+        TextSearch._index.built_at = float('inf')
+        where_sql, ids, _, _ = TextSearch.compile("goa", filter_sql="l.status = %s", filter_params=['approved'])
+        assert ids == [14, 11]
+        assert TextSearch.compile("goa")[1] == [14, 13]
+    finally:
+        text_search.BACKEND, text_search.Database, text_search.MAX_TEXT_RESULTS, TextSearch._index = saved
+    print("   Result: ✓ SUCCESS")
+    
+    print("\n" + "="*60)
+    print("ALL TESTS COMPLETED!")
+    print("="*60)
+
+if __name__ == '__main__':
+    test_text_search()
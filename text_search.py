@@ -0,0 +1,243 @@
+# [file name]: text_search.py
+import math
+import os
+import re
+import time
+from collections import defaultdict
+from threading import Lock
+from markupsafe import Markup, escape
+from database import Database
+
+# 'mysql' uses the FULLTEXT index on leaves; 'memory' keeps an inverted index
+# in each worker, for databases without FULLTEXT support and for tests
+BACKEND = os.getenv('LEAVE_SEARCH_BACKEND', 'mysql').lower()
+
+# The memory backend ranks at most this many leaves per query
+MAX_TEXT_RESULTS = int(os.getenv('LEAVE_SEARCH_MAX_RESULTS', 1000))
+
+# Rebuild the memory index when older than this, to pick up other workers' writes
+INDEX_MAX_AGE = int(os.getenv('LEAVE_SEARCH_INDEX_AGE', 300))
+
+TEXT_FIELDS = ('reason', 'destination', 'flag_reason')
+
+MATCH_SQL = "MATCH(l.reason, l.destination, l.flag_reason) AGAINST (%s IN NATURAL LANGUAGE MODE)"
+
+# Natural language mode ignores *, so prefix queries are run in boolean mode
+PREFIX_MATCH_SQL = "MATCH(l.reason, l.destination, l.flag_reason) AGAINST (%s IN BOOLEAN MODE)"
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+def tokenize(text):
+    """Lower-cased word tokens"""
+    return [token.lower() for token in _TOKEN.findall(text or '')]
+
+def boolean_query(query):
+    """The query as optional boolean-mode terms, keeping only the trailing * operator"""
+    terms = []
+    for raw in query.split():
+        suffix = '*' if raw.endswith('*') else ''
+        terms.extend(token + suffix for token in tokenize(raw))
+    return ' '.join(terms)
+
+class InvertedIndex:
+    """Term -> {leave_id: term frequency} postings with BM25 ranking"""
+    k1 = 1.2
+    b = 0.75
+    
+    def __init__(self):
+        self.postings = defaultdict(dict)
+        self.doc_terms = {}     # leave_id -> {term: tf}, needed to remove a document
+        self.doc_lengths = {}
+        self.total_length = 0
+        self.built_at = 0.0
+        self.lock = Lock()
+    
+    def add(self, leave_id, *texts):
+        """Index (or re-index) one leave"""
+        with self.lock:
+            self._remove(leave_id)
+            terms = defaultdict(int)
+            for text in texts:
+                for token in tokenize(text):
+                    terms[token] += 1
+            if not terms:
+                return
+            for term, tf in terms.items():
+                self.postings[term][leave_id] = tf
+            self.doc_terms[leave_id] = dict(terms)
+            length = sum(terms.values())
+            self.doc_lengths[leave_id] = length
+            self.total_length += length
+    
+    def remove(self, leave_id):
+        with self.lock:
+            self._remove(leave_id)
+    
+    def _remove(self, leave_id):
+        terms = self.doc_terms.pop(leave_id, None)
+        if not terms:
+            return
+        for term in terms:
+            docs = self.postings.get(term)
+            if docs is not None:
+                docs.pop(leave_id, None)
+                if not docs:
+                    del self.postings[term]
+        self.total_length -= self.doc_lengths.pop(leave_id, 0)
+    
+    def search(self, query, limit=MAX_TEXT_RESULTS):
+        """[(leave_id, score)] best first; a trailing * matches a prefix; limit=None keeps all"""
+        with self.lock:
+            n_docs = len(self.doc_lengths)
+            if not n_docs:
+                return []
+            avg_length = self.total_length / n_docs
+            scores = defaultdict(float)
+            
+            for raw in query.split():
+                prefix = raw.endswith('*')
+                for token in tokenize(raw):
+                    if prefix:
+                        terms = [term for term in self.postings if term.startswith(token)]
+                    else:
+                        terms = [token] if token in self.postings else []
+                    for term in terms:
+                        docs = self.postings[term]
+                        idf = math.log(1 + (n_docs - len(docs) + 0.5) / (len(docs) + 0.5))
+                        for leave_id, tf in docs.items():
+                            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[leave_id] / avg_length)
+                            scores[leave_id] += idf * tf * (self.k1 + 1) / (tf + norm)
+            
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+            return [(leave_id, round(score, 6)) for leave_id, score in ranked[:limit]]
+
+class TextSearch:
+    _index = InvertedIndex()
+    _build_lock = Lock()
+    # Writes seen while a build is reading the leaves table, replayed before the swap
+    _pending = None
+    _pending_lock = Lock()
+    
+    @classmethod
+    def _memory_index(cls):
+        """The worker's inverted index, (re)built from the leaves table when stale"""
+        if time.monotonic() - cls._index.built_at < INDEX_MAX_AGE:
+            return cls._index
+        with cls._build_lock:
+            if time.monotonic() - cls._index.built_at < INDEX_MAX_AGE:
+                return cls._index
+            with cls._pending_lock:
+                cls._pending = []
+            index = InvertedIndex()
+            db = Database()
+            connection = db.get_connection()
+            try:
+                with connection.cursor() as cursor:
+                    cursor.execute("SELECT leave_id, reason, destination, flag_reason FROM leaves")
+                    for row in cursor.fetchall():
+                        index.add(row['leave_id'], *(row[field] for field in TEXT_FIELDS))
+            except Exception:
+                with cls._pending_lock:
+                    cls._pending = None
+                raise
+            finally:
+                connection.close()
+            index.built_at = time.monotonic()
+            with cls._pending_lock:
+                for leave_id, texts in cls._pending:
+                    index.add(leave_id, *texts)
+                cls._pending = None
+                cls._index = index
+            return index
+    
+    @classmethod
+    def index_leave(cls, leave_id, reason=None, destination=None, flag_reason=None):
+        """Keep the memory index in step with a write; no-op for the MySQL backend"""
+        if BACKEND != 'memory':
+            return
+        with cls._pending_lock:
+            if cls._pending is not None:
+                cls._pending.append((leave_id, (reason, destination, flag_reason)))
+            index = cls._index
+        if index.built_at:
+            index.add(leave_id, reason, destination, flag_reason)
+    
+    @classmethod
+    def _filter_hits(cls, hits, filter_sql, filter_params):
+        """The ranked hits whose leaves also match filter_sql, up to MAX_TEXT_RESULTS"""
+        kept = []
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as cursor:
+                for start in range(0, len(hits), MAX_TEXT_RESULTS):
+                    batch = hits[start:start + MAX_TEXT_RESULTS]
+                    cursor.execute(f"""
+                        SELECT l.leave_id FROM leaves l
+                        WHERE {filter_sql} AND l.leave_id IN ({', '.join(['%s'] * len(batch))})
+                    """, (*filter_params, *(leave_id for leave_id, _ in batch)))
+                    matched = {row['leave_id'] for row in cursor.fetchall()}
+                    kept.extend(hit for hit in batch if hit[0] in matched)
+                    if len(kept) >= MAX_TEXT_RESULTS:
+                        break
+        finally:
+            connection.close()
+        return kept[:MAX_TEXT_RESULTS]
+    
+    @classmethod
+    def compile(cls, query, after=None, filter_sql=None, filter_params=()):
+        """(where_sql, where_params, score_sql, score_params) for matches ranked after `after`
+        
+        `after` is the (relevance, leave_id) of the last row already shown. The memory
+        backend applies `filter_sql` (conditions on leaves `l`) before capping its hits.
+        """
+        if BACKEND == 'memory':
+            hits = cls._memory_index().search(query, limit=None)
+            if after:
+                hits = [(leave_id, score) for leave_id, score in hits if (score, leave_id) < tuple(after)]
+            if filter_sql:
+                hits = cls._filter_hits(hits, filter_sql, filter_params)
+            hits = hits[:MAX_TEXT_RESULTS]
+            if not hits:
+                return "FALSE", [], "0", []
+            ids = [leave_id for leave_id, _ in hits]
+            score_sql = "CASE l.leave_id " + " ".join(["WHEN %s THEN %s"] * len(hits)) + " END"
+            score_params = [value for hit in hits for value in hit]
+            return f"l.leave_id IN ({', '.join(['%s'] * len(ids))})", ids, score_sql, score_params
+        
+        match_sql = MATCH_SQL
+        if any(raw.endswith('*') for raw in query.split()):
+            match_sql, query = PREFIX_MATCH_SQL, boolean_query(query)
+        score_sql = f"ROUND({match_sql}, 6)"
+        if after:
+            relevance, leave_id = after
+            where_sql = f"{match_sql} AND ({score_sql} < %s OR ({score_sql} = %s AND l.leave_id < %s))"
+            return where_sql, [query, query, relevance, query, relevance, leave_id], score_sql, [query]
+        return match_sql, [query], score_sql, [query]
+
+def highlight(text, query, width=None):
+    """HTML-escaped text with query terms wrapped in <mark>, trimmed to `width` around the first hit"""
+    if not text:
+        return Markup('')
+    terms = sorted({token for token in tokenize(query)}, key=len, reverse=True)
+    if not terms:
+        return escape(text[:width] if width else text)
+    pattern = re.compile(r"\b(?:" + "|".join(re.escape(term) for term in terms) + r")\w*", re.IGNORECASE)
+    
+    prefix = suffix = ''
+    if width and len(text) > width:
+        first = pattern.search(text)
+        start = max(0, (first.start() if first else 0) - width // 3)
+        end = min(len(text), start + width)
+        prefix = '…' if start > 0 else ''
+        suffix = '…' if end < len(text) else ''
+        text = text[start:end]
+    
+    parts = []
+    position = 0
+    for match in pattern.finditer(text):
+        parts.append(escape(text[position:match.start()]))
+        parts.append(Markup('<mark>') + escape(match.group()) + Markup('</mark>'))
+        position = match.end()
+    parts.append(escape(text[position:]))
+    return Markup(prefix) + Markup('').join(parts) + Markup(suffix)
@@ -0,0 +1,127 @@
+# [file name]: user_directory.py
+from database import Database
+from leave_search import like_prefix
+import pagination
+
+# Directory roles in the order ties on the sort column are broken
+ROLES = ('admin', 'proctor', 'student', 'supervisor')
+
+SORT_COLUMNS = ('name', 'id')
+
+# Every branch exposes the same columns so they can be UNIONed; `key` and
+# `label` are the table's own ID column and name column, used in predicates
+SOURCES = {
+    'student': {
+        'key': 's.reg_number',
+        'label': 's.name',
+        'sql': """
+            SELECT s.reg_number as id, s.name, 'student' as type, s.hostel_block as location,
+                   NULL as email, s.phone, s.room_number, s.hostel_block,
+                   NULL as department, p.name as proctor_name, NULL as admin_role
+            FROM students s
+            LEFT JOIN proctors p ON p.employee_id = s.proctor_id
+        """
+    },
+    'proctor': {
+        'key': 'employee_id',
+        'label': 'name',
+        'sql': """
+            SELECT employee_id as id, name, 'proctor' as type, department as location,
+                   email, NULL as phone, NULL as room_number, NULL as hostel_block,
+                   department, NULL as proctor_name, NULL as admin_role
+            FROM proctors
+        """
+    },
+    'supervisor': {
+        'key': 'supervisor_id',
+        'label': 'name',
+        'sql': """
+            SELECT supervisor_id as id, name, 'supervisor' as type, hostel_block as location,
+                   email, NULL as phone, NULL as room_number, hostel_block,
+                   NULL as department, NULL as proctor_name, NULL as admin_role
+            FROM hostel_supervisors
+        """
+    },
+    'admin': {
+        'key': 'admin_id',
+        'label': 'name',
+        'sql': """
+            SELECT admin_id as id, name, 'admin' as type, role as location,
+                   email, NULL as phone, NULL as room_number, NULL as hostel_block,
+                   NULL as department, NULL as proctor_name, role as admin_role
+            FROM admins
+        """
+    }
+}
+
+ROLE_LABELS = {
+    'student': 'Student',
+    'proctor': 'Proctor',
+    'supervisor': 'Hostel Supervisor'
+}
+
+def _branch(role, search, sort, after, limit):
+    """One table's slice of the page: its own WHERE, ORDER BY and LIMIT"""
+    source = SOURCES[role]
+    sort_column = source['label'] if sort == 'name' else source['key']
+    clauses = []
+    params = []
+    
+    if search:
+        clauses.append(f"({source['key']} LIKE %s OR {source['label']} LIKE %s)")
+        params.extend([like_prefix(search), like_prefix(search)])
+    
+    # Rows strictly after the cursor in (sort value, type, id) order; the
+    # type comparison is resolved here so MySQL only sees column ranges
+    if after:
+        value, last_role, last_id = after
+        if role > last_role:
+            clauses.append(f"{sort_column} >= %s")
+            params.append(value)
+        elif role == last_role:
+            clauses.append(f"({sort_column} > %s OR ({sort_column} = %s AND {source['key']} > %s))")
+            params.extend([value, value, last_id])
+        else:
+            clauses.append(f"{sort_column} > %s")
+            params.append(value)
+    
+    where_sql = ("WHERE " + " AND ".join(clauses)) if clauses else ""
+    sql = f"""
+        ({source['sql']}
+         {where_sql}
+         ORDER BY {sort_column}, {source['key']}
+         LIMIT %s)
+    """
+    return sql, params + [limit]
+
+class UserDirectory:
+    @staticmethod
+    def page(role=None, search=None, sort='name', cursor=None, page_size=None):
+        """One page of users across all roles, ordered by name or ID"""
+        size = pagination.page_size(page_size)
+        roles = [role] if role in SOURCES else list(ROLES)
+        sort = sort if sort in SORT_COLUMNS else 'name'
+        search = (search or '').strip()
+        after = pagination.decode_cursor(cursor, str, str, str) if cursor else None
+        
+        # Each branch needs at most size + 1 rows for the merged page to be right
+        branches = [_branch(name, search, sort, after, size + 1) for name in roles]
+        sql = " UNION ALL ".join(branch_sql for branch_sql, _ in branches)
+        params = [param for _, branch_params in branches for param in branch_params]
+        
+        db = Database()
+        connection = db.get_connection()
+        try:
+            with connection.cursor() as db_cursor:
+                db_cursor.execute(f"""
+                    SELECT * FROM ({sql}) directory
+                    ORDER BY {sort}, type, id
+                    LIMIT %s
+                """, (*params, size + 1))
+                rows = db_cursor.fetchall()
+        finally:
+            connection.close()
+        
+        for user in rows:
+            user['role'] = ROLE_LABELS.get(user['type']) or f"Admin ({user['admin_role']})"
+        return pagination.build_page(rows, size, lambda user: (user[sort], user['type'], user['id']))